@@ -1,25 +1,36 @@
 import os
-from flask import Flask, request, jsonify, abort, make_response
+from flask import Blueprint, Flask, Response, current_app, request, jsonify, abort, make_response
 from flask_sqlalchemy import SQLAlchemy
 from flask_cors import CORS
-from flask_migrate import Migrate
-from datetime import datetime
-from sqlalchemy import CheckConstraint
-from sqlalchemy.orm import relationship
-import json
-from fpdf import FPDF
+from werkzeug.middleware.proxy_fix import ProxyFix
+from datetime import date, datetime, timedelta
+from sqlalchemy import CheckConstraint, Index, case, event, func, literal, select
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.orm import object_session, relationship
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+import click
+import csv
+import hashlib
+import io
+import math
+from pagination import paginated_response
+from exports import export_format, export_response, stream_rows, stream_rows_by_window
+from fast_json import backend as json_backend
+from catalog_cache import CatalogCache
+from reports import ReportJobs, render_transaction_report
+from market_rates import DEFAULT_PATH as MARKET_RATES_PATH, MarketRateIndex
+from date_buckets import BUCKETS as DATE_BUCKETS, bucket_labels, date_bucket
+from identity_cache import FarmerIdentity, RetailerIdentity, TTLCache
+from db_pool import engine_options_from_env, instrument_pool, pool_status, warm_pool
+from db_routing import REPLICA_BIND, ReplicaRouter, RoutingSession
+from admission import AdmissionControl
+from compression import Compression, etag_matches
+from metrics import RequestMetrics
+from product_search import ProductSearchIndex
+from stock_events import StockEvents
 
 # ---------------- Config ----------------
-app = Flask(__name__)
-CORS(app, resources={r"/*": {
-    "origins": ["https://farm2bazaar.vercel.app"],
-    "methods": ["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
-    "allow_headers": ["Content-Type", "Authorization"],
-    "supports_credentials": True
-}})
-
-
-
 # Configure database for Railway MySQL or fallback to SQLite
 # 🔑 Update this with your MySQL details
 DB_USER = os.environ.get("DB_USER", "root")
@@ -28,23 +39,122 @@ DB_HOST = os.environ.get("DB_HOST", "trolley.proxy.rlwy.net")          # e.g. co
 DB_PORT = os.environ.get("DB_PORT", "38946")               # default MySQL port
 DB_NAME = os.environ.get("DB_NAME", "railway")        # your DB name
 
-app.config['SQLALCHEMY_DATABASE_URI'] = f"mysql+pymysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+CORS_RESOURCES = {r"/*": {
+    "origins": ["https://farm2bazaar.vercel.app"],
+    "methods": ["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
+    "allow_headers": ["Content-Type", "Authorization"],
+    "supports_credentials": True
+}}
 
-print(f"SQLALCHEMY_DATABASE_URI: {app.config['SQLALCHEMY_DATABASE_URI']}")
+# Extensions are bound to an app in create_app(); nothing here touches the database
+db = SQLAlchemy(session_options={"class_": RoutingSession})
+cors = CORS()
+api = Blueprint("api", __name__, cli_group=None)
+
+
+def create_app(config=None):
+    """Build the Flask app; ``config`` overrides the environment-derived settings.
+
+    Nothing here opens a database connection unless DB_POOL_WARMUP asks for
+    it, so creating the app (and forking workers from it) stays cheap. Create
+    the schema with ``flask create-schema`` or ``flask db upgrade``.
+    """
+    app = Flask(__name__)
+    # DATABASE_URL overrides the MySQL settings, e.g. sqlite:///local.db for local runs and tooling
+    app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get(
+        "DATABASE_URL", f"mysql+pymysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+    )
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    # Load market_rates.json up front, e.g. in a preloading gunicorn master (see gunicorn.conf.py)
+    app.config['MARKET_RATES_PRELOAD'] = os.environ.get("MARKET_RATES_PRELOAD", "").lower() in ("1", "true", "yes")
+    # Connections to open at startup so the first requests skip the TCP/TLS handshakes
+    app.config['DB_POOL_WARMUP'] = int(os.environ.get("DB_POOL_WARMUP", "0"))
+    # Analytics and history reads go here when set (see db_routing.py)
+    app.config['REPLICA_DATABASE_URL'] = os.environ.get("REPLICA_DATABASE_URL")
+    # Proxies in front of the app (e.g. TRUSTED_PROXIES=1 behind Railway's edge); with none,
+    # X-Forwarded-* would let any client pick its own address
+    app.config['TRUSTED_PROXIES'] = int(os.environ.get("TRUSTED_PROXIES", "0"))
+    app.config.update(config or {})
+    # Pool sizing, recycle and pre-ping come from DB_POOL_* env vars (see db_pool.py)
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', engine_options_from_env(
+        os.environ, app.config['SQLALCHEMY_DATABASE_URI']
+    ))
+    if app.config['REPLICA_DATABASE_URL']:
+        replica_url = app.config['REPLICA_DATABASE_URL']
+        app.config.setdefault('SQLALCHEMY_BINDS', {})[REPLICA_BIND] = {
+            "url": replica_url, **engine_options_from_env(os.environ, replica_url),
+        }
+
+    if app.config['TRUSTED_PROXIES']:
+        # Client address and scheme from X-Forwarded-For/-Proto: admission control keys clients
+        # by address, and the read-your-writes cookie is Secure only when request.is_secure
+        hops = app.config['TRUSTED_PROXIES']
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=hops, x_proto=hops)
+    cors.init_app(app, resources=CORS_RESOURCES)
+    db.init_app(app)
+    # Alembic is only needed for `flask db ...` (the flask CLI sets FLASK_RUN_FROM_CLI); web workers skip importing it
+    if os.environ.get("FLASK_RUN_FROM_CLI") == "true":
+        from flask_migrate import Migrate
+        Migrate(app, db)
+    app.register_blueprint(api)
+    replica_router.init_app(app)
+    with app.app_context():
+        engines = [db.engine] + ([db.engines[REPLICA_BIND]] if REPLICA_BIND in db.engines else [])
+        for engine in engines:
+            instrument_pool(engine)
+            warm_pool(engine, app.config['DB_POOL_WARMUP'])
+        request_metrics.init_app(app, *engines)
+    # After request_metrics, so refused requests still show up in the request metrics
+    admission.init_app(app)
+    compression.init_app(app)
+    if app.config['MARKET_RATES_PRELOAD']:
+        market_rates.load()
+    return app
 
-db = SQLAlchemy(app)
-migrate = Migrate(app, db)
 
 # Generic error handler for 500 Internal Server Error
-@app.errorhandler(500)
+@api.app_errorhandler(500)
 def internal_server_error(e):
-    app.logger.exception('An internal server error occurred: %s', e)
+    current_app.logger.exception('An internal server error occurred: %s', e)
     return jsonify(error="Internal Server Error", message=str(e)), 500
 
+# Per-route latency/query histograms for /metrics; QUERY_BUDGET logs requests running more SQL than that
+request_metrics = RequestMetrics(
+    query_budget=int(os.environ["QUERY_BUDGET"]) if os.environ.get("QUERY_BUDGET") else None,
+)
+
+# Primary/replica choice for @replica_router.replica_reads views; REPLICA_MAX_LAG is the staleness tolerated
+replica_router = ReplicaRouter(
+    db,
+    max_lag=float(os.environ.get("REPLICA_MAX_LAG", "5")),
+    lag_check_seconds=float(os.environ.get("REPLICA_LAG_CHECK_SECONDS", "5")),
+    lag_query=os.environ.get("REPLICA_LAG_QUERY"),
+)
+
+# Per-client token buckets and per-route-class concurrency caps; ADMISSION_* env vars (see admission.py)
+admission = AdmissionControl.from_env(os.environ)
+
+# gzip/brotli for large JSON and CSV bodies; COMPRESS_* env vars (see compression.py)
+compression = Compression.from_env(os.environ)
+
+# Per-state available-products cache; set CATALOG_CACHE_URL=redis://... to share it between workers
+catalog_cache = CatalogCache.from_url(
+    os.environ.get("CATALOG_CACHE_URL"),
+    ttl=int(os.environ.get("CATALOG_CACHE_TTL", "30")),
+)
+
+# Per-state stock change feed for /retailer/<id>/stock-events; STOCK_EVENTS_URL=redis://... shares it between workers.
+# Streams per worker default to half the gunicorn threads (gunicorn.conf.py) so the API keeps the rest.
+stock_events = StockEvents.from_url(
+    os.environ.get("STOCK_EVENTS_URL"),
+    max_streams=int(os.environ.get(
+        "STOCK_EVENTS_MAX_STREAMS", str(max(1, int(os.environ.get("GUNICORN_THREADS", "8")) // 2)),
+    )),
+)
+
 # ---------------- Load Market Data ----------------
-with open("market_rates.json", "r") as file:
-    market_data = json.load(file)
+# Normalized (state, category, product) -> rate table, reloaded when the file changes
+market_rates = MarketRateIndex(os.environ.get("MARKET_RATES_PATH", MARKET_RATES_PATH))
 # ---------------- Farmer Model ----------------
 class Farmer(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -56,6 +166,11 @@ class Farmer(db.Model):
     City = db.Column(db.String(120))
     aadhar = db.Column(db.String(20))
 
+    __table_args__ = (
+        Index("uq_farmer_mobilenumber", "mobilenumber", unique=True),
+        Index("ix_farmer_state", "State"),
+    )
+
     def to_dict(self):
         return {
             "id": self.id,
@@ -79,6 +194,10 @@ class Retailer(db.Model):
     Gstin = db.Column(db.String(20))
     Pan = db.Column(db.String(20))
 
+    __table_args__ = (
+        Index("uq_retailer_mobilenumber", "mobilenumber", unique=True),
+    )
+
     def to_dict(self):
         return {
             "aadhar": self.aadhar,
@@ -109,6 +228,10 @@ class Product(db.Model):
     __table_args__ = (
         CheckConstraint("price >= 0", name="ck_product_price_nonneg"),
         CheckConstraint("quantity >= 0", name="ck_product_qty_nonneg"),
+        # Farmer listings filtered by stock status and ordered by last update
+        Index("ix_products_farmer_stock_updated", "farmer_id", "in_stock", "updated_at"),
+        # Product search, after the query is resolved to exact names
+        Index("ix_products_name_stock", "name", "in_stock"),
     )
 
     def to_dict(self):
@@ -134,6 +257,13 @@ class Purchase(db.Model):
     payment_amount = db.Column(db.Float, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
 
+    __table_args__ = (
+        # Retailer history and monthly windows
+        Index("ix_purchase_retailer_created", "retailer_id", "created_at"),
+        # Per-product sales and per-farmer date-range reports
+        Index("ix_purchase_product_created", "product_id", "created_at"),
+    )
+
     def to_dict(self):
         return {
             "id": self.id,
@@ -145,18 +275,229 @@ class Purchase(db.Model):
             "created_at": self.created_at.isoformat(),
         }
 
+# ---------------- Farmer Sales Rollup Model ----------------
+# One row per (farmer, category), kept in step with Product/Purchase writes so
+# the analytics endpoint never has to aggregate raw purchases.
+class FarmerSalesRollup(db.Model):
+    __tablename__ = "farmer_sales_rollup"
+    farmer_id = db.Column(db.Integer, db.ForeignKey("farmer.id"), primary_key=True)
+    category = db.Column(db.String(80), primary_key=True)
+    present_stock = db.Column(db.Integer, nullable=False, default=0)
+    units_sold = db.Column(db.Integer, nullable=False, default=0)
+    revenue = db.Column(db.Float, nullable=False, default=0.0)
+
+    def to_dict(self):
+        return {
+            "farmer_id": self.farmer_id,
+            "category": self.category,
+            "present_stock": self.present_stock,
+            "units_sold": self.units_sold,
+            "revenue": self.revenue,
+        }
+
+# Farmers whose rollup rows hold all of their sales: set by rebuild-sales-rollup
+# and at registration. Rows of unmarked farmers only hold the sales since the
+# rollup started being maintained, so analytics aggregates raw rows for them.
+class SalesRollupBackfill(db.Model):
+    __tablename__ = "sales_rollup_backfills"
+    farmer_id = db.Column(db.Integer, db.ForeignKey("farmer.id"), primary_key=True)
+    backfilled_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+# ---------------- Retailer Monthly Purchases Model ----------------
+# Per-retailer calendar-month totals, maintained on purchase for summary views.
+class RetailerMonthlyPurchases(db.Model):
+    __tablename__ = "retailer_monthly_purchases"
+    retailer_id = db.Column(db.String(20), db.ForeignKey("retailer.aadhar"), primary_key=True)
+    month = db.Column(db.Date, primary_key=True)  # first day of the month
+    order_count = db.Column(db.Integer, nullable=False, default=0)
+    units = db.Column(db.Integer, nullable=False, default=0)
+    amount = db.Column(db.Float, nullable=False, default=0.0)
+
+    def to_dict(self):
+        return {
+            "month": self.month.strftime("%Y-%m"),
+            "order_count": self.order_count,
+            "units": self.units,
+            "amount": self.amount,
+        }
+
+# ---------------- Daily Product Sales Model ----------------
+# Units and revenue per (farmer, product, day), maintained on purchase so
+# trend charts read one row per product per day instead of every Purchase.
+class DailyProductSales(db.Model):
+    __tablename__ = "daily_product_sales"
+    farmer_id = db.Column(db.Integer, db.ForeignKey("farmer.id"), primary_key=True)
+    product_id = db.Column(db.Integer, db.ForeignKey("products.id"), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    units = db.Column(db.Integer, nullable=False, default=0)
+    revenue = db.Column(db.Float, nullable=False, default=0.0)
+
+    __table_args__ = (
+        # Farmer-wide series: one range scan over the farmer's days
+        Index("ix_daily_product_sales_farmer_day", "farmer_id", "day"),
+    )
+
+# ---------------- Data Version Model ----------------
+# A counter per scope ("farmer:<id>", "retailer:<id>", "product_names") bumped
+# in the same transaction as every write that changes what the scope's list
+# endpoints return. ETags are built from these instead of hashing bodies.
+class DataVersion(db.Model):
+    __tablename__ = "data_versions"
+    scope = db.Column(db.String(80), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
 # Farmer has many Products
 Farmer.products = relationship("Product", backref="farmer", cascade="all, delete-orphan")
-with app.app_context():
+
+
+@api.cli.command("create-schema")
+def create_schema():
+    """Create any missing tables and indexes (new databases; migrations cover existing ones)."""
     db.create_all()
+    click.echo(f"Schema ready on {db.engine.url.render_as_string(hide_password=True)}.")
+
+
+# ---------------- Read Path ----------------
+# List endpoints select just the columns they return and build the response
+# dicts from plain rows, skipping ORM hydration and the identity map. Dates are
+# left as datetime objects for fast_json to encode.
+PRODUCT_COLUMNS = (
+    Product.id, Product.farmer_id, Product.name, Product.category, Product.price,
+    Product.quantity, Product.in_stock, Product.created_at, Product.updated_at,
+)
+
+
+def product_row(row):
+    # Same shape as Product.to_dict()
+    return {
+        "id": row.id,
+        "farmer_id": row.farmer_id,
+        "name": row.name,
+        "category": row.category,
+        "price": row.price,
+        "quantity": row.quantity,
+        "in_stock": row.in_stock,
+        "created_at": row.created_at,
+        "updated_at": row.updated_at,
+    }
+
+
+FARMER_TRANSACTION_COLUMNS = (
+    Purchase.id, Purchase.product_id, Product.name, Product.category, Purchase.quantity,
+    Purchase.payment_type, Purchase.payment_amount, Purchase.created_at,
+)
+
+
+def farmer_transaction_row(row):
+    return {
+        "transaction_id": row.id,
+        "product_id": row.product_id,
+        "product_name": row.name,
+        "category": row.category,
+        "quantity_sold": row.quantity,
+        "payment_type": row.payment_type,
+        "payment_amount": row.payment_amount,
+        "sold_date": row.created_at,
+    }
+
+
+FARMER_TRANSACTION_FIELDS = (
+    "transaction_id", "product_id", "product_name", "category", "quantity_sold",
+    "payment_type", "payment_amount", "sold_date",
+)
+
+
+CATALOG_COLUMNS = (
+    Product.id,
+    Product.name.label("product_name"),
+    Product.category,
+    Product.price,
+    Product.quantity,
+    Farmer.farmername.label("farmer_name"),
+)
+
+
+def catalog_row(product):
+    return {
+        "id": product.id,  # ✅ Added ID
+        "product_name": product.product_name,
+        "category": product.category,
+        "price": product.price,
+        "quantity": product.quantity,
+        "farmer_name": product.farmer_name,
+    }
+
+
+def product_status_filters(status):
+    # ?status=active|soldout on a farmer's product list
+    if status == "active":
+        return (Product.in_stock.is_(True), Product.quantity > 0)
+    if status == "soldout":
+        return (Product.in_stock.is_(False),)
+    return ()
+
+
+RETAILER_TRANSACTION_COLUMNS = (
+    Purchase.id, Product.name, Product.category, Farmer.farmername, Purchase.quantity,
+    Purchase.payment_type, Purchase.payment_amount, Purchase.created_at,
+)
+
+
+def retailer_transaction_row(row):
+    return {
+        "order_id": row.id,
+        "product_name": row.name,
+        "category": row.category,
+        "farmer_name": row.farmername,
+        "quantity": row.quantity,
+        "payment_type": row.payment_type,
+        "payment_amount": row.payment_amount,
+        "purchase_date": row.created_at.date(),
+    }
+
+
+RETAILER_TRANSACTION_FIELDS = (
+    "order_id", "product_name", "category", "farmer_name", "quantity",
+    "payment_type", "payment_amount", "purchase_date",
+)
+
 
 # ---------------- API Routes ----------------
-@app.route('/')
+@api.route('/')
+@admission.exempt
 def index():
     return "✅ API is running with MySQL!"
 
+
+@api.route('/diagnostics', methods=['GET'])
+@admission.exempt
+def diagnostics():
+    return jsonify({
+        "identity_cache": {
+            "farmers": farmer_identities.stats(),
+            "retailers": retailer_identities.stats(),
+        },
+        "catalog_cache": {"hits": catalog_cache.hits, "misses": catalog_cache.misses},
+        "report_jobs": report_jobs.stats(),
+        "db_pool": pool_status(db.engine),
+        "db_replica": dict(
+            replica_router.stats(),
+            pool=pool_status(db.engines[REPLICA_BIND]) if REPLICA_BIND in db.engines else None,
+        ),
+        "json_encoder": json_backend(),
+        "search_index": search_index.stats(),
+        "stock_events": stock_events.stats(),
+        "admission": admission.stats(),
+        "compression": compression.stats(),
+    }), 200
+
+@api.route('/metrics', methods=['GET'])
+@admission.exempt
+def metrics():
+    return request_metrics.render() + admission.render(), 200, {"Content-Type": "text/plain; version=0.0.4; charset=utf-8"}
+
 # ---------------- Farmer APIs ----------------
-@app.route('/create-farmer', methods=['POST'])
+@api.route('/create-farmer', methods=['POST'])
 def create_farmer():
     data = request.json
     required_fields = ['farmername', 'mobilenumber', 'password', 'gender', 'State', 'City', 'aadhar']
@@ -165,11 +506,19 @@ def create_farmer():
 
     farmer = Farmer(**data)
     db.session.add(farmer)
-    db.session.commit()
+    try:
+        db.session.flush()
+        # No sales yet, so the rollup is complete from the farmer's first write
+        db.session.add(SalesRollupBackfill(farmer_id=farmer.id))
+        db.session.commit()
+    except IntegrityError:
+        # uq_farmer_mobilenumber: the number is already registered
+        db.session.rollback()
+        return jsonify({"error": "A farmer with this mobile number is already registered"}), 409
     return jsonify(farmer.to_dict()), 201
 
 
-@app.route('/login-farmer', methods=['POST'])
+@api.route('/login-farmer', methods=['POST'])
 def login_farmer():
     data = request.json
     if not data or 'mobilenumber' not in data or 'password' not in data:
@@ -187,7 +536,7 @@ def login_farmer():
 
 
 # ---------------- Retailer APIs ----------------
-@app.route('/create-retailer', methods=['POST'])
+@api.route('/create-retailer', methods=['POST'])
 def create_retailer():
     data = request.json
     required_fields = ['aadhar', 'enterprise_name', 'owner_name', 'mobilenumber', 'password', 'State', 'City', 'Gstin', 'Pan']
@@ -196,11 +545,16 @@ def create_retailer():
 
     retailer = Retailer(**data)
     db.session.add(retailer)
-    db.session.commit()
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # The aadhar primary key or uq_retailer_mobilenumber is already taken
+        db.session.rollback()
+        return jsonify({"error": "A retailer with this aadhar or mobile number is already registered"}), 409
     return jsonify(retailer.to_dict()), 201
 
 
-@app.route('/login-retailer', methods=['POST'])
+@api.route('/login-retailer', methods=['POST'])
 def login_retailer():
     data = request.json
     if not data or 'mobilenumber' not in data or 'password' not in data:
@@ -218,136 +572,807 @@ def login_retailer():
 
 
 # ---------------- Utility ----------------
+# Existence checks go through the identity caches; ORM events below drop an
+# entry whenever its row is written so later requests reload it: at flush, so
+# the writing transaction sees its own change, and again after commit, since
+# another thread may have reloaded the old row in between.
+IDENTITY_CACHE_SIZE = int(os.environ.get("IDENTITY_CACHE_SIZE", "10000"))
+IDENTITY_CACHE_TTL = int(os.environ.get("IDENTITY_CACHE_TTL", "60"))
+farmer_identities = TTLCache(IDENTITY_CACHE_SIZE, IDENTITY_CACHE_TTL)
+retailer_identities = TTLCache(IDENTITY_CACHE_SIZE, IDENTITY_CACHE_TTL)
+
+
+def _load_farmer_identity(farmer_id):
+    row = (
+        db.session.query(Farmer.id, Farmer.farmername, Farmer.State)
+        .filter(Farmer.id == farmer_id)
+        .first()
+    )
+    return FarmerIdentity(*row) if row else None
+
+
+def _load_retailer_identity(retailer_id):
+    row = (
+        db.session.query(Retailer.aadhar, Retailer.enterprise_name, Retailer.State)
+        .filter(Retailer.aadhar == retailer_id)
+        .first()
+    )
+    return RetailerIdentity(*row) if row else None
+
+
+def find_farmer(farmer_id):
+    """Cached (id, farmername, State) for a farmer, or None if it does not exist."""
+    if farmer_id is None:
+        return None
+    return farmer_identities.get_or_load(farmer_id, _load_farmer_identity)
+
+
+def find_retailer(retailer_id):
+    """Cached (aadhar, enterprise_name, State) for a retailer, or None if it does not exist."""
+    if retailer_id is None:
+        return None
+    return retailer_identities.get_or_load(str(retailer_id), _load_retailer_identity)
+
+
+@event.listens_for(Farmer, "after_insert")
+@event.listens_for(Farmer, "after_update")
+@event.listens_for(Farmer, "after_delete")
+def _invalidate_farmer_identity(mapper, connection, target):
+    _invalidate_identity(object_session(target), farmer_identities, target.id)
+
+
+@event.listens_for(Retailer, "after_insert")
+@event.listens_for(Retailer, "after_update")
+@event.listens_for(Retailer, "after_delete")
+def _invalidate_retailer_identity(mapper, connection, target):
+    _invalidate_identity(object_session(target), retailer_identities, target.aadhar)
+
+
+def _invalidate_identity(session, cache, key):
+    cache.invalidate(key)
+    session.info.setdefault("identity_invalidations", set()).add((cache, key))
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _invalidate_identities_after_commit(session):
+    for cache, key in session.info.pop("identity_invalidations", ()):
+        cache.invalidate(key)
+
+
+@event.listens_for(RoutingSession, "after_soft_rollback")
+def _forget_identity_invalidations(session, previous_transaction):
+    # The old rows stand, and whatever was reloaded since the flush is current
+    session.info.pop("identity_invalidations", None)
+
+
 def require_farmer(farmer_id: int):
-    farmer = Farmer.query.get(farmer_id)
+    farmer = find_farmer(farmer_id)
     if not farmer:
         abort(404, description="Farmer not found")
     return farmer
 
 
+def bump_counters(table, keys, deltas):
+    """Add ``deltas`` to the counter row identified by ``keys`` inside the caller's transaction."""
+    deltas = {col: delta for col, delta in deltas.items() if delta}
+    if deltas:
+        bump_counters_many(table, tuple(keys), [{**keys, **deltas}])
+
+
+def bump_counters_many(table, key_columns, rows):
+    """Add the deltas in ``rows`` (dicts of key and delta columns) with one upsert statement.
+
+    INSERT ... ON DUPLICATE KEY UPDATE on MySQL, ON CONFLICT DO UPDATE on
+    SQLite and PostgreSQL: a missing row is created by the same statement, so
+    there is no UPDATE-miss-then-INSERT window for gap locks to deadlock in.
+    Rows go in key order so concurrent writers lock them in the same order.
+    """
+    rows = sorted(rows, key=lambda row: tuple(row[col] for col in key_columns))
+    if not rows:
+        return
+    deltas = [col for col in rows[0] if col not in key_columns]
+    dialect = db.session.get_bind().dialect.name
+    if dialect == "mysql":
+        stmt = mysql.insert(table).values(rows)
+        stmt = stmt.on_duplicate_key_update({col: table.c[col] + stmt.inserted[col] for col in deltas})
+    elif dialect in ("sqlite", "postgresql"):
+        stmt = (sqlite if dialect == "sqlite" else postgresql).insert(table).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(key_columns),
+            set_={col: table.c[col] + stmt.excluded[col] for col in deltas},
+        )
+    else:
+        raise NotImplementedError(f"Counter upserts are not implemented for {dialect}")
+    db.session.execute(stmt)
+
+
+def bump_sales_rollup(farmer_id, category, present_stock=0, units_sold=0, revenue=0.0):
+    """Apply deltas to a farmer's rollup row inside the caller's transaction."""
+    bump_counters(
+        FarmerSalesRollup.__table__,
+        {"farmer_id": farmer_id, "category": category},
+        {"present_stock": present_stock, "units_sold": units_sold, "revenue": revenue},
+    )
+
+
+def bump_retailer_monthly(retailer_id, when, quantity, amount, orders=1):
+    bump_counters(
+        RetailerMonthlyPurchases.__table__,
+        {"retailer_id": retailer_id, "month": month_start(when)},
+        {"order_count": orders, "units": quantity, "amount": amount},
+    )
+
+
+def bump_data_versions(*scopes):
+    """Bump every scope's version with one upsert; call once per transaction with all its scopes."""
+    bump_counters_many(DataVersion.__table__, ("scope",), [{"scope": scope, "version": 1} for scope in set(scopes)])
+
+
+def list_etag(*scopes):
+    """Strong ETag for a list response: the data versions of ``scopes`` plus the URL that shaped it.
+
+    Read before the rows, so a write landing in between can only leave the
+    tag older than the body (a spare 200 later), never newer.
+    """
+    versions = dict(
+        db.session.query(DataVersion.scope, DataVersion.version).filter(DataVersion.scope.in_(scopes))
+    )
+    return versions_etag(versions, scopes, request.full_path)
+
+
+def versions_etag(versions, scopes, full_path):
+    """The list ETag from already-read ``versions`` (scope -> version); shared with asgi.py."""
+    raw = ";".join(f"{scope}={versions.get(scope, 0)}" for scope in scopes)
+    return hashlib.sha1(f"{raw};{full_path}".encode()).hexdigest()[:24]
+
+
+def not_modified(etag):
+    response = make_response(b"", 304)
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+def bump_daily_sales(farmer_id, product_id, when, units, revenue):
+    bump_counters(
+        DailyProductSales.__table__,
+        {"farmer_id": farmer_id, "product_id": product_id, "day": when.date()},
+        {"units": units, "revenue": revenue},
+    )
+
+
+def compute_sales_rollup(farmer_id=None):
+    """Aggregate (farmer_id, category) -> [present_stock, units_sold, revenue] from raw rows."""
+    stock_q = db.session.query(
+        Product.farmer_id, Product.category, func.coalesce(func.sum(Product.quantity), 0)
+    ).group_by(Product.farmer_id, Product.category)
+    sold_q = (
+        db.session.query(
+            Product.farmer_id,
+            Product.category,
+            func.coalesce(func.sum(Purchase.quantity), 0),
+            func.coalesce(func.sum(Purchase.payment_amount), 0.0),
+        )
+        .join(Product, Purchase.product_id == Product.id)
+        .group_by(Product.farmer_id, Product.category)
+    )
+    if farmer_id is not None:
+        stock_q = stock_q.filter(Product.farmer_id == farmer_id)
+        sold_q = sold_q.filter(Product.farmer_id == farmer_id)
+
+    rollup = {}
+    for fid, category, present in stock_q:
+        rollup[(fid, category)] = [int(present), 0, 0.0]
+    for fid, category, units, revenue in sold_q:
+        row = rollup.setdefault((fid, category), [0, 0, 0.0])
+        row[1] = int(units)
+        row[2] = float(revenue)
+    return rollup
+
+
+@api.cli.command("rebuild-sales-rollup")
+@click.option("--farmer-id", type=int, default=None, help="Only rebuild this farmer's rows.")
+def rebuild_sales_rollup(farmer_id):
+    """Backfill farmer_sales_rollup from the existing Product and Purchase rows."""
+    # Delete before aggregating, in one transaction: the DELETE holds the rows
+    # (and on MySQL the gaps a new category would go in; on SQLite the write
+    # lock) until commit, so a purchase either commits before the aggregate
+    # reads it or waits and adds its delta on top of the rebuilt row.
+    delete = FarmerSalesRollup.__table__.delete()
+    unmark = SalesRollupBackfill.__table__.delete()
+    farmers = select(Farmer.id, literal(datetime.utcnow()))
+    if farmer_id is not None:
+        delete = delete.where(FarmerSalesRollup.farmer_id == farmer_id)
+        unmark = unmark.where(SalesRollupBackfill.farmer_id == farmer_id)
+        farmers = farmers.where(Farmer.id == farmer_id)
+    db.session.execute(delete)
+    rollup = compute_sales_rollup(farmer_id)
+    rows = [
+        {
+            "farmer_id": fid,
+            "category": category,
+            "present_stock": present,
+            "units_sold": units,
+            "revenue": revenue,
+        }
+        for (fid, category), (present, units, revenue) in rollup.items()
+    ]
+    if rows:
+        db.session.execute(FarmerSalesRollup.__table__.insert(), rows)
+    db.session.execute(unmark)
+    db.session.execute(SalesRollupBackfill.__table__.insert().from_select(["farmer_id", "backfilled_at"], farmers))
+    db.session.commit()
+    click.echo(f"Rebuilt {len(rows)} farmer_sales_rollup rows.")
+
+
+def month_start(when):
+    return date(when.year, when.month, 1)
+
+
+def next_month(day):
+    return date(day.year + day.month // 12, day.month % 12 + 1, 1)
+
+
+def parse_date_range(args, default_month=None):
+    """Turn ``?month=YYYY-MM`` or ``?from=YYYY-MM-DD&to=YYYY-MM-DD`` into a half-open
+    ``[start, end)`` datetime range that an index on the timestamp can serve."""
+    month = args.get("month")
+    from_date = args.get("from")
+    to_date = args.get("to")
+    try:
+        if month:
+            start = datetime.strptime(month, "%Y-%m").date()
+            end = next_month(start)
+        elif from_date or to_date:
+            if not (from_date and to_date):
+                abort(400, description="Both from and to are required.")
+            start = datetime.strptime(from_date, "%Y-%m-%d").date()
+            end = datetime.strptime(to_date, "%Y-%m-%d").date() + timedelta(days=1)
+        elif default_month is not None:
+            start = month_start(default_month)
+            end = next_month(start)
+        else:
+            return None, None
+    except ValueError:
+        abort(400, description="Invalid date format. Use YYYY-MM for month and YYYY-MM-DD for from/to.")
+    if start >= end:
+        abort(400, description="from cannot be later than to.")
+    return datetime.combine(start, datetime.min.time()), datetime.combine(end, datetime.min.time())
+
+
+@api.cli.command("rebuild-retailer-monthly")
+def rebuild_retailer_monthly():
+    """Backfill retailer_monthly_purchases from the existing Purchase rows."""
+    totals = {}
+    rows = db.session.query(
+        Purchase.retailer_id, Purchase.created_at, Purchase.quantity, Purchase.payment_amount
+    ).yield_per(5000)
+    for retailer_id, created_at, quantity, amount in rows:
+        row = totals.setdefault((retailer_id, month_start(created_at)), [0, 0, 0.0])
+        row[0] += 1
+        row[1] += quantity
+        row[2] += amount
+    db.session.execute(RetailerMonthlyPurchases.__table__.delete())
+    if totals:
+        db.session.execute(RetailerMonthlyPurchases.__table__.insert(), [
+            {"retailer_id": rid, "month": month, "order_count": n, "units": units, "amount": amount}
+            for (rid, month), (n, units, amount) in totals.items()
+        ])
+    db.session.commit()
+    click.echo(f"Rebuilt {len(totals)} retailer_monthly_purchases rows.")
+
+
+REBUILD_PRODUCT_BATCH = 200
+
+
+@api.cli.command("rebuild-daily-sales")
+@click.option("--farmer-id", type=int, default=None, help="Only rebuild this farmer's rows.")
+def rebuild_daily_sales(farmer_id):
+    """Backfill daily_product_sales from the existing Purchase rows."""
+    day = date_bucket(Purchase.created_at, "day")
+    q = (
+        db.session.query(
+            Product.farmer_id, Purchase.product_id, day,
+            func.sum(Purchase.quantity), func.sum(Purchase.payment_amount),
+        )
+        .join(Product, Purchase.product_id == Product.id)
+        .group_by(Product.farmer_id, Purchase.product_id, day)
+    )
+    delete = DailyProductSales.__table__.delete()
+    if farmer_id is not None:
+        q = q.filter(Product.farmer_id == farmer_id)
+        delete = delete.where(DailyProductSales.farmer_id == farmer_id)
+    db.session.execute(delete)
+    # A few hundred products' groups at a time keeps memory flat over millions
+    # of purchases, on the one connection (a second, streaming one would hold
+    # SQLite's read lock against these inserts)
+    products = db.session.query(Product.id).order_by(Product.id)
+    if farmer_id is not None:
+        products = products.filter(Product.farmer_id == farmer_id)
+    rebuilt, last_id = 0, 0
+    while True:
+        ids = [pid for (pid,) in products.filter(Product.id > last_id).limit(REBUILD_PRODUCT_BATCH)]
+        if not ids:
+            break
+        last_id = ids[-1]
+        rows = [
+            {
+                "farmer_id": fid,
+                "product_id": pid,
+                "day": date.fromisoformat(bucket),
+                "units": int(units),
+                "revenue": float(revenue),
+            }
+            for fid, pid, bucket, units, revenue in q.filter(Purchase.product_id.in_(ids))
+        ]
+        if rows:
+            db.session.execute(DailyProductSales.__table__.insert(), rows)
+        rebuilt += len(rows)
+    db.session.commit()
+    click.echo(f"Rebuilt {rebuilt} daily_product_sales rows.")
+
+
+def publish_stock_event(state, event_type, **payload):
+    # Called after commit: a broker outage must not turn a saved write into an error
+    try:
+        stock_events.publish(state, event_type, **payload)
+    except Exception as e:
+        current_app.logger.warning("Could not publish %s for %s: %s", event_type, state, e)
+
+
+def catalog_event_row(product, farmer_name):
+    # Same shape as an available-products row
+    return {
+        "id": product.id,
+        "product_name": product.name,
+        "category": product.category,
+        "price": product.price,
+        "quantity": product.quantity,
+        "farmer_name": farmer_name,
+    }
+
+
+def stock_levels(product_ids):
+    """Current ``{id: (quantity, in_stock)}``, read inside the caller's transaction."""
+    return {
+        pid: (quantity, in_stock)
+        for pid, quantity, in_stock in db.session.query(Product.id, Product.quantity, Product.in_stock)
+        .filter(Product.id.in_(list(product_ids)))
+    }
+
+
+def publish_stock_levels(states, levels):
+    for pid, (quantity, in_stock) in levels.items():
+        state = states[pid]
+        publish_stock_event(state, "quantity_changed", id=pid, quantity=quantity, in_stock=in_stock)
+        if not in_stock:
+            publish_stock_event(state, "sold_out", id=pid)
+
+
 # ---------------- Product APIs ----------------
-@app.route("/farmers/<int:farmer_id>/products", methods=["POST"])
-def create_product(farmer_id):
-    require_farmer(farmer_id)
-    data = request.get_json() or {}
+MAX_PRODUCT_QUANTITY = 2**31 - 1  # INT column
+
+
+# Field parsers shared by create, bulk upload and update; each raises ValueError
+# with the client-facing message. Checked here so a bad value fails with a 400
+# (or, in a bulk upload, alone) instead of at flush as a database error.
+def parse_price(value):
+    try:
+        price = float(value)
+    except (TypeError, ValueError, OverflowError):
+        raise ValueError("price must be number")
+    if not math.isfinite(price):
+        raise ValueError("price must be a finite number")
+    if price < 0:
+        raise ValueError("price cannot be negative")
+    return price
+
+
+def parse_quantity(value):
+    try:
+        quantity = int(value)
+    except (TypeError, ValueError, OverflowError):
+        raise ValueError("quantity must be integer")
+    if quantity < 0:
+        raise ValueError("quantity cannot be negative")
+    if quantity > MAX_PRODUCT_QUANTITY:
+        raise ValueError(f"quantity cannot exceed {MAX_PRODUCT_QUANTITY}")
+    return quantity
+
+
+def parse_product_text(field, value):
+    value = str(value).strip()
+    limit = Product.__table__.c[field].type.length
+    if not value:
+        raise ValueError(f"{field} cannot be blank")
+    if len(value) > limit:
+        raise ValueError(f"{field} cannot be longer than {limit} characters")
+    return value
+
+
+def parse_new_product(data):
+    """Validate a new product payload; raises ValueError with the client-facing message."""
     required = ["name", "category", "price", "quantity"]
-    if not all(k in data for k in required):
-        abort(400, description=f"Missing fields: {', '.join(required)}")
+    if not all(data.get(k) not in (None, "") for k in required):
+        raise ValueError(f"Missing fields: {', '.join(required)}")
+
+    quantity = parse_quantity(data["quantity"])
+    return {
+        "name": parse_product_text("name", data["name"]),
+        "category": parse_product_text("category", data["category"]),
+        "price": parse_price(data["price"]),
+        "quantity": quantity,
+        "in_stock": quantity > 0,
+    }
+
 
+@api.route("/farmers/<int:farmer_id>/products", methods=["POST"])
+def create_product(farmer_id):
+    farmer = require_farmer(farmer_id)
+    data = request.get_json() or {}
     try:
-        price = float(data["price"])
-        quantity = int(data["quantity"])
-    except (TypeError, ValueError):
-        abort(400, description="price must be number; quantity must be integer")
+        fields = parse_new_product(data)
+    except ValueError as e:
+        abort(400, description=str(e))
 
-    prod = Product(
-        farmer_id=farmer_id,
-        name=data["name"].strip(),
-        category=data["category"].strip(),
-        price=price,
-        quantity=quantity,
-        in_stock=quantity > 0,
-    )
+    prod = Product(farmer_id=farmer_id, **fields)
     db.session.add(prod)
+    bump_sales_rollup(farmer_id, prod.category, present_stock=prod.quantity)
+    bump_data_versions(f"farmer:{farmer_id}")
     db.session.commit()
+    catalog_cache.invalidate(farmer.State)
+    search_index.add(farmer.State, prod.name, prod.category)
+    if prod.in_stock:
+        publish_stock_event(farmer.State, "product_created", **catalog_event_row(prod, farmer.farmername))
     return jsonify(prod.to_dict()), 201
 
 
-@app.route("/farmers/<int:farmer_id>/products", methods=["GET"])
+BULK_INSERT_CHUNK = 1000
+MAX_BULK_ERRORS = 1000
+
+
+@api.route("/farmers/<int:farmer_id>/products/bulk", methods=["POST"])
+def bulk_create_products(farmer_id):
+    # Accepts a JSON array of product objects, or a CSV body (Content-Type: text/csv)
+    # with a name,category,price,quantity header that is read as a stream.
+    farmer = require_farmer(farmer_id)
+    if request.mimetype in ("text/csv", "application/csv"):
+        rows = csv.DictReader(io.TextIOWrapper(request.stream, encoding="utf-8-sig", newline=""))
+    else:
+        rows = request.get_json(silent=True)
+        if not isinstance(rows, list):
+            abort(400, description="Body must be a JSON array of products or a CSV file")
+
+    table = Product.__table__
+    inserted = 0
+    errors = []
+    chunk = []
+
+    def flush(chunk):
+        # One executemany plus one rollup update per category, committed together
+        now = datetime.utcnow()
+        stock = {}
+        for _, fields in chunk:
+            stock[fields["category"]] = stock.get(fields["category"], 0) + fields["quantity"]
+        try:
+            db.session.execute(table.insert(), [
+                {"farmer_id": farmer_id, "created_at": now, "updated_at": now, **fields}
+                for _, fields in chunk
+            ])
+            for category, quantity in stock.items():
+                bump_sales_rollup(farmer_id, category, present_stock=quantity)
+            bump_data_versions(f"farmer:{farmer_id}")
+            db.session.commit()
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            if len(chunk) > 1:
+                # Find the rows the database refuses: retry the chunk one row at a time
+                current_app.logger.warning("Bulk product chunk failed, retrying row by row: %s", e)
+                return sum(flush([row]) for row in chunk)
+            current_app.logger.exception("Bulk product insert failed: %s", e)
+            errors.append({"row": chunk[0][0], "error": "Database error"})
+            return 0
+        for name, category in {(fields["name"], fields["category"]) for _, fields in chunk}:
+            search_index.add(farmer.State, name, category)
+        return len(chunk)
+
+    for number, data in enumerate(rows, start=1):
+        try:
+            if not isinstance(data, dict):
+                raise ValueError("Each product must be an object")
+            fields = parse_new_product(data)
+        except ValueError as e:
+            errors.append({"row": number, "error": str(e)})
+            continue
+        chunk.append((number, fields))
+        if len(chunk) >= BULK_INSERT_CHUNK:
+            inserted += flush(chunk)
+            chunk = []
+    if chunk:
+        inserted += flush(chunk)
+
+    if inserted:
+        catalog_cache.invalidate(farmer.State)
+        # Too many rows to announce one by one: tell subscribers to refetch the catalog
+        publish_stock_event(farmer.State, "reset", reason="bulk_insert", inserted=inserted)
+    if not inserted and not errors:
+        abort(400, description="No products in upload")
+
+    return jsonify({
+        "inserted": inserted,
+        "failed": len(errors),
+        "errors": errors[:MAX_BULK_ERRORS],
+    }), 201 if inserted else 400
+
+
+@api.route("/farmers/<int:farmer_id>/products", methods=["GET"])
 def list_products(farmer_id):
     require_farmer(farmer_id)
+    etag = list_etag(f"farmer:{farmer_id}")
+    if etag_matches(etag):
+        return not_modified(etag)
     status = request.args.get("status")
-    q = Product.query.filter_by(farmer_id=farmer_id)
-    if status == "active":
-        q = q.filter(Product.in_stock.is_(True), Product.quantity > 0)
-    elif status == "soldout":
-        q = q.filter(Product.in_stock.is_(False))
-    items = [p.to_dict() for p in q.order_by(Product.updated_at.desc()).all()]
-    return jsonify(items), 200
+    q = db.session.query(*PRODUCT_COLUMNS).filter(Product.farmer_id == farmer_id, *product_status_filters(status))
+    return paginated_response(
+        q,
+        keys=(Product.updated_at, Product.id),
+        row_key=lambda row: (row.updated_at, row.id),
+        serialize=product_row,
+        descending=True,
+        etag=etag,
+    )
 
 
-@app.route("/farmers/<int:farmer_id>/products/<int:pid>", methods=["PATCH"])
+@api.route("/farmers/<int:farmer_id>/products/<int:pid>", methods=["PATCH"])
 def update_product(farmer_id, pid):
-    require_farmer(farmer_id)
+    farmer = require_farmer(farmer_id)
     prod = Product.query.filter_by(id=pid, farmer_id=farmer_id).first()
     if not prod:
         abort(404, description="Product not found")
 
     data = request.get_json() or {}
-    if "name" in data:
-        prod.name = str(data["name"]).strip()
-    if "category" in data:
-        prod.category = str(data["category"]).strip()
-    if "price" in data:
-        try:
-            prod.price = float(data["price"])
-        except (TypeError, ValueError):
-            abort(400, description="price must be number")
-    if "quantity" in data:
-        try:
-            qty = int(data["quantity"])
-        except (TypeError, ValueError):
-            abort(400, description="quantity must be integer")
-        if qty < 0:
-            abort(400, description="quantity cannot be negative")
-        prod.quantity = qty
-        prod.in_stock = qty > 0
+    old_category, old_quantity = prod.category, prod.quantity
+    old_name, old_price, old_in_stock = prod.name, prod.price, prod.in_stock
+    try:
+        if "name" in data:
+            prod.name = parse_product_text("name", data["name"])
+        if "category" in data:
+            prod.category = parse_product_text("category", data["category"])
+        if "price" in data:
+            prod.price = parse_price(data["price"])
+        if "quantity" in data:
+            prod.quantity = parse_quantity(data["quantity"])
+            prod.in_stock = prod.quantity > 0
+    except ValueError as e:
+        abort(400, description=str(e))
     if "in_stock" in data:
         prod.in_stock = bool(data["in_stock"])
 
+    # Keep the rollup in step: stock moves with the product, and past sales
+    # follow it to its new category just like the live aggregation would.
+    if prod.category != old_category:
+        units, revenue = (
+            db.session.query(
+                func.coalesce(func.sum(Purchase.quantity), 0),
+                func.coalesce(func.sum(Purchase.payment_amount), 0.0),
+            )
+            .filter(Purchase.product_id == prod.id)
+            .one()
+        )
+        bump_sales_rollup(farmer_id, old_category, -old_quantity, -int(units), -float(revenue))
+        bump_sales_rollup(farmer_id, prod.category, prod.quantity, int(units), float(revenue))
+    else:
+        bump_sales_rollup(farmer_id, prod.category, present_stock=prod.quantity - old_quantity)
+    # Names and categories also show up in retailers' purchase histories
+    renamed = (prod.name, prod.category) != (old_name, old_category)
+    bump_data_versions(f"farmer:{farmer_id}", *(["product_names"] if renamed else []))
+
     db.session.commit()
+    catalog_cache.invalidate(farmer.State)
+    search_index.add(farmer.State, prod.name, prod.category)
+
+    if prod.in_stock and (not old_in_stock or renamed):
+        # Back in the catalog, or renamed/recategorised: clients upsert the whole row
+        publish_stock_event(farmer.State, "product_updated", **catalog_event_row(prod, farmer.farmername))
+    elif prod.in_stock:
+        if prod.price != old_price:
+            publish_stock_event(farmer.State, "price_changed", id=prod.id, price=prod.price)
+        if prod.quantity != old_quantity:
+            publish_stock_event(farmer.State, "quantity_changed", id=prod.id, quantity=prod.quantity, in_stock=True)
+    elif old_in_stock:
+        publish_stock_event(farmer.State, "sold_out", id=prod.id)
     return jsonify(prod.to_dict()), 200
 
 
-@app.route("/farmers/<int:farmer_id>/products/<int:pid>/soldout", methods=["POST"])
+@api.route("/farmers/<int:farmer_id>/products/<int:pid>/soldout", methods=["POST"])
 def mark_sold_out(farmer_id, pid):
-    require_farmer(farmer_id)
+    farmer = require_farmer(farmer_id)
     prod = Product.query.filter_by(id=pid, farmer_id=farmer_id).first()
     if not prod:
         abort(404, description="Product not found")
+    was_in_stock = prod.in_stock
     prod.in_stock = False
+    bump_data_versions(f"farmer:{farmer_id}")
     db.session.commit()
+    catalog_cache.invalidate(farmer.State)
+    if was_in_stock:
+        publish_stock_event(farmer.State, "sold_out", id=prod.id)
     return jsonify({"success": True, "product": prod.to_dict()}), 200
 
 
 # ---------------- Retailer Product View ----------------
-@app.route("/retailer/<string:retailer_id>/available-products", methods=["GET"])
+@api.route("/retailer/<string:retailer_id>/available-products", methods=["GET"])
 def get_available_products(retailer_id):
-    retailer = Retailer.query.get(retailer_id)
+    retailer = find_retailer(retailer_id)
     if not retailer:
         return jsonify({"error": "Retailer not found"}), 404
 
+    # The full catalog is shared by every retailer in the state: serve it from
+    # the cache and let polling clients revalidate with If-None-Match.
+    paged = any(arg in request.args for arg in ("limit", "after", "stream"))
+    if not paged:
+        generation, entry = catalog_cache.lookup(retailer.State)
+        if entry is not None and etag_matches(entry.etag):
+            return catalog_response(entry, 304)
+        if entry is not None:
+            return catalog_response(entry, 200)
+
     products = (
-        Product.query.join(Farmer, Product.farmer_id == Farmer.id)
+        db.session.query(*CATALOG_COLUMNS)
+        .select_from(Product)
+        .join(Farmer, Product.farmer_id == Farmer.id)
         .filter(Farmer.State == retailer.State, Product.in_stock.is_(True))
-        .with_entities(
-            Product.id,
-            Product.name.label("product_name"),
-            Product.category,
-            Product.price,
-            Product.quantity,
-            Farmer.farmername.label("farmer_name"),
+    )
+
+    if not paged:
+        body = current_app.json.dumps([catalog_row(p) for p in products.order_by(Product.id).all()]).encode()
+        entry = catalog_cache.store(retailer.State, generation, body)
+        # Unchanged rows hash to the same ETag, so a refill can still answer 304
+        return catalog_response(entry, 304 if etag_matches(entry.etag) else 200)
+
+    # Product ids never change, so they make a stable cursor even while stock moves.
+    return paginated_response(
+        products,
+        keys=(Product.id,),
+        row_key=lambda product: (product.id,),
+        serialize=catalog_row,
+    )
+
+
+def catalog_response(entry, status):
+    response = make_response(b"" if status == 304 else entry.body, status)
+    response.mimetype = "application/json"
+    response.set_etag(entry.etag)
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+# ---------------- Stock Events ----------------
+# Each open stream holds a worker thread, up to STOCK_EVENTS_MAX_STREAMS per worker; streams end after STOCK_EVENTS_MAX_SECONDS
+# and EventSource reconnects with Last-Event-ID, so nothing is missed in between.
+STOCK_EVENTS_HEARTBEAT = float(os.environ.get("STOCK_EVENTS_HEARTBEAT", "15"))
+STOCK_EVENTS_MAX_SECONDS = float(os.environ.get("STOCK_EVENTS_MAX_SECONDS", "300"))
+
+
+@api.route("/retailer/<string:retailer_id>/stock-events", methods=["GET"])
+@admission.no_concurrency_limit
+def retailer_stock_events(retailer_id):
+    retailer = find_retailer(retailer_id)
+    if not retailer:
+        return jsonify({"error": "Retailer not found"}), 404
+
+    if not stock_events.acquire():
+        # Every stream slot in this worker is taken; come back after the busy period
+        retry_after = int(STOCK_EVENTS_HEARTBEAT)
+        busy = 'event: busy\ndata: {"error": "Too many open event streams"}\n\n'
+        return Response(
+            f"retry: {retry_after * 1000}\n\n{busy}", status=503, mimetype="text/event-stream",
+            headers={"Retry-After": str(retry_after)},
         )
+
+    last_id = request.headers.get("Last-Event-ID") or request.args.get("last_event_id")
+    stream = stock_events.stream(
+        retailer.State, last_id, heartbeat=STOCK_EVENTS_HEARTBEAT, max_seconds=STOCK_EVENTS_MAX_SECONDS,
+    )
+    response = Response(stream, mimetype="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",  # stop nginx-style proxies from buffering the stream
+    })
+    # Runs when the server closes the response: stream finished, client gone, or never started
+    response.call_on_close(stock_events.release)
+    return response
+
+# ---------------- Product Search ----------------
+def load_search_terms(state):
+    return (
+        db.session.query(Product.name, Product.category)
+        .join(Farmer, Product.farmer_id == Farmer.id)
+        .filter(Farmer.State == state)
+        .distinct()
         .all()
     )
 
-    response = [
-        {
-            "id": product.id,  # ✅ Added ID
-            "product_name": product.product_name,
-            "category": product.category,
-            "price": product.price,
-            "quantity": product.quantity,
-            "farmer_name": product.farmer_name,
-        }
-        for product in products
-    ]
 
-    return jsonify(response), 200
+# Token -> product-name index per state; other workers' new products show up within SEARCH_INDEX_REFRESH seconds
+search_index = ProductSearchIndex(
+    load_search_terms, refresh_seconds=float(os.environ.get("SEARCH_INDEX_REFRESH", "60")),
+)
+
+SEARCH_COLUMNS = (
+    Product.id, Product.name, Product.category, Product.price, Product.quantity,
+    Product.updated_at, Farmer.farmername,
+)
+SEARCH_SORTS = {
+    # sort -> (keyset columns, descending)
+    "price": ((Product.price, Product.id), False),
+    "updated": ((Product.updated_at, Product.id), True),
+}
+
+
+def search_row(row):
+    return {
+        "id": row.id,
+        "product_name": row.name,
+        "category": row.category,
+        "price": row.price,
+        "quantity": row.quantity,
+        "farmer_name": row.farmername,
+        "updated_at": row.updated_at,
+    }
+
+
+@api.route("/retailer/<string:retailer_id>/search", methods=["GET"])
+def search_products(retailer_id):
+    retailer = find_retailer(retailer_id)
+    if not retailer:
+        return jsonify({"error": "Retailer not found"}), 404
+
+    args = request.args
+    sort = args.get("sort", "updated")
+    if sort not in SEARCH_SORTS:
+        return jsonify({"error": f"sort must be one of {', '.join(SEARCH_SORTS)}"}), 400
+    try:
+        min_price = float(args["min_price"]) if args.get("min_price") else None
+        max_price = float(args["max_price"]) if args.get("max_price") else None
+    except ValueError:
+        return jsonify({"error": "min_price and max_price must be numbers"}), 400
+
+    products = (
+        db.session.query(*SEARCH_COLUMNS)
+        .join(Farmer, Product.farmer_id == Farmer.id)
+        .filter(Farmer.State == retailer.State, Product.in_stock.is_(True), Product.quantity > 0)
+    )
+
+    index = search_index.get(retailer.State)
+    q = (args.get("q") or "").strip()[:100]
+    if q:
+        names = index.match(q)
+        if not names:
+            return jsonify([]), 200
+        products = products.filter(Product.name.in_(names))
+    if args.get("category"):
+        categories = index.category_variants(args["category"])
+        if not categories:
+            return jsonify([]), 200
+        products = products.filter(Product.category.in_(categories))
+    if min_price is not None:
+        products = products.filter(Product.price >= min_price)
+    if max_price is not None:
+        products = products.filter(Product.price <= max_price)
+
+    keys, descending = SEARCH_SORTS[sort]
+    return paginated_response(
+        products,
+        keys=keys,
+        row_key=lambda row: (row.price if sort == "price" else row.updated_at, row.id),
+        serialize=search_row,
+        descending=descending,
+        page_by_default=True,
+    )
 
 
 # ---------------- Purchase API ----------------
-@app.route("/products/<int:product_id>/purchase", methods=["POST"])
+@api.route("/products/<int:product_id>/purchase", methods=["POST"])
 def purchase_product(product_id):
     data = request.json
     retailer_id = data.get("retailer_id")
@@ -355,12 +1380,17 @@ def purchase_product(product_id):
     payment_type = data.get("payment_type")
 
     # Validate retailer
-    retailer = Retailer.query.get(retailer_id)
+    retailer = find_retailer(retailer_id)
     if not retailer:
         return jsonify({"error": "Retailer not found"}), 404
 
-    # Validate product
-    product = Product.query.get(product_id)
+    # Validate product (columns only: stock is changed below with a conditional UPDATE)
+    product = (
+        db.session.query(Product.id, Product.price, Product.farmer_id, Product.category, Farmer.State)
+        .join(Farmer, Product.farmer_id == Farmer.id)
+        .filter(Product.id == product_id)
+        .first()
+    )
     if not product:
         return jsonify({"error": "Product not found"}), 404
 
@@ -373,44 +1403,204 @@ def purchase_product(product_id):
     if quantity <= 0:
         return jsonify({"error": "Quantity must be positive"}), 400
 
-    if product.quantity < quantity:
+    # Deduct stock atomically; the WHERE clause makes overselling impossible
+    if not reserve_stock({product_id: quantity}):
+        db.session.rollback()
         return jsonify({"error": "Insufficient stock"}), 400
 
-    # Deduct stock
-    product.quantity -= quantity
-    product.in_stock = product.quantity > 0
-    db.session.commit()
-
     # ✅ Auto-calc payment amount
     payment_amount = product.price * quantity
 
-    # Record purchase
+    # Record purchase in the same transaction as the stock change
     purchase = Purchase(
         retailer_id=retailer_id,
         product_id=product_id,
         quantity=quantity,
         payment_type=payment_type,
         payment_amount=payment_amount,
+        created_at=datetime.utcnow(),
     )
     db.session.add(purchase)
+    bump_sales_rollup(
+        product.farmer_id, product.category,
+        present_stock=-quantity, units_sold=quantity, revenue=payment_amount,
+    )
+    bump_retailer_monthly(retailer_id, purchase.created_at, quantity, payment_amount)
+    bump_daily_sales(product.farmer_id, product_id, purchase.created_at, quantity, payment_amount)
+    bump_data_versions(f"farmer:{product.farmer_id}", f"retailer:{retailer_id}")
+    db.session.flush()
+    response = {"success": True, "message": "Purchase successful", "purchase": purchase.to_dict()}
+    levels = stock_levels([product_id])
     db.session.commit()
+    catalog_cache.invalidate(product.State)
+    publish_stock_levels({product_id: product.State}, levels)
+
+    return jsonify(response), 200
 
-    return jsonify({"success": True, "message": "Purchase successful", "purchase": purchase.to_dict()}), 200
 
+def reserve_stock(quantities):
+    """Decrement stock for ``{product_id: quantity}`` in one conditional UPDATE.
+
+    Every row must satisfy ``quantity >= :q``; returns False (leaving the caller
+    to roll back) if any product would oversell.
+    """
+    table = Product.__table__
+    wanted = case(quantities, value=table.c.id)
+    result = db.session.execute(
+        table.update()
+        .where(table.c.id.in_(list(quantities)), table.c.quantity >= wanted)
+        # in_stock is assigned first: MySQL evaluates SET left to right, so it
+        # must read the pre-decrement quantity like every other backend does.
+        .ordered_values(
+            (table.c.in_stock, table.c.quantity > wanted),
+            (table.c.quantity, table.c.quantity - wanted),
+            (table.c.updated_at, datetime.utcnow()),
+        )
+    )
+    return result.rowcount == len(quantities)
 
-@app.route("/farmers/<int:farmer_id>/product-history", methods=["GET"])
+
+# ---------------- Checkout API ----------------
+MAX_CHECKOUT_LINES = 200
+
+
+@api.route("/retailers/<string:retailer_id>/checkout", methods=["POST"])
+def checkout(retailer_id):
+    data = request.get_json() or {}
+    items = data.get("items")
+    payment_type = data.get("payment_type")
+
+    # Validate retailer
+    retailer = find_retailer(retailer_id)
+    if not retailer:
+        return jsonify({"error": "Retailer not found"}), 404
+
+    # Validate order lines; repeated products are merged into one line
+    if not payment_type:
+        return jsonify({"error": "payment_type is required"}), 400
+    if not isinstance(items, list) or not items:
+        return jsonify({"error": "items must be a non-empty list of {product_id, quantity}"}), 400
+    if len(items) > MAX_CHECKOUT_LINES:
+        return jsonify({"error": f"At most {MAX_CHECKOUT_LINES} items per checkout"}), 400
+    quantities = {}
+    for item in items:
+        try:
+            product_id = int(item["product_id"])
+            quantity = int(item["quantity"])
+        except (TypeError, ValueError, KeyError):
+            return jsonify({"error": "Each item needs an integer product_id and quantity"}), 400
+        if quantity <= 0:
+            return jsonify({"error": "Quantity must be positive", "product_id": product_id}), 400
+        quantities[product_id] = quantities.get(product_id, 0) + quantity
+
+    # One query for every product in the order
+    products = {
+        p.id: p
+        for p in db.session.query(Product.id, Product.price, Product.farmer_id, Product.category, Farmer.State)
+        .join(Farmer, Product.farmer_id == Farmer.id)
+        .filter(Product.id.in_(list(quantities)))
+    }
+    missing = sorted(set(quantities) - set(products))
+    if missing:
+        return jsonify({"error": "Product not found", "product_ids": missing}), 404
+
+    # All-or-nothing stock reservation in a single UPDATE
+    if not reserve_stock(quantities):
+        db.session.rollback()
+        available = dict(
+            db.session.query(Product.id, Product.quantity).filter(Product.id.in_(list(quantities)))
+        )
+        short = [
+            {"product_id": pid, "requested": qty, "available": available.get(pid, 0)}
+            for pid, qty in quantities.items()
+            if available.get(pid, 0) < qty
+        ]
+        return jsonify({"error": "Insufficient stock", "items": short}), 400
+
+    now = datetime.utcnow()
+    rows = []
+    rollup = {}
+    for pid, qty in quantities.items():
+        product = products[pid]
+        amount = product.price * qty
+        rows.append({
+            "retailer_id": retailer_id,
+            "product_id": pid,
+            "quantity": qty,
+            "payment_type": payment_type,
+            "payment_amount": amount,
+            "created_at": now,
+        })
+        totals = rollup.setdefault((product.farmer_id, product.category), [0, 0.0])
+        totals[0] += qty
+        totals[1] += amount
+
+    # Bulk insert of every purchase row plus one upsert per counter table
+    db.session.execute(Purchase.__table__.insert(), rows)
+    bump_counters_many(FarmerSalesRollup.__table__, ("farmer_id", "category"), [
+        {"farmer_id": farmer_id, "category": category,
+         "present_stock": -units, "units_sold": units, "revenue": revenue}
+        for (farmer_id, category), (units, revenue) in rollup.items()
+    ])
+    total_units = sum(r["quantity"] for r in rows)
+    total_amount = sum(r["payment_amount"] for r in rows)
+    bump_retailer_monthly(retailer_id, now, total_units, total_amount, orders=len(rows))
+    daily = {}
+    for row in rows:
+        totals = daily.setdefault((products[row["product_id"]].farmer_id, row["product_id"], now.date()), [0, 0.0])
+        totals[0] += row["quantity"]
+        totals[1] += row["payment_amount"]
+    bump_counters_many(DailyProductSales.__table__, ("farmer_id", "product_id", "day"), [
+        {"farmer_id": farmer_id, "product_id": pid, "day": day, "units": units, "revenue": revenue}
+        for (farmer_id, pid, day), (units, revenue) in daily.items()
+    ])
+    bump_data_versions(f"retailer:{retailer_id}", *{f"farmer:{farmer_id}" for farmer_id, _ in rollup})
+    levels = stock_levels(quantities)
+    db.session.commit()
+
+    for state in {p.State for p in products.values()}:
+        catalog_cache.invalidate(state)
+    publish_stock_levels({pid: p.State for pid, p in products.items()}, levels)
+
+    return jsonify({
+        "success": True,
+        "message": "Checkout successful",
+        "items": [
+            {
+                "product_id": r["product_id"],
+                "quantity": r["quantity"],
+                "payment_amount": r["payment_amount"],
+            }
+            for r in rows
+        ],
+        "total_quantity": total_units,
+        "total_amount": total_amount,
+        "payment_type": payment_type,
+        "purchased_at": now.isoformat(),
+    }), 200
+
+
+@api.route("/farmers/<int:farmer_id>/product-history", methods=["GET"])
+@replica_router.replica_reads
 def product_history(farmer_id):
     # Validate farmer
-    farmer = Farmer.query.get(farmer_id)
+    farmer = find_farmer(farmer_id)
     if not farmer:
         return jsonify({"error": "Farmer not found"}), 404
 
+    etag = list_etag(f"farmer:{farmer_id}")
+    if etag_matches(etag):
+        return not_modified(etag)
+
     # Fetch all products listed by the farmer
-    products = Product.query.filter_by(farmer_id=farmer_id).all()
+    products = Product.query.filter_by(farmer_id=farmer_id)
 
     # Format the response
-    response = [
-        {
+    return paginated_response(
+        products,
+        keys=(Product.created_at, Product.id),
+        row_key=lambda product: (product.created_at, product.id),
+        serialize=lambda product: {
             "product_id": product.id,
             "name": product.name,
             "category": product.category,
@@ -419,83 +1609,123 @@ def product_history(farmer_id):
             "in_stock": product.in_stock,
             "listed_date": product.created_at.isoformat(),
             "last_updated": product.updated_at.isoformat() if product.updated_at else None,
-        }
-        for product in products
-    ]
-
-    return jsonify(response), 200
+        },
+        etag=etag,
+    )
 
 
-@app.route("/farmers/<int:farmer_id>/transactions", methods=["GET"])
+@api.route("/farmers/<int:farmer_id>/transactions", methods=["GET"])
+@replica_router.replica_reads
 def farmer_transactions(farmer_id):
     # Validate farmer
-    farmer = Farmer.query.get(farmer_id)
+    farmer = find_farmer(farmer_id)
     if not farmer:
         return jsonify({"error": "Farmer not found"}), 404
 
+    etag = list_etag(f"farmer:{farmer_id}")
+    if etag_matches(etag):
+        return not_modified(etag)
+
     # Fetch all purchases related to the farmer's products
     transactions = (
-        db.session.query(Purchase, Product)
+        db.session.query(*FARMER_TRANSACTION_COLUMNS)
+        .select_from(Purchase)
         .join(Product, Purchase.product_id == Product.id)
         .filter(Product.farmer_id == farmer_id)
-        .all()
     )
 
-    # Format the response
-    response = [
-        {
-            "transaction_id": purchase.id,
-            "product_id": product.id,
-            "product_name": product.name,
-            "category": product.category,
-            "quantity_sold": purchase.quantity,
-            "payment_type": purchase.payment_type,
-            "payment_amount": purchase.payment_amount,
-            "sold_date": purchase.created_at.isoformat(),
-        }
-        for purchase, product in transactions
-    ]
+    return paginated_response(
+        transactions,
+        keys=(Purchase.created_at, Purchase.id),
+        row_key=lambda row: (row.created_at, row.id),
+        serialize=farmer_transaction_row,
+        etag=etag,
+    )
 
-    return jsonify(response), 200
+
+@api.route("/farmers/<int:farmer_id>/transactions/export", methods=["GET"])
+@replica_router.replica_reads
+@admission.route_class("reports")
+def export_farmer_transactions(farmer_id):
+    # Validate farmer
+    farmer = find_farmer(farmer_id)
+    if not farmer:
+        return jsonify({"error": "Farmer not found"}), 404
+
+    fmt = export_format()
+    start, end = parse_date_range(request.args)
+    transactions = (
+        db.session.query(*FARMER_TRANSACTION_COLUMNS)
+        .select_from(Purchase)
+        .join(Product, Purchase.product_id == Product.id)
+        .filter(Product.farmer_id == farmer_id)
+    )
+    span = (start, end)
+    if start is None:
+        # Whole history: from the farmer's first sale to the last
+        first, last = transactions.with_entities(func.min(Purchase.created_at), func.max(Purchase.created_at)).one()
+        span = (first, last + timedelta(microseconds=1)) if first is not None else None
+
+    # No index orders a farmer's purchases by time, so sort a window at a time
+    rows = () if span is None else stream_rows_by_window(
+        transactions.order_by(Purchase.created_at, Purchase.id), Purchase.created_at, *span,
+    )
+
+    return export_response(
+        rows,
+        serialize=farmer_transaction_row,
+        fields=FARMER_TRANSACTION_FIELDS,
+        filename=export_filename(f"farmer_{farmer_id}_transactions", start, end),
+        fmt=fmt,
+    )
+
+
+def export_filename(name, start, end):
+    if start is None:
+        return name
+    # end is exclusive; name the file after the last day it covers
+    return f"{name}_{start:%Y-%m-%d}_{end - timedelta(days=1):%Y-%m-%d}"
 
 
 # ---------------- Analytics API ----------------
-@app.route("/farmers/<int:farmer_id>/analytics", methods=["GET"])
+@api.route("/farmers/<int:farmer_id>/analytics", methods=["GET"])
+@replica_router.replica_reads
 def farmer_analytics(farmer_id):
     # Validate farmer
-    farmer = Farmer.query.get(farmer_id)
+    farmer = find_farmer(farmer_id)
     if not farmer:
         return jsonify({"error": "Farmer not found"}), 404
 
-    # Fetch all products listed by the farmer
-    products = Product.query.filter_by(farmer_id=farmer_id).all()
+    # Single indexed read of the maintained rollup; fall back to grouped
+    # queries for farmers whose rows have not been backfilled yet, since
+    # purchases since deploy leave them partial rather than missing.
+    if db.session.get(SalesRollupBackfill, farmer_id):
+        rows = FarmerSalesRollup.query.filter_by(farmer_id=farmer_id).all()
+        rollup = {r.category: (r.present_stock, r.units_sold, r.revenue) for r in rows}
+    else:
+        rollup = {cat: tuple(v) for (_, cat), v in compute_sales_rollup(farmer_id).items()}
+
+    return jsonify(sales_summary(rollup)), 200
 
-    # Initialize analytics data
+
+def sales_summary(rollup):
+    """Analytics response from ``{category: (present_stock, units_sold, revenue)}``."""
     category_sales = {}
     total_listed_stock = 0
     total_present_stock = 0
     total_revenue = 0
-
-    # Analyze products
-    for product in products:
-        total_listed_stock += product.quantity + sum(
-            purchase.quantity for purchase in Purchase.query.filter_by(product_id=product.id).all()
-        )
-        total_present_stock += product.quantity
-
-        # Fetch all purchases for the product
-        purchases = Purchase.query.filter_by(product_id=product.id).all()
-        for purchase in purchases:
-            total_revenue += purchase.payment_amount
-            if product.category not in category_sales:
-                category_sales[product.category] = 0
-            category_sales[product.category] += purchase.quantity
+    for category, (present, units, revenue) in rollup.items():
+        total_listed_stock += present + units
+        total_present_stock += present
+        total_revenue += revenue
+        if units:
+            category_sales[category] = units
 
     # Determine the most sold category
     most_sold_category = max(category_sales, key=category_sales.get) if category_sales else None
 
     # Format the response
-    response = {
+    return {
         "total_listed_stock": total_listed_stock,
         "total_present_stock": total_present_stock,
         "total_revenue": total_revenue,
@@ -503,154 +1733,315 @@ def farmer_analytics(farmer_id):
         "category_sales": category_sales,
     }
 
-    return jsonify(response), 200
 
+# ---------------- Sales Series API ----------------
+# Trend charts read daily_product_sales: at most one row per product per day
+# in the window, bucketed by day, week or month in the database.
+SALES_SERIES_DEFAULT_DAYS = 365
+SALES_SERIES_MAX_DAYS = 3660
 
-# ---------------- Report API ----------------
-@app.route("/farmers/<int:farmer_id>/transactions/report", methods=["GET"])
-def generate_transaction_report(farmer_id):
-    # Validate farmer
-    farmer = Farmer.query.get(farmer_id)
+
+@api.route("/farmers/<int:farmer_id>/sales-series", methods=["GET"])
+@replica_router.replica_reads
+def farmer_sales_series(farmer_id):
+    farmer = find_farmer(farmer_id)
     if not farmer:
         return jsonify({"error": "Farmer not found"}), 404
 
-    # Get query parameters
-    from_date = request.args.get("from_date")
-    to_date = request.args.get("to_date")
+    granularity = request.args.get("granularity", "day")
+    if granularity not in DATE_BUCKETS:
+        return jsonify({"error": f"granularity must be one of {', '.join(DATE_BUCKETS)}"}), 400
+    product_id = request.args.get("product_id")
+    if product_id is not None:
+        try:
+            product_id = int(product_id)
+        except ValueError:
+            return jsonify({"error": "product_id must be integer"}), 400
+
+    # ?from=&to= (or ?month=); the trailing year by default
+    start, end = parse_date_range(request.args)
+    if start is None:
+        end = datetime.combine(datetime.utcnow().date() + timedelta(days=1), datetime.min.time())
+        start = end - timedelta(days=SALES_SERIES_DEFAULT_DAYS)
+    if (end - start).days > SALES_SERIES_MAX_DAYS:
+        return jsonify({"error": f"The range can span at most {SALES_SERIES_MAX_DAYS} days"}), 400
+
+    period = date_bucket(DailyProductSales.day, granularity)
+    q = (
+        db.session.query(period, func.sum(DailyProductSales.units), func.sum(DailyProductSales.revenue))
+        .filter(
+            DailyProductSales.farmer_id == farmer_id,
+            DailyProductSales.day >= start.date(),
+            DailyProductSales.day < end.date(),
+        )
+        .group_by(period)
+    )
+    if product_id is not None:
+        q = q.filter(DailyProductSales.product_id == product_id)
+    totals = {label: (int(units), float(revenue)) for label, units, revenue in q}
+
+    # Every period in the window, zero-filled, so charts get a continuous axis
+    series = [
+        {"period": label, "units": units, "revenue": round(revenue, 2)}
+        for label in bucket_labels(start.date(), end.date(), granularity)
+        for units, revenue in [totals.get(label, (0, 0.0))]
+    ]
+    return jsonify({
+        "farmer_id": farmer_id,
+        "product_id": product_id,
+        "granularity": granularity,
+        "from": start.date().isoformat(),
+        "to": (end.date() - timedelta(days=1)).isoformat(),
+        "total_units": sum(p["units"] for p in series),
+        "total_revenue": round(sum(p["revenue"] for p in series), 2),
+        "series": series,
+    }), 200
 
-    # Debugging logs
-    print(f"Generating report for farmer_id: {farmer_id}")
-    print(f"From Date: {from_date}, To Date: {to_date}")
 
+# ---------------- Report API ----------------
+# PDFs render in a process pool and are cached by (farmer_id, from, to, data
+# version). The job id encodes the range and version, so any web worker can
+# answer a poll for it.
+report_jobs = ReportJobs(
+    max_workers=int(os.environ.get("REPORT_WORKERS", "2")),
+    cache_bytes=int(os.environ.get("REPORT_CACHE_BYTES", str(64 * 1024 * 1024))),
+)
+# How long the synchronous GET route waits for a render before answering 202
+# with the job to poll; small reports still come back in one request
+REPORT_WAIT_SECONDS = float(os.environ.get("REPORT_WAIT_SECONDS", "5"))
+
+
+def parse_report_range(from_date, to_date):
     # Validate dates
     if not from_date or not to_date:
-        return jsonify({"error": "Both from_date and to_date are required."}), 400
-
+        raise ValueError("Both from_date and to_date are required.")
     try:
         from_date = datetime.strptime(from_date, "%Y-%m-%d")
         to_date = datetime.strptime(to_date, "%Y-%m-%d")
     except ValueError:
-        return jsonify({"error": "Invalid date format. Use YYYY-MM-DD."}), 400
-
+        raise ValueError("Invalid date format. Use YYYY-MM-DD.")
     if from_date > to_date:
-        return jsonify({"error": "from_date cannot be later than to_date."}), 400
+        raise ValueError("from_date cannot be later than to_date.")
+    return from_date, to_date
 
-    # Fetch transactions within the date range
-    transactions_query = (
-        db.session.query(Purchase, Product)
+
+def report_job_id(farmer, from_date, to_date):
+    """Job id for the report's current data version, or None if the range has no transactions.
+
+    One indexed aggregate stands in for the data: new purchases move the
+    count and max id, and product edits move max(updated_at).
+    """
+    count, max_id, max_updated = (
+        db.session.query(func.count(Purchase.id), func.max(Purchase.id), func.max(Product.updated_at))
         .join(Product, Purchase.product_id == Product.id)
-        .filter(Product.farmer_id == farmer_id)
-        .filter(Purchase.created_at >= from_date, Purchase.created_at <= to_date)
+        .filter(Product.farmer_id == farmer.id)
+        .filter(Purchase.created_at >= from_date, Purchase.created_at < to_date + timedelta(days=1))
+        .one()
+    )
+    if not count:
+        return None
+    version = hashlib.sha1(f"{count}:{max_id}:{max_updated}:{farmer.farmername}".encode()).hexdigest()[:16]
+    return f"{from_date:%Y%m%d}-{to_date:%Y%m%d}-{version}"
+
+
+def submit_report(farmer, job_id, from_date, to_date):
+    # The engine this request reads from: the replica for replica-routed views
+    db_uri = db.session.get_bind().url.render_as_string(hide_password=False)
+    return report_jobs.submit(
+        (farmer.id, job_id), render_transaction_report,
+        db_uri, farmer.id, farmer.farmername, from_date, to_date,
     )
 
-    transactions = transactions_query.all()
 
-    # If no transactions found
-    if not transactions:
-        return jsonify({"error": "No transactions found for the given period."}), 404
-
-    # Generate PDF report
-    pdf = FPDF()
-    pdf.set_auto_page_break(auto=True, margin=15)
-    pdf.add_page()
-    pdf.set_font("Arial", size=12)
-
-    # Add title
-    pdf.set_font("Arial", style="B", size=16)
-    pdf.cell(200, 10, txt=f"Transaction Report for {farmer.farmername}", ln=True, align="C")
-    pdf.ln(10)
-
-    # Add date range
-    pdf.set_font("Arial", size=12)
-    pdf.cell(200, 10, txt=f"From: {from_date.strftime('%Y-%m-%d')} To: {to_date.strftime('%Y-%m-%d')}", ln=True)
-    pdf.ln(10)
-
-    # Add table headers
-    pdf.set_font("Arial", style="B", size=12)
-    pdf.cell(40, 10, "Transaction ID", border=1)
-    pdf.cell(40, 10, "Product Name", border=1)
-    pdf.cell(30, 10, "Category", border=1)
-    pdf.cell(30, 10, "Quantity", border=1)
-    pdf.cell(30, 10, "Amount", border=1)
-    pdf.cell(30, 10, "Date", border=1)
-    pdf.ln()
-
-    # Add transaction data
-    pdf.set_font("Arial", size=12)
-    for purchase, product in transactions:
-        pdf.cell(40, 10, str(purchase.id), border=1)
-        pdf.cell(40, 10, product.name, border=1)
-        pdf.cell(30, 10, product.category, border=1)
-        pdf.cell(30, 10, str(purchase.quantity), border=1)
-        pdf.cell(30, 10, f"₹{purchase.payment_amount:.2f}", border=1)
-        pdf.cell(30, 10, purchase.created_at.strftime("%Y-%m-%d"), border=1)
-        pdf.ln()
-
-    # Output PDF as a response
-    response = make_response(pdf.output(dest="S").encode("latin1"))
+def report_response(farmer_id, pdf):
+    response = make_response(pdf)
     response.headers["Content-Type"] = "application/pdf"
     response.headers["Content-Disposition"] = f"attachment; filename=Transaction_Report_{farmer_id}.pdf"
     return response
 
 
-@app.route("/retailers/<string:retailer_id>/transaction-history", methods=["GET"])
+@api.route("/farmers/<int:farmer_id>/transactions/report", methods=["GET"])
+@admission.route_class("reports")
+@replica_router.replica_reads
+def generate_transaction_report(farmer_id):
+    # Validate farmer
+    farmer = find_farmer(farmer_id)
+    if not farmer:
+        return jsonify({"error": "Farmer not found"}), 404
+
+    try:
+        from_date, to_date = parse_report_range(request.args.get("from_date"), request.args.get("to_date"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    # If no transactions found
+    job_id = report_job_id(farmer, from_date, to_date)
+    if job_id is None:
+        return jsonify({"error": "No transactions found for the given period."}), 404
+
+    # Synchronous variant of the job API: cached bytes, or wait for the pool
+    state = submit_report(farmer, job_id, from_date, to_date)
+    try:
+        pdf = report_jobs.result((farmer_id, job_id), timeout=REPORT_WAIT_SECONDS)
+    except FuturesTimeoutError:
+        # Still rendering: hand the client the job to poll instead of holding the worker
+        return report_accepted(farmer_id, job_id, state)
+    except Exception as e:
+        current_app.logger.exception("Report generation failed: %s", e)
+        return jsonify({"error": "Report generation failed"}), 500
+    return report_response(farmer_id, pdf)
+
+
+@api.route("/farmers/<int:farmer_id>/reports", methods=["POST"])
+@admission.route_class("reports")
+def submit_transaction_report(farmer_id):
+    # Validate farmer
+    farmer = find_farmer(farmer_id)
+    if not farmer:
+        return jsonify({"error": "Farmer not found"}), 404
+
+    data = request.get_json() or {}
+    try:
+        from_date, to_date = parse_report_range(data.get("from_date"), data.get("to_date"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    job_id = report_job_id(farmer, from_date, to_date)
+    if job_id is None:
+        return jsonify({"error": "No transactions found for the given period."}), 404
+
+    state = submit_report(farmer, job_id, from_date, to_date)
+    return report_accepted(farmer_id, job_id, state)
+
+
+@api.route("/farmers/<int:farmer_id>/reports/<string:job_id>", methods=["GET"])
+def transaction_report_status(farmer_id, job_id):
+    state, error = report_jobs.status((farmer_id, job_id))
+    if state is None:
+        # Submitted through another worker (or evicted): re-render here if
+        # the data still matches the version in the id.
+        farmer = find_farmer(farmer_id)
+        if not farmer:
+            return jsonify({"error": "Farmer not found"}), 404
+        try:
+            from_date, to_date = (datetime.strptime(part, "%Y%m%d") for part in job_id.split("-")[:2])
+        except ValueError:
+            return jsonify({"error": "Report job not found"}), 404
+        if report_job_id(farmer, from_date, to_date) != job_id:
+            return jsonify({"error": "Report job not found or its data has changed; submit it again"}), 404
+        state = submit_report(farmer, job_id, from_date, to_date)
+    return jsonify(report_job_status(farmer_id, job_id, state, error)), 200
+
+
+@api.route("/farmers/<int:farmer_id>/reports/<string:job_id>/download", methods=["GET"])
+def download_transaction_report(farmer_id, job_id):
+    pdf = report_jobs.result((farmer_id, job_id))
+    if pdf is None:
+        state, _ = report_jobs.status((farmer_id, job_id))
+        if state == "running":
+            return jsonify({"error": "Report is not ready yet"}), 409
+        return jsonify({"error": "Report job not found"}), 404
+    return report_response(farmer_id, pdf)
+
+
+def report_accepted(farmer_id, job_id, state):
+    status = report_job_status(farmer_id, job_id, state)
+    return jsonify(status), 202, {"Location": status["status_url"]}
+
+
+def report_job_status(farmer_id, job_id, state, error=None):
+    status = {
+        "job_id": job_id,
+        "status": state,
+        "status_url": f"/farmers/{farmer_id}/reports/{job_id}",
+    }
+    if state == "done":
+        status["download_url"] = f"/farmers/{farmer_id}/reports/{job_id}/download"
+    if error:
+        status["error"] = error
+    return status
+
+
+@api.route("/retailers/<string:retailer_id>/transaction-history", methods=["GET"])
+@replica_router.replica_reads
 def retailer_transaction_history(retailer_id):
     # Validate retailer
-    retailer = Retailer.query.get(retailer_id)
+    retailer = find_retailer(retailer_id)
     if not retailer:
         return jsonify({"error": "Retailer not found"}), 404
 
+    etag = list_etag(f"retailer:{retailer_id}", "product_names")
+    if etag_matches(etag):
+        return not_modified(etag)
+
     # Fetch all purchases made by the retailer
     transactions = (
-        db.session.query(Purchase, Product, Farmer)
+        db.session.query(*RETAILER_TRANSACTION_COLUMNS)
+        .select_from(Purchase)
         .join(Product, Purchase.product_id == Product.id)
         .join(Farmer, Product.farmer_id == Farmer.id)
         .filter(Purchase.retailer_id == retailer_id)
-        .all()
     )
 
-    # If no transactions found
-    if not transactions:
-        return jsonify({"error": "No transactions found for this retailer."}), 404
+    return paginated_response(
+        transactions,
+        keys=(Purchase.created_at, Purchase.id),
+        row_key=lambda row: (row.created_at, row.id),
+        serialize=retailer_transaction_row,
+        empty_error="No transactions found for this retailer.",
+        etag=etag,
+    )
 
-    # Format the response
-    response = [
-        {
-            "order_id": purchase.id,
-            "product_name": product.name,
-            "category": product.category,
-            "farmer_name": farmer.farmername,
-            "quantity": purchase.quantity,
-            "payment_type": purchase.payment_type,
-            "payment_amount": purchase.payment_amount,
-            "purchase_date": purchase.created_at.strftime("%Y-%m-%d"),
-        }
-        for purchase, product, farmer in transactions
-    ]
 
-    return jsonify(response), 200
+@api.route("/retailers/<string:retailer_id>/transactions/export", methods=["GET"])
+@replica_router.replica_reads
+@admission.route_class("reports")
+def export_retailer_transactions(retailer_id):
+    # Validate retailer
+    retailer = find_retailer(retailer_id)
+    if not retailer:
+        return jsonify({"error": "Retailer not found"}), 404
+
+    fmt = export_format()
+    start, end = parse_date_range(request.args)
+    transactions = (
+        db.session.query(*RETAILER_TRANSACTION_COLUMNS)
+        .select_from(Purchase)
+        .join(Product, Purchase.product_id == Product.id)
+        .join(Farmer, Product.farmer_id == Farmer.id)
+        .filter(Purchase.retailer_id == retailer_id)
+    )
+    if start is not None:
+        transactions = transactions.filter(Purchase.created_at >= start, Purchase.created_at < end)
+
+    return export_response(
+        # ix_purchase_retailer_created returns these in order, no sort needed
+        stream_rows(transactions.order_by(Purchase.created_at, Purchase.id)),
+        serialize=retailer_transaction_row,
+        fields=RETAILER_TRANSACTION_FIELDS,
+        filename=export_filename(f"retailer_{retailer_id}_transactions", start, end),
+        fmt=fmt,
+    )
 
 
-@app.route("/retailers/<string:retailer_id>/stock-bought-this-month", methods=["GET"])
+@api.route("/retailers/<string:retailer_id>/stock-bought-this-month", methods=["GET"])
+@replica_router.replica_reads
 def stock_bought_this_month(retailer_id):
     # Validate retailer
-    retailer = Retailer.query.get(retailer_id)
+    retailer = find_retailer(retailer_id)
     if not retailer:
         return jsonify({"error": "Retailer not found"}), 404
 
-    # Get the current month and year
-    now = datetime.utcnow()
-    current_month = now.month
-    current_year = now.year
+    # Current month unless ?month=YYYY-MM or ?from=&to= asks for another window
+    start, end = parse_date_range(request.args, default_month=datetime.utcnow())
 
-    # Fetch purchases made by the retailer in the current month
+    # Fetch purchases made by the retailer in the window
     transactions = (
         db.session.query(Purchase, Product, Farmer)
         .join(Product, Purchase.product_id == Product.id)
         .join(Farmer, Product.farmer_id == Farmer.id)
         .filter(Purchase.retailer_id == retailer_id)
-        .filter(db.extract("month", Purchase.created_at) == current_month)
-        .filter(db.extract("year", Purchase.created_at) == current_year)
+        .filter(Purchase.created_at >= start, Purchase.created_at < end)
         .all()
     )
 
@@ -676,11 +2067,114 @@ def stock_bought_this_month(retailer_id):
     return jsonify(response), 200
 
 
+@api.route("/retailers/<string:retailer_id>/monthly-summary", methods=["GET"])
+@replica_router.replica_reads
+def retailer_monthly_summary(retailer_id):
+    # Validate retailer
+    retailer = find_retailer(retailer_id)
+    if not retailer:
+        return jsonify({"error": "Retailer not found"}), 404
+
+    # Served from the maintained monthly totals; ?month= or ?from=&to= narrows the window
+    start, end = parse_date_range(request.args)
+    q = RetailerMonthlyPurchases.query.filter_by(retailer_id=retailer_id)
+    if start is not None:
+        q = q.filter(
+            RetailerMonthlyPurchases.month >= month_start(start),
+            RetailerMonthlyPurchases.month < end.date(),
+        )
+    months = [m.to_dict() for m in q.order_by(RetailerMonthlyPurchases.month).all()]
+    return jsonify(monthly_summary(retailer_id, months)), 200
+
+
+def monthly_summary(retailer_id, months):
+    return {
+        "retailer_id": retailer_id,
+        "months": months,
+        "total_orders": sum(m["order_count"] for m in months),
+        "total_units": sum(m["units"] for m in months),
+        "total_amount": sum(m["amount"] for m in months),
+    }
+
+
 # ---------------- Product Profit Analysis API ----------------
-@app.route("/farmers/<int:farmer_id>/product-profit-analysis", methods=["GET"])
+def parse_summary_args(args):
+    # ?mode=summary&bucket=day|week|month switches the analysis endpoints to SQL aggregates
+    mode = args.get("mode", "rows")
+    bucket = args.get("bucket", "day")
+    if mode not in ("rows", "summary"):
+        abort(400, description="mode must be rows or summary")
+    if bucket not in DATE_BUCKETS:
+        abort(400, description=f"bucket must be one of {', '.join(DATE_BUCKETS)}")
+    return mode, bucket
+
+
+def summary_number(value, kind):
+    # MySQL returns SUM() of an integer column as Decimal, and of a float
+    # column as float; mixing the two in arithmetic raises TypeError
+    return kind(value or 0)
+
+
+def profit_summary_rows(buckets, market_rate):
+    """Rows for the farmer summary from ``(bucket, orders, SUM(quantity), SUM(amount))`` groups."""
+    rows = []
+    for period, orders, quantity, amount in buckets:
+        orders, quantity, amount = int(orders), summary_number(quantity, int), summary_number(amount, float)
+        rows.append({
+            "bucket": period,
+            "transactions": orders,
+            "quantity_sold": quantity,
+            "total_sold_price": amount,
+            "market_value": market_rate * quantity,
+            "profit_or_loss": amount - market_rate * quantity,
+        })
+    return rows
+
+
+def purchase_summary_rows(groups, lookup):
+    """Rows for the retailer summary from per-(bucket, state, category, product) groups.
+
+    ``lookup(state, category, product_name)`` gives the market rate, or None
+    when there is none; unpriced units count towards the totals only.
+    """
+    by_bucket = {}
+    for period, state, category, product_name, orders, quantity, amount in groups:
+        orders, quantity, amount = int(orders), summary_number(quantity, int), summary_number(amount, float)
+        row = by_bucket.setdefault(period, {
+            "bucket": period,
+            "orders": 0,
+            "quantity_bought": 0,
+            "total_purchase_amount": 0.0,
+            "priced_quantity": 0,
+            "priced_purchase_amount": 0.0,
+            "market_value": 0.0,
+        })
+        row["orders"] += orders
+        row["quantity_bought"] += quantity
+        row["total_purchase_amount"] += amount
+        market_rate = lookup(state, category, product_name)
+        if market_rate is not None:
+            row["priced_quantity"] += quantity
+            row["priced_purchase_amount"] += amount
+            row["market_value"] += market_rate * quantity
+
+    rows = [by_bucket[period] for period in sorted(by_bucket)]
+    for row in rows:
+        # Positive means the retailer paid more than market rate for the priced units
+        row["price_difference"] = round(row["priced_purchase_amount"] - row["market_value"], 2)
+    return rows
+
+
+def summary_totals(rows, fields):
+    totals = {field: sum(row[field] for row in rows) for field in fields}
+    return {k: round(v, 2) if isinstance(v, float) else v for k, v in totals.items()}
+
+
+@api.route("/farmers/<int:farmer_id>/product-profit-analysis", methods=["GET"])
+@replica_router.replica_reads
 def product_profit_analysis(farmer_id):
     # Validate farmer
-    farmer = Farmer.query.get(farmer_id)
+    farmer = find_farmer(farmer_id)
     if not farmer:
         return jsonify({"error": "Farmer not found"}), 404
 
@@ -694,11 +2188,42 @@ def product_profit_analysis(farmer_id):
 
     # Fetch the product's market rate from the market data
     state = farmer.State
-    try:
-        market_rate = market_data[state]["products"][category][product_name]
-    except KeyError:
+    market_rate = market_rates.lookup(state, category, product_name)
+    if market_rate is None:
         return jsonify({"error": "Market rate data not found for the given product and category."}), 404
 
+    mode, bucket = parse_summary_args(request.args)
+    if mode == "summary":
+        # Totals per day/week/month computed in SQL; market rate applied per bucket
+        bucket_col = date_bucket(Purchase.created_at, bucket)
+        buckets = (
+            db.session.query(
+                bucket_col,
+                func.count(Purchase.id),
+                func.sum(Purchase.quantity),
+                func.sum(Purchase.payment_amount),
+            )
+            .join(Product, Purchase.product_id == Product.id)
+            .filter(Product.farmer_id == farmer_id)
+            .filter(Product.category == category)
+            .filter(Product.name == product_name)
+            .group_by(bucket_col)
+            .order_by(bucket_col)
+            .all()
+        )
+        if not buckets:
+            return jsonify({"error": "No transactions found for the given product and category."}), 404
+
+        rows = profit_summary_rows(buckets, market_rate)
+        return jsonify({
+            "product_name": product_name,
+            "category": category,
+            "market_rate_per_unit": market_rate,
+            "bucket": bucket,
+            "buckets": rows,
+            "totals": summary_totals(rows, ("transactions", "quantity_sold", "total_sold_price", "market_value", "profit_or_loss")),
+        }), 200
+
     # Fetch all transactions for the product under the farmer
     transactions = (
         db.session.query(Purchase, Product)
@@ -731,12 +2256,47 @@ def product_profit_analysis(farmer_id):
     return jsonify(response), 200
 
 
-@app.route("/retailers/<string:retailer_id>/purchase-analysis", methods=["GET"])
+@api.route("/retailers/<string:retailer_id>/purchase-analysis", methods=["GET"])
+@replica_router.replica_reads
 def retailer_purchase_analysis(retailer_id):
-    retailer = Retailer.query.get(retailer_id)
+    retailer = find_retailer(retailer_id)
     if not retailer:
         return jsonify({"error": "Retailer not found"}), 404
 
+    mode, bucket = parse_summary_args(request.args)
+    if mode == "summary":
+        # SQL groups by bucket and product; rates are looked up once per group
+        bucket_col = date_bucket(Purchase.created_at, bucket)
+        groups = (
+            db.session.query(
+                bucket_col,
+                Farmer.State,
+                Product.category,
+                Product.name,
+                func.count(Purchase.id),
+                func.sum(Purchase.quantity),
+                func.sum(Purchase.payment_amount),
+            )
+            .join(Product, Purchase.product_id == Product.id)
+            .join(Farmer, Product.farmer_id == Farmer.id)
+            .filter(Purchase.retailer_id == retailer_id)
+            .group_by(bucket_col, Farmer.State, Product.category, Product.name)
+            .all()
+        )
+        if not groups:
+            return jsonify({"error": "No purchases found for this retailer."}), 404
+
+        rows = purchase_summary_rows(groups, market_rates.lookup)
+        return jsonify({
+            "retailer_id": retailer_id,
+            "bucket": bucket,
+            "buckets": rows,
+            "totals": summary_totals(rows, (
+                "orders", "quantity_bought", "total_purchase_amount",
+                "priced_quantity", "priced_purchase_amount", "market_value", "price_difference",
+            )),
+        }), 200
+
     transactions = (
         db.session.query(Purchase, Product, Farmer)
         .join(Product, Purchase.product_id == Product.id)
@@ -754,11 +2314,8 @@ def retailer_purchase_analysis(retailer_id):
         category = product.category
         product_name = product.name
 
-        market_rate = None
-        try:
-            market_rate = market_data[state]["products"][category][product_name]
-        except KeyError:
-            pass  # Market rate not found for this product/category/state
+        # None when no rate is known for this product/category/state
+        market_rate = market_rates.lookup(state, category, product_name)
 
         purchase_price_per_unit = purchase.payment_amount / purchase.quantity if purchase.quantity > 0 else 0
         market_price_per_unit = market_rate if market_rate is not None else "N/A"
@@ -783,9 +2340,8 @@ def retailer_purchase_analysis(retailer_id):
     return jsonify(response), 200
 
 
+# Module-level app for `gunicorn App:app`, `flask --app App` and the scripts
+app = create_app()
+
 if __name__=="__main__":
     app.run(host="0.0.0.0",port=5000,debug=True)
-
-
-
-
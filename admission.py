@@ -0,0 +1,235 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from flask import g, jsonify, request
+
+from metrics import Counter
+
+# ---------------- Admission Control ----------------
+# Runs before every view and sheds load early, before it reaches the DB pool:
+#
+#   * each client address has a token bucket per route class (behind a
+#     proxy, set TRUSTED_PROXIES so that's the client's address rather than
+#     the proxy's); an empty bucket answers 429 with Retry-After set to when
+#     the next token arrives;
+#   * each route class (reads, writes, reports) has a per-process cap on
+#     requests in flight; when it's full the request gets 503 right away
+#     instead of queueing for a connection.
+#
+# Limits are "class=value" lists, e.g.
+#   ADMISSION_RATES="reads=20:40,writes=5:10,reports=0.2:3"   tokens/s:burst
+#   ADMISSION_CONCURRENCY="reads=32,writes=16,reports=2"
+# Buckets live in this process unless ADMISSION_BUCKETS_URL=redis://... shares
+# them between workers; the concurrency caps are always per process.
+
+ROUTE_CLASSES = ("reads", "writes", "reports")
+DEFAULT_RATES = {"reads": (20.0, 40.0), "writes": (5.0, 10.0), "reports": (0.2, 3.0)}
+DEFAULT_CONCURRENCY = {"reads": 32, "writes": 16, "reports": 2}
+MAX_BUCKETS = 100000
+
+
+def parse_limits(spec, convert):
+    """Parse "reads=20:40,writes=5:10" into {"reads": convert("20:40"), ...}."""
+    limits = {}
+    for item in (spec or "").split(","):
+        if not item.strip():
+            continue
+        name, _, value = item.partition("=")
+        name = name.strip()
+        if name not in ROUTE_CLASSES:
+            raise ValueError(f"Unknown route class {name!r}; expected one of {', '.join(ROUTE_CLASSES)}")
+        limits[name] = convert(value.strip())
+    return limits
+
+
+def parse_rate(value):
+    rate, _, burst = value.partition(":")
+    return float(rate), float(burst or rate)
+
+
+class InProcessBuckets:
+    def __init__(self, max_buckets=MAX_BUCKETS):
+        self.max_buckets = max_buckets
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key, rate, burst, cost=1.0):
+        """Take ``cost`` tokens; returns (allowed, seconds until they would be available)."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (burst, now))
+            tokens = min(burst, tokens + (now - updated) * rate)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            # Least recently used first; an idle bucket would have refilled anyway
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_buckets:
+                self._buckets.popitem(last=False)
+        return allowed, 0.0 if allowed else (cost - tokens) / rate
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+class RedisBuckets:
+    """Token buckets in Redis, refilled with the server's clock so every worker agrees."""
+
+    SCRIPT = """
+    local rate, burst, cost = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+    local clock = redis.call('TIME')
+    local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+    local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+    local tokens = tonumber(state[1]) or burst
+    local updated = tonumber(state[2]) or now
+    tokens = math.min(burst, tokens + (now - updated) * rate)
+    local allowed = 0
+    if tokens >= cost then
+        tokens = tokens - cost
+        allowed = 1
+    end
+    redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+    redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+    return {allowed, tostring(tokens)}
+    """
+
+    def __init__(self, url, prefix="farm2bazaar:buckets:"):
+        try:
+            import redis
+        except ImportError as exc:
+            raise RuntimeError("ADMISSION_BUCKETS_URL needs the 'redis' package installed") from exc
+        self._redis = redis.Redis.from_url(url)
+        self._take = self._redis.register_script(self.SCRIPT)
+        self._prefix = prefix
+
+    def take(self, key, rate, burst, cost=1.0):
+        allowed, tokens = self._take(keys=[self._prefix + key], args=[rate, burst, cost])
+        tokens = float(tokens)
+        return bool(allowed), 0.0 if allowed else (cost - tokens) / rate
+
+    def __len__(self):
+        return 0  # not tracked for the shared store
+
+
+class AdmissionControl:
+    def __init__(self, buckets=None, rates=None, concurrency=None, enabled=True):
+        self.buckets = buckets or InProcessBuckets()
+        self.rates = dict(DEFAULT_RATES, **(rates or {}))
+        self.concurrency = dict(DEFAULT_CONCURRENCY, **(concurrency or {}))
+        self.enabled = enabled
+        self._slots = {name: threading.BoundedSemaphore(limit) for name, limit in self.concurrency.items()}
+        self._in_flight = {name: 0 for name in ROUTE_CLASSES}
+        self._classes = {}
+        self._exempt = set()
+        self._unlimited = set()
+        self._lock = threading.Lock()
+        self.shed = Counter(
+            "http_requests_shed_total", "Requests refused by admission control, by route class and reason.",
+            ("route_class", "reason"),
+        )
+        self.bucket_errors = 0
+
+    @classmethod
+    def from_env(cls, env):
+        url = env.get("ADMISSION_BUCKETS_URL")
+        return cls(
+            buckets=RedisBuckets(url) if url else None,
+            rates=parse_limits(env.get("ADMISSION_RATES"), parse_rate),
+            concurrency=parse_limits(env.get("ADMISSION_CONCURRENCY"), int),
+            enabled=env.get("ADMISSION_CONTROL", "1").lower() not in ("0", "false", "no", "off"),
+        )
+
+    def init_app(self, app):
+        app.before_request(self._admit)
+        app.teardown_request(self._release)
+
+    # Route registration: GETs are reads and everything else writes unless set here
+    def route_class(self, name):
+        """Put a view in a route class (e.g. "reports")."""
+        def decorate(view):
+            self._classes[view.__name__] = name
+            return view
+        return decorate
+
+    def exempt(self, view):
+        """Skip admission control for a view (health checks, metrics)."""
+        self._exempt.add(view.__name__)
+        return view
+
+    def no_concurrency_limit(self, view):
+        """Rate-limit but don't hold a concurrency slot (long-lived streams)."""
+        self._unlimited.add(view.__name__)
+        return view
+
+    def classify(self):
+        if request.method == "OPTIONS" or request.endpoint is None:
+            return None
+        view = request.endpoint.rpartition(".")[2]
+        if view in self._exempt:
+            return None
+        return self._classes.get(view) or ("reads" if request.method in ("GET", "HEAD") else "writes")
+
+    def client_key(self):
+        # Ids in the URL or body are whatever the client says they are, so a client could
+        # rotate through them for fresh buckets; the address is the only identity we have
+        return f"ip:{request.remote_addr}"
+
+    def _admit(self):
+        if not self.enabled:
+            return None
+        route_class = self.classify()
+        if route_class is None:
+            return None
+
+        rate, burst = self.rates[route_class]
+        try:
+            allowed, wait = self.buckets.take(f"{route_class}:{self.client_key()}", rate, burst)
+        except Exception:
+            # A shared-store outage must not take the API down with it
+            self.bucket_errors += 1
+            allowed, wait = True, 0.0
+        if not allowed:
+            return self._refuse(route_class, "rate_limited", 429, "Too many requests", wait)
+
+        if request.endpoint.rpartition(".")[2] in self._unlimited:
+            return None
+        if not self._slots[route_class].acquire(blocking=False):
+            return self._refuse(route_class, "over_capacity", 503, "Server busy, retry shortly", 1.0)
+        g.admission_slot = route_class
+        with self._lock:
+            self._in_flight[route_class] += 1
+        return None
+
+    def _refuse(self, route_class, reason, status, message, retry_after):
+        with self._lock:
+            self.shed.inc((route_class, reason))
+        retry_after = max(1, math.ceil(retry_after))
+        response = jsonify({"error": message, "retry_after": retry_after})
+        response.status_code = status
+        response.headers["Retry-After"] = str(retry_after)
+        return response
+
+    def _release(self, exc):
+        route_class = g.pop("admission_slot", None)
+        if route_class is not None:
+            with self._lock:
+                self._in_flight[route_class] -= 1
+            self._slots[route_class].release()
+
+    def render(self):
+        with self._lock:
+            return "\n".join(self.shed.render()) + "\n"
+
+    def stats(self):
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "in_flight": dict(self._in_flight),
+                "concurrency": dict(self.concurrency),
+                "rates": {name: {"per_second": rate, "burst": burst} for name, (rate, burst) in self.rates.items()},
+                "shed": {f"{c}:{r}": n for (c, r), n in self.shed._series.items()},
+                "buckets": len(self.buckets),
+                "bucket_errors": self.bucket_errors,
+            }
@@ -0,0 +1,411 @@
+"""Optional asyncio serving mode for the read-heavy endpoints.
+
+A small ASGI app that answers the busiest GET routes on SQLAlchemy's async
+engine, so one worker can keep many MySQL round trips in flight instead of
+blocking a thread on each. It imports App for the models, column
+projections, serializers, identity caches and catalog cache, so responses
+match the Flask routes byte for byte in shape. Writes and every other route
+stay on the Flask app; put both behind the same proxy and send these paths
+here:
+
+    GET /farmers/<id>/products
+    GET /farmers/<id>/transactions
+    GET /farmers/<id>/analytics
+    GET /retailer/<id>/available-products
+    GET /retailers/<id>/transaction-history
+    GET /retailers/<id>/monthly-summary
+
+    pip install uvicorn aiomysql          # aiosqlite for SQLite
+    uvicorn asgi:app --workers 2
+
+The async URL is derived from DATABASE_URL (mysql+pymysql -> mysql+aiomysql,
+sqlite -> sqlite+aiosqlite) unless ASYNC_DATABASE_URL is set.
+"""
+import asyncio
+import os
+import re
+from urllib.parse import parse_qsl, urlencode
+
+from sqlalchemy import select
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from werkzeug.exceptions import HTTPException
+from werkzeug.http import parse_etags
+
+import App as flask_app
+from App import (
+    CATALOG_COLUMNS, FARMER_TRANSACTION_COLUMNS, PRODUCT_COLUMNS, RETAILER_TRANSACTION_COLUMNS,
+    DataVersion, Farmer, FarmerIdentity, FarmerSalesRollup, Product, Purchase, Retailer, RetailerIdentity,
+    RetailerMonthlyPurchases, SalesRollupBackfill, catalog_row, farmer_transaction_row, monthly_summary,
+    parse_date_range, product_row, product_status_filters, retailer_transaction_row, sales_summary,
+    versions_etag,
+)
+from db_pool import pool_recycle_from_env
+from fast_json import dumps
+from pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, STREAM_BATCH_SIZE, _after, decode_cursor, encode_cursor
+
+ASYNC_DRIVERS = {
+    "mysql": "mysql+aiomysql",
+    "mysql+pymysql": "mysql+aiomysql",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
+
+
+def async_database_url(url):
+    url = make_url(url)
+    return url.set(drivername=ASYNC_DRIVERS.get(url.drivername, url.drivername))
+
+
+def _engine_options():
+    options = {"pool_pre_ping": True, "pool_recycle": pool_recycle_from_env(os.environ)}
+    for option, name in (("pool_size", "DB_POOL_SIZE"), ("max_overflow", "DB_MAX_OVERFLOW")):
+        if os.environ.get(name):
+            options[option] = int(os.environ[name])
+    return options
+
+
+engine = create_async_engine(
+    os.environ.get("ASYNC_DATABASE_URL")
+    or async_database_url(flask_app.app.config["SQLALCHEMY_DATABASE_URI"]),
+    **_engine_options(),
+)
+
+
+# ---------------- Request / Response ----------------
+class Request:
+    def __init__(self, scope):
+        self.method = scope["method"]
+        self.path = scope["path"]
+        query = scope.get("query_string", b"").decode("latin-1")
+        self.full_path = f"{self.path}?{query}"
+        self.args = {}
+        for key, value in parse_qsl(query, keep_blank_values=True):
+            self.args.setdefault(key, value)
+        self.headers = {k.decode("latin-1").lower(): v.decode("latin-1") for k, v in scope["headers"]}
+        host = self.headers.get("host", "localhost")
+        self.base_url = f"{scope.get('scheme', 'http')}://{host}{self.path}"
+
+
+class Response:
+    def __init__(self, body=b"", status=200, headers=None, content_type="application/json"):
+        self.body = body
+        self.status = status
+        self.headers = dict(headers or {})
+        self.headers.setdefault("Content-Type", content_type)
+
+
+def json_response(value, status=200, headers=None):
+    return Response(dumps(value), status, headers)
+
+
+def error(message, status):
+    return json_response({"error": message}, status)
+
+
+def etag_headers(etag):
+    return {"ETag": f'"{etag}"', "Cache-Control": "no-cache"} if etag else {}
+
+
+def etag_matches(request, etag):
+    return parse_etags(request.headers.get("if-none-match")).contains(etag)
+
+
+def not_modified(etag):
+    return Response(b"", 304, etag_headers(etag))
+
+
+# ---------------- Shared Lookups ----------------
+async def find_farmer(session, farmer_id):
+    # Same cache as the Flask app's find_farmer, filled with an async query on a miss
+    identity = flask_app.farmer_identities.get(farmer_id)
+    if identity is None:
+        row = (await session.execute(
+            select(Farmer.id, Farmer.farmername, Farmer.State).where(Farmer.id == farmer_id)
+        )).first()
+        if row:
+            identity = FarmerIdentity(*row)
+            flask_app.farmer_identities.set(farmer_id, identity)
+    return identity
+
+
+async def find_retailer(session, retailer_id):
+    identity = flask_app.retailer_identities.get(retailer_id)
+    if identity is None:
+        row = (await session.execute(
+            select(Retailer.aadhar, Retailer.enterprise_name, Retailer.State).where(Retailer.aadhar == retailer_id)
+        )).first()
+        if row:
+            identity = RetailerIdentity(*row)
+            flask_app.retailer_identities.set(retailer_id, identity)
+    return identity
+
+
+async def list_etag(request, session, *scopes):
+    # Same tag as the Flask app's list_etag, so either server can revalidate the other's responses
+    versions = dict((await session.execute(
+        select(DataVersion.scope, DataVersion.version).where(DataVersion.scope.in_(scopes))
+    )).all())
+    return versions_etag(versions, scopes, request.full_path)
+
+
+async def paginate(
+    request, session, stmt, keys, row_key, serialize, descending=False, empty_error=None, etag=None,
+):
+    """Async twin of pagination.paginated_response: ?limit/&after pages, ?stream=1, or the full list."""
+    stmt = stmt.order_by(*[k.desc() if descending else k.asc() for k in keys])
+
+    limit = request.args.get("limit")
+    after = request.args.get("after")
+    if limit is not None or after is not None:
+        try:
+            limit = int(limit) if limit is not None else DEFAULT_PAGE_SIZE
+        except ValueError:
+            return error("limit must be integer", 400)
+        if not 1 <= limit <= MAX_PAGE_SIZE:
+            return error(f"limit must be between 1 and {MAX_PAGE_SIZE}", 400)
+        if after:
+            stmt = stmt.where(_after(keys, decode_cursor(after, keys), descending))
+
+        rows = (await session.execute(stmt.limit(limit + 1))).all()
+        if not rows and not after and empty_error:
+            return error(empty_error, 404)
+        headers = etag_headers(etag)
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(row_key(rows[-1]))
+            headers["X-Next-Cursor"] = next_cursor
+            headers["Link"] = f'<{request.base_url}?{urlencode(dict(request.args, after=next_cursor))}>; rel="next"'
+        return json_response([serialize(row) for row in rows], 200, headers)
+
+    if request.args.get("stream", "").lower() in ("1", "true", "yes"):
+        return Response(_stream_array(stmt, serialize, empty_error), 200, etag_headers(etag))
+
+    rows = (await session.execute(stmt)).all()
+    if not rows and empty_error:
+        return error(empty_error, 404)
+    return json_response([serialize(row) for row in rows], 200, etag_headers(etag))
+
+
+async def _stream_array(stmt, serialize, empty_error):
+    # Runs after the handler's session is gone, so it holds its own connection while streaming
+    async with AsyncSession(engine) as session:
+        result = await session.stream(stmt.execution_options(yield_per=STREAM_BATCH_SIZE))
+        first = True
+        yield b"["
+        async for row in result:
+            yield (b"" if first else b",") + dumps(serialize(row))
+            first = False
+        yield b"]"
+
+
+# ---------------- Routes ----------------
+ROUTES = []
+
+
+def route(pattern):
+    compiled = re.compile("^" + re.sub(r"<(int|string):(\w+)>", _param, pattern) + "$")
+
+    def register(handler):
+        ROUTES.append((compiled, handler))
+        return handler
+    return register
+
+
+def _param(match):
+    kind, name = match.groups()
+    return f"(?P<{name}>\\d+)" if kind == "int" else f"(?P<{name}>[^/]+)"
+
+
+@route("/farmers/<int:farmer_id>/products")
+async def list_products(request, session, farmer_id):
+    if not await find_farmer(session, int(farmer_id)):
+        return error("Farmer not found", 404)
+    etag = await list_etag(request, session, f"farmer:{farmer_id}")
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    stmt = select(*PRODUCT_COLUMNS).where(
+        Product.farmer_id == int(farmer_id), *product_status_filters(request.args.get("status")),
+    )
+    return await paginate(
+        request, session, stmt,
+        keys=(Product.updated_at, Product.id),
+        row_key=lambda row: (row.updated_at, row.id),
+        serialize=product_row,
+        descending=True,
+        etag=etag,
+    )
+
+
+@route("/farmers/<int:farmer_id>/transactions")
+async def farmer_transactions(request, session, farmer_id):
+    if not await find_farmer(session, int(farmer_id)):
+        return error("Farmer not found", 404)
+    etag = await list_etag(request, session, f"farmer:{farmer_id}")
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    stmt = (
+        select(*FARMER_TRANSACTION_COLUMNS)
+        .select_from(Purchase)
+        .join(Product, Purchase.product_id == Product.id)
+        .where(Product.farmer_id == int(farmer_id))
+    )
+    return await paginate(
+        request, session, stmt,
+        keys=(Purchase.created_at, Purchase.id),
+        row_key=lambda row: (row.created_at, row.id),
+        serialize=farmer_transaction_row,
+        etag=etag,
+    )
+
+
+@route("/farmers/<int:farmer_id>/analytics")
+async def farmer_analytics(request, session, farmer_id):
+    farmer_id = int(farmer_id)
+    if not await find_farmer(session, farmer_id):
+        return error("Farmer not found", 404)
+    if await session.get(SalesRollupBackfill, farmer_id):
+        rows = (await session.execute(
+            select(
+                FarmerSalesRollup.category, FarmerSalesRollup.present_stock,
+                FarmerSalesRollup.units_sold, FarmerSalesRollup.revenue,
+            ).where(FarmerSalesRollup.farmer_id == farmer_id)
+        )).all()
+        rollup = {category: (present, units, revenue) for category, present, units, revenue in rows}
+    else:
+        # Not backfilled yet: the Flask app's grouped fallback, off the event loop
+        rollup = await asyncio.to_thread(_computed_rollup, farmer_id)
+    return json_response(sales_summary(rollup))
+
+
+def _computed_rollup(farmer_id):
+    with flask_app.app.app_context():
+        return {cat: tuple(v) for (_, cat), v in flask_app.compute_sales_rollup(farmer_id).items()}
+
+
+@route("/retailer/<string:retailer_id>/available-products")
+async def available_products(request, session, retailer_id):
+    retailer = await find_retailer(session, retailer_id)
+    if not retailer:
+        return error("Retailer not found", 404)
+
+    cache = flask_app.catalog_cache
+    paged = any(arg in request.args for arg in ("limit", "after", "stream"))
+    if not paged:
+        generation, entry = cache.lookup(retailer.State)
+        if entry is None:
+            rows = (await session.execute(_catalog_stmt(retailer.State).order_by(Product.id))).all()
+            # Same encoder as the Flask route, so both servers fill the cache with identical bodies
+            body = flask_app.app.json.dumps([catalog_row(row) for row in rows]).encode()
+            entry = cache.store(retailer.State, generation, body)
+        if etag_matches(request, entry.etag):
+            return not_modified(entry.etag)
+        return Response(entry.body, 200, etag_headers(entry.etag))
+
+    return await paginate(
+        request, session, _catalog_stmt(retailer.State),
+        keys=(Product.id,),
+        row_key=lambda row: (row.id,),
+        serialize=catalog_row,
+    )
+
+
+def _catalog_stmt(state):
+    return (
+        select(*CATALOG_COLUMNS)
+        .select_from(Product)
+        .join(Farmer, Product.farmer_id == Farmer.id)
+        .where(Farmer.State == state, Product.in_stock.is_(True))
+    )
+
+
+@route("/retailers/<string:retailer_id>/transaction-history")
+async def retailer_transaction_history(request, session, retailer_id):
+    if not await find_retailer(session, retailer_id):
+        return error("Retailer not found", 404)
+    etag = await list_etag(request, session, f"retailer:{retailer_id}", "product_names")
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    stmt = (
+        select(*RETAILER_TRANSACTION_COLUMNS)
+        .select_from(Purchase)
+        .join(Product, Purchase.product_id == Product.id)
+        .join(Farmer, Product.farmer_id == Farmer.id)
+        .where(Purchase.retailer_id == retailer_id)
+    )
+    return await paginate(
+        request, session, stmt,
+        keys=(Purchase.created_at, Purchase.id),
+        row_key=lambda row: (row.created_at, row.id),
+        serialize=retailer_transaction_row,
+        empty_error="No transactions found for this retailer.",
+        etag=etag,
+    )
+
+
+@route("/retailers/<string:retailer_id>/monthly-summary")
+async def retailer_monthly_summary(request, session, retailer_id):
+    if not await find_retailer(session, retailer_id):
+        return error("Retailer not found", 404)
+    start, end = parse_date_range(request.args)
+    stmt = select(RetailerMonthlyPurchases).where(RetailerMonthlyPurchases.retailer_id == retailer_id)
+    if start is not None:
+        stmt = stmt.where(
+            RetailerMonthlyPurchases.month >= flask_app.month_start(start),
+            RetailerMonthlyPurchases.month < end.date(),
+        )
+    months = (await session.scalars(stmt.order_by(RetailerMonthlyPurchases.month))).all()
+    return json_response(monthly_summary(retailer_id, [m.to_dict() for m in months]))
+
+
+# ---------------- ASGI Entry Point ----------------
+async def dispatch(request):
+    for pattern, handler in ROUTES:
+        match = pattern.match(request.path)
+        if match:
+            break
+    else:
+        return error("Not Found", 404)
+    if request.method not in ("GET", "HEAD"):
+        return error("Method Not Allowed", 405)
+    try:
+        async with AsyncSession(engine) as session:
+            return await handler(request, session, **match.groupdict())
+    except HTTPException as e:
+        # Shared validators (decode_cursor, parse_date_range) abort like the Flask routes do
+        return error(e.description, e.code)
+
+
+async def app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await engine.dispose()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+    if scope["type"] != "http":
+        return
+
+    request = Request(scope)
+    try:
+        response = await dispatch(request)
+    except Exception:
+        flask_app.app.logger.exception("Unhandled error on %s %s", request.method, request.path)
+        response = error("Internal Server Error", 500)
+
+    headers = [(k.lower().encode("latin-1"), str(v).encode("latin-1")) for k, v in response.headers.items()]
+    streaming = not isinstance(response.body, bytes)
+    if not streaming:
+        headers.append((b"content-length", str(len(response.body)).encode()))
+    await send({"type": "http.response.start", "status": response.status, "headers": headers})
+    if request.method == "HEAD":
+        await send({"type": "http.response.body", "body": b""})
+    elif streaming:
+        async for chunk in response.body:
+            await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        await send({"type": "http.response.body", "body": b""})
+    else:
+        await send({"type": "http.response.body", "body": response.body})
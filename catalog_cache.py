@@ -0,0 +1,144 @@
+import hashlib
+import threading
+import time
+
+# ---------------- State Catalog Cache ----------------
+# Serialized available-products catalogs keyed by State. Every write that can
+# change a state's catalog bumps that state's generation; a fill computed
+# against an older generation is discarded, so a reader racing a writer can
+# never re-cache stale rows. The response ETag is a hash of the body, so it only
+# changes when the catalog does: a TTL refill, or a fill in another worker,
+# that produces the same rows keeps the client's cached copy valid.
+#
+# Unlike the list endpoints this is not a data version: every purchase changes
+# some state's catalog, so a per-state version row would be one that all of
+# the state's purchases lock. The body is hashed once per fill, not per request.
+
+
+class CatalogEntry:
+    __slots__ = ("etag", "body", "expires_at")
+
+    def __init__(self, etag, body, expires_at):
+        self.etag = etag
+        self.body = body
+        self.expires_at = expires_at
+
+
+class InProcessCatalogBackend:
+    def __init__(self):
+        self._entries = {}
+        self._generations = {}
+        self._lock = threading.Lock()
+
+    def get(self, state):
+        with self._lock:
+            return self._generations.get(state, 0), self._entries.get(state)
+
+    def put(self, state, generation, entry):
+        with self._lock:
+            if self._generations.get(state, 0) != generation:
+                return False
+            self._entries[state] = entry
+            return True
+
+    def invalidate(self, state):
+        with self._lock:
+            self._generations[state] = self._generations.get(state, 0) + 1
+            self._entries.pop(state, None)
+
+    def clear(self):
+        with self._lock:
+            for state in list(self._entries):
+                self._generations[state] = self._generations.get(state, 0) + 1
+            self._entries.clear()
+
+
+class RedisCatalogBackend:
+    """Shares catalogs and generations between workers through Redis."""
+
+    def __init__(self, url, prefix="farm2bazaar:catalog:"):
+        try:
+            import redis
+        except ImportError as exc:
+            raise RuntimeError("CATALOG_CACHE_URL needs the 'redis' package installed") from exc
+        self._redis = redis.Redis.from_url(url)
+        self._watch_error = redis.WatchError
+        self._prefix = prefix
+
+    def _keys(self, state):
+        return f"{self._prefix}{state}:gen", f"{self._prefix}{state}:entry"
+
+    def get(self, state):
+        gen_key, entry_key = self._keys(state)
+        generation, raw = self._redis.mget(gen_key, entry_key)
+        generation = int(generation or 0)
+        if raw is None:
+            return generation, None
+        entry_generation, etag, expires_at, body = raw.split(b"\n", 3)
+        if int(entry_generation) != generation:
+            return generation, None
+        return generation, CatalogEntry(etag.decode(), body, float(expires_at))
+
+    def put(self, state, generation, entry):
+        gen_key, entry_key = self._keys(state)
+        with self._redis.pipeline() as pipe:
+            try:
+                pipe.watch(gen_key)
+                if int(pipe.get(gen_key) or 0) != generation:
+                    return False
+                pipe.multi()
+                raw = b"\n".join([
+                    str(generation).encode(), entry.etag.encode(), repr(entry.expires_at).encode(), entry.body,
+                ])
+                pipe.set(entry_key, raw, exat=int(entry.expires_at) + 1)
+                pipe.execute()
+                return True
+            except self._watch_error:
+                return False
+
+    def invalidate(self, state):
+        gen_key, entry_key = self._keys(state)
+        with self._redis.pipeline() as pipe:
+            pipe.incr(gen_key)
+            pipe.delete(entry_key)
+            pipe.execute()
+
+    def clear(self):
+        for key in self._redis.scan_iter(f"{self._prefix}*:entry"):
+            self._redis.delete(key)
+
+
+class CatalogCache:
+    def __init__(self, backend=None, ttl=30):
+        self.backend = backend or InProcessCatalogBackend()
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_url(cls, url=None, ttl=30):
+        backend = RedisCatalogBackend(url) if url else InProcessCatalogBackend()
+        return cls(backend, ttl)
+
+    def lookup(self, state):
+        """Return ``(generation, entry)``; ``entry`` is None on a miss or expiry."""
+        generation, entry = self.backend.get(state)
+        if entry is not None and entry.expires_at <= time.time():
+            entry = None
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return generation, entry
+
+    def store(self, state, generation, body):
+        entry = CatalogEntry(hashlib.blake2b(body, digest_size=16).hexdigest(), body, time.time() + self.ttl)
+        self.backend.put(state, generation, entry)
+        return entry
+
+    def invalidate(self, state):
+        if state is not None:
+            self.backend.invalidate(state)
+
+    def clear(self):
+        self.backend.clear()
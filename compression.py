@@ -0,0 +1,189 @@
+import gzip
+import threading
+import zlib
+from collections import OrderedDict
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+# ---------------- Response Compression ----------------
+# Negotiated Content-Encoding for JSON/CSV/text responses above a size
+# threshold: brotli when the client accepts it and the ``brotli`` package is
+# installed, gzip otherwise. Streamed bodies are compressed chunk by chunk.
+#
+# A compressed body is a different representation, so its strong ETag gets
+# an encoding suffix ("<etag>-gzip"); etag_matches() accepts either form when
+# checking If-None-Match, and a 304 echoes the form the client holds, as a 304
+# must carry the ETag its 200 would have. Bodies that carry an ETag are kept
+# compressed in a small LRU, so a popular unchanged response (the state
+# catalog) is only compressed once per worker.
+#
+#   COMPRESS_MIN_SIZE (default 1024)  bytes below which responses are sent as is
+#   COMPRESS_GZIP_LEVEL (default 6), COMPRESS_BROTLI_QUALITY (default 5)
+#   COMPRESS_CACHE_BYTES (default 32 MiB)
+
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/csv", "text/plain", "text/html")
+ENCODINGS = ("br", "gzip")
+
+
+def available_encodings():
+    return ENCODINGS if brotli is not None else ("gzip",)
+
+
+def etag_matches(etag):
+    """True when If-None-Match names ``etag`` or one of its compressed variants."""
+    if_none_match = request.if_none_match
+    return if_none_match.contains(etag) or any(
+        if_none_match.contains(f"{etag}-{encoding}") for encoding in ENCODINGS
+    ) or if_none_match.star_tag
+
+
+def held_etag(etag):
+    """The form of ``etag`` (bare or a compressed variant) that If-None-Match names."""
+    if_none_match = request.if_none_match
+    for encoding in ENCODINGS:
+        variant = f"{etag}-{encoding}"
+        if if_none_match.is_strong(variant) or if_none_match.is_weak(variant):
+            return variant
+    return etag
+
+
+class Compression:
+    def __init__(self, min_size=1024, gzip_level=6, brotli_quality=5, cache_bytes=32 * 1024 * 1024):
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.cache_bytes = cache_bytes
+        self.compressed = {encoding: 0 for encoding in ENCODINGS}
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.cache_hits = 0
+        self._cache = OrderedDict()
+        self._cached_bytes = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, env):
+        return cls(
+            min_size=int(env.get("COMPRESS_MIN_SIZE", "1024")),
+            gzip_level=int(env.get("COMPRESS_GZIP_LEVEL", "6")),
+            brotli_quality=int(env.get("COMPRESS_BROTLI_QUALITY", "5")),
+            cache_bytes=int(env.get("COMPRESS_CACHE_BYTES", str(32 * 1024 * 1024))),
+        )
+
+    def init_app(self, app):
+        app.after_request(self._compress)
+
+    def negotiate(self):
+        accepted = request.accept_encodings
+        best, best_quality = None, 0
+        for encoding in available_encodings():
+            quality = accepted[encoding]
+            if quality > best_quality:
+                best, best_quality = encoding, quality
+        return best
+
+    def compress(self, body, encoding):
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+
+    def _compressor(self, encoding):
+        if encoding == "br":
+            return brotli.Compressor(quality=self.brotli_quality)
+        return zlib.compressobj(self.gzip_level, zlib.DEFLATED, 31)  # 31: gzip container
+
+    def _compress(self, response):
+        if response.status_code == 304:
+            # Views tag 304s with the bare ETag; send back the variant the 200 carried
+            etag, weak = response.get_etag()
+            if etag:
+                response.set_etag(held_etag(etag), weak=weak)
+            response.vary.add("Accept-Encoding")
+            return response
+        if (
+            response.status_code != 200
+            or request.method == "HEAD"
+            or "Content-Encoding" in response.headers
+            or response.mimetype not in COMPRESSIBLE_TYPES
+        ):
+            return response
+        response.vary.add("Accept-Encoding")
+        encoding = self.negotiate()
+        if encoding is None:
+            return response
+
+        etag, weak = response.get_etag()
+        if response.is_streamed:
+            response.response = self._stream(response.response, encoding)
+            response.headers.pop("Content-Length", None)
+        else:
+            body = response.get_data()
+            if len(body) < self.min_size:
+                return response
+            response.set_data(self._cached_compress(etag if etag and not weak else None, body, encoding))
+            with self._lock:
+                self.bytes_in += len(body)
+                self.bytes_out += response.content_length
+        response.headers["Content-Encoding"] = encoding
+        if etag:
+            response.set_etag(f"{etag}-{encoding}", weak=weak)
+        with self._lock:
+            self.compressed[encoding] += 1
+        return response
+
+    def _cached_compress(self, etag, body, encoding):
+        if etag is None:
+            return self.compress(body, encoding)
+        key = (etag, encoding)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.cache_hits += 1
+                return cached
+        compressed = self.compress(body, encoding)
+        with self._lock:
+            if key not in self._cache and len(compressed) <= self.cache_bytes:
+                self._cache[key] = compressed
+                self._cached_bytes += len(compressed)
+                while self._cached_bytes > self.cache_bytes:
+                    _, evicted = self._cache.popitem(last=False)
+                    self._cached_bytes -= len(evicted)
+        return compressed
+
+    def _stream(self, chunks, encoding):
+        compressor = self._compressor(encoding)
+        try:
+            for chunk in chunks:
+                if isinstance(chunk, str):
+                    chunk = chunk.encode("utf-8")
+                if not chunk:
+                    continue
+                # Sync-flush every chunk so each leaves as soon as the app yields it
+                # (header rows, SSE events) instead of waiting in the compressor's window
+                if encoding == "br":
+                    yield compressor.process(chunk) + compressor.flush()
+                else:
+                    yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+            yield compressor.finish() if encoding == "br" else compressor.flush()
+        finally:
+            close = getattr(chunks, "close", None)
+            if close is not None:
+                close()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "encodings": list(available_encodings()),
+                "min_size": self.min_size,
+                "compressed": dict(self.compressed),
+                "bytes_in": self.bytes_in,
+                "bytes_out": self.bytes_out,
+                "cache_hits": self.cache_hits,
+                "cached_bytes": self._cached_bytes,
+            }
@@ -0,0 +1,72 @@
+from datetime import date, timedelta
+
+from sqlalchemy import String
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
+from sqlalchemy.sql.visitors import InternalTraversal
+
+# ---------------- Date Buckets ----------------
+# date_bucket(column, "day" | "week" | "month") renders the start of the
+# bucket as text ("2025-09-13", week of Monday "2025-09-08", "2025-09") so
+# GROUP BY runs in the database on every backend we deploy or test on.
+BUCKETS = ("day", "week", "month")
+
+
+class date_bucket(FunctionElement):
+    type = String()
+    name = "date_bucket"
+    inherit_cache = True
+    # The bucket changes the rendered SQL, so it must be part of the statement cache key
+    _traverse_internals = FunctionElement._traverse_internals + [("bucket", InternalTraversal.dp_string)]
+
+    def __init__(self, column, bucket):
+        if bucket not in BUCKETS:
+            raise ValueError(f"bucket must be one of {', '.join(BUCKETS)}")
+        self.bucket = bucket
+        super().__init__(column)
+
+
+@compiles(date_bucket, "sqlite")
+def _sqlite_bucket(element, compiler, **kw):
+    column = compiler.process(element.clauses, **kw)
+    if element.bucket == "day":
+        return f"date({column})"
+    if element.bucket == "week":
+        # 'weekday 0' moves forward to Sunday (or stays), so -6 days lands on Monday
+        return f"date({column}, 'weekday 0', '-6 days')"
+    return f"strftime('%Y-%m', {column})"
+
+
+@compiles(date_bucket, "mysql")
+def _mysql_bucket(element, compiler, **kw):
+    column = compiler.process(element.clauses, **kw)
+    if element.bucket == "day":
+        return f"DATE_FORMAT({column}, '%%Y-%%m-%%d')"
+    if element.bucket == "week":
+        return f"DATE_FORMAT(DATE_SUB({column}, INTERVAL WEEKDAY({column}) DAY), '%%Y-%%m-%%d')"
+    return f"DATE_FORMAT({column}, '%%Y-%%m')"
+
+
+@compiles(date_bucket)
+def _default_bucket(element, compiler, **kw):
+    column = compiler.process(element.clauses, **kw)
+    if element.bucket == "month":
+        return f"to_char(date_trunc('month', {column}), 'YYYY-MM')"
+    return f"to_char(date_trunc('{element.bucket}', {column}), 'YYYY-MM-DD')"
+
+
+def bucket_labels(start, end, bucket):
+    """Every bucket label date_bucket() can produce for days in ``[start, end)``, in order."""
+    if bucket not in BUCKETS:
+        raise ValueError(f"bucket must be one of {', '.join(BUCKETS)}")
+    if bucket == "month":
+        day = start.replace(day=1)
+        while day < end:
+            yield day.strftime("%Y-%m")
+            day = date(day.year + day.month // 12, day.month % 12 + 1, 1)
+        return
+    step = timedelta(days=7 if bucket == "week" else 1)
+    day = start - timedelta(days=start.weekday()) if bucket == "week" else start
+    while day < end:
+        yield day.isoformat()
+        day += step
@@ -0,0 +1,150 @@
+import json
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+# ---------------- Connection Pool ----------------
+# Railway's proxy drops idle MySQL connections, so connections are pre-pinged
+# and recycled before the proxy's idle cutoff by default. Everything else is
+# tunable from the environment:
+#
+#   DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT   QueuePool sizing
+#   DB_POOL_RECYCLE (default 280; 0 or -1 disables), DB_POOL_PRE_PING (default true)
+#   SQLALCHEMY_ENGINE_OPTIONS                        JSON merged on top
+
+
+class PoolStats:
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.connects = 0
+        self.invalidations = 0
+        self._lock = threading.Lock()
+
+    def record_wait(self, seconds, timed_out=False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.total_wait += seconds
+            self.max_wait = max(self.max_wait, seconds)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "checkout_timeouts": self.timeouts,
+                "avg_wait_ms": round(self.total_wait / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "max_wait_ms": round(self.max_wait * 1000, 3),
+                "connects": self.connects,
+                "invalidations": self.invalidations,
+            }
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.stats.record_wait(time.perf_counter() - started, timed_out=True)
+            raise
+        self.stats.record_wait(time.perf_counter() - started)
+        return connection
+
+
+def _env_int(env, name):
+    value = env.get(name)
+    return int(value) if value not in (None, "") else None
+
+
+def pool_recycle_from_env(env):
+    recycle = _env_int(env, "DB_POOL_RECYCLE")
+    if recycle is None:
+        return 280
+    # -1 is SQLAlchemy's "never recycle"
+    return -1 if recycle <= 0 else recycle
+
+
+def engine_options_from_env(env, database_uri):
+    url = make_url(database_uri)
+    options = {
+        "pool_pre_ping": env.get("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes"),
+        "pool_recycle": pool_recycle_from_env(env),
+    }
+    # In-memory SQLite needs Flask-SQLAlchemy's StaticPool; anything else gets a timed QueuePool
+    if not (url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")):
+        options["poolclass"] = TimedQueuePool
+        for option, name in (
+            ("pool_size", "DB_POOL_SIZE"),
+            ("max_overflow", "DB_MAX_OVERFLOW"),
+            ("pool_timeout", "DB_POOL_TIMEOUT"),
+        ):
+            value = _env_int(env, name)
+            if value is not None:
+                options[option] = value
+    if env.get("SQLALCHEMY_ENGINE_OPTIONS"):
+        options.update(json.loads(env["SQLALCHEMY_ENGINE_OPTIONS"]))
+    return options
+
+
+def instrument_pool(engine):
+    stats = getattr(engine.pool, "stats", None)
+    if stats is None:
+        return
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        stats.connects += 1
+
+    @event.listens_for(engine, "invalidate")
+    def _on_invalidate(dbapi_connection, connection_record, exception):
+        stats.invalidations += 1
+
+
+def warm_pool(engine, count):
+    """Open ``count`` connections up front (pinging each) and return them to the pool."""
+    connections = []
+    try:
+        for _ in range(count):
+            connections.append(engine.connect())
+    finally:
+        for connection in connections:
+            connection.close()
+    return len(connections)
+
+
+def pool_status(engine):
+    pool = engine.pool
+    status = {"pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update({
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow(),
+            "max_overflow": pool._max_overflow,
+            "timeout_seconds": pool.timeout(),
+        })
+    stats = getattr(pool, "stats", None)
+    if stats is not None:
+        status.update(stats.snapshot())
+    return status
@@ -0,0 +1,161 @@
+import functools
+import logging
+import threading
+import time
+
+from flask import g, has_request_context, request
+from flask_sqlalchemy.session import Session
+
+logger = logging.getLogger(__name__)
+
+# ---------------- Read Replica Routing ----------------
+# With REPLICA_DATABASE_URL set, views wrapped in @replica_router.replica_reads send
+# their SELECTs to the "replica" bind; every write, and every request not
+# wrapped, stays on the primary. A wrapped request still reads from the
+# primary when:
+#
+#   * the client asks for it: ``X-Read-From: primary`` or ``?read_from=primary``
+#     (``replica`` skips the read-your-writes check below);
+#   * the client wrote within the lag tolerance: successful writes set a short
+#     cookie, so a farmer who just edited a product sees the edit;
+#   * the replica is further behind than the tolerance, or its lag can't be
+#     measured (down, replication stopped).
+#
+#   REPLICA_MAX_LAG (default 5)          seconds of staleness tolerated
+#   REPLICA_LAG_CHECK_SECONDS (default 5) how often lag is measured
+#   REPLICA_LAG_QUERY                    SQL returning lag in seconds; MySQL
+#                                        (8.0.22+) uses SHOW REPLICA STATUS,
+#                                        other backends count as current
+#
+# Locally, two SQLite files stand in for primary and replica: copy the primary
+# file to the replica path whenever the replica should "catch up".
+
+REPLICA_BIND = "replica"
+PRIMARY = "primary"
+LAST_WRITE_COOKIE = "f2b_last_write"
+WRITE_METHODS = ("POST", "PUT", "PATCH", "DELETE")
+
+
+class RoutingSession(Session):
+    """db.session that reads from the replica bind inside replica-routed requests."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (
+            bind is None
+            and not self._flushing
+            and not getattr(clause, "is_dml", False)
+            and has_request_context()
+            and g.get("db_read_target") == REPLICA_BIND
+        ):
+            return self._db.engines[REPLICA_BIND]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+class ReplicaRouter:
+    def __init__(self, db, max_lag=5.0, lag_check_seconds=5.0, lag_query=None):
+        self.db = db
+        self.max_lag = max_lag
+        self.lag_check_seconds = lag_check_seconds
+        self.lag_query = lag_query
+        self.routed = {REPLICA_BIND: 0, PRIMARY: 0}
+        self.reasons = {}
+        self._lag = None
+        self._checked_at = None
+        self._lock = threading.Lock()
+        self._lag_lock = threading.Lock()
+
+    def init_app(self, app):
+        if REPLICA_BIND in app.config.get("SQLALCHEMY_BINDS", {}):
+            app.after_request(self._remember_write)
+
+    @property
+    def engine(self):
+        """The current app's replica engine, or None when it has no replica."""
+        return self.db.engines.get(REPLICA_BIND)
+
+    def replica_reads(self, view):
+        """Route the view's reads to the replica when it is fresh enough for this client."""
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            g.db_read_target = self.choose()
+            return view(*args, **kwargs)
+        return wrapper
+
+    def choose(self):
+        engine = self.engine
+        if engine is None:
+            return PRIMARY
+        requested = (request.headers.get("X-Read-From") or request.args.get("read_from") or "").lower()
+        if requested == PRIMARY:
+            return self._route(PRIMARY, "requested")
+        if requested != REPLICA_BIND and self._wrote_recently():
+            return self._route(PRIMARY, "recent_write")
+        lag = self.lag(engine)
+        if lag is None or lag > self.max_lag:
+            return self._route(PRIMARY, "lagging")
+        return self._route(REPLICA_BIND, None)
+
+    def _route(self, target, reason):
+        with self._lock:
+            self.routed[target] += 1
+            if reason:
+                self.reasons[reason] = self.reasons.get(reason, 0) + 1
+        return target
+
+    def _wrote_recently(self):
+        try:
+            wrote_at = float(request.cookies.get(LAST_WRITE_COOKIE, ""))
+        except ValueError:
+            return False
+        return time.time() - wrote_at < self.max_lag
+
+    def _remember_write(self, response):
+        if request.method in WRITE_METHODS and response.status_code < 400:
+            secure = request.is_secure
+            response.set_cookie(
+                LAST_WRITE_COOKIE, f"{time.time():.3f}", max_age=max(1, int(self.max_lag + 1)),
+                httponly=True, secure=secure, samesite="None" if secure else "Lax",
+            )
+        return response
+
+    def lag(self, engine):
+        """Replica lag in seconds (cached), or None when it can't be measured."""
+        now = time.monotonic()
+        if self._checked_at is not None and now - self._checked_at < self.lag_check_seconds:
+            return self._lag
+        if not self._lag_lock.acquire(blocking=self._checked_at is None):
+            return self._lag  # another request is measuring; use the last value
+        try:
+            try:
+                self._lag = self._measure_lag(engine)
+            except Exception as e:
+                logger.warning("Could not measure replica lag: %s", e)
+                self._lag = None
+            self._checked_at = time.monotonic()
+            return self._lag
+        finally:
+            self._lag_lock.release()
+
+    def _measure_lag(self, engine):
+        with engine.connect() as connection:
+            if self.lag_query:
+                value = connection.exec_driver_sql(self.lag_query).scalar()
+                return float(value) if value is not None else None
+            if engine.dialect.name != "mysql":
+                connection.exec_driver_sql("SELECT 1")
+                return 0.0
+            status = connection.exec_driver_sql("SHOW REPLICA STATUS").mappings().first()
+            if status is None:
+                return 0.0  # not a replication replica (e.g. a cluster reader endpoint)
+            lag = status.get("Seconds_Behind_Source")
+            return float(lag) if lag is not None else None
+
+    def stats(self):
+        with self._lock:
+            return {
+                "enabled": self.engine is not None,
+                "max_lag": self.max_lag,
+                "lag": self._lag,
+                "routed": dict(self.routed),
+                "primary_reasons": dict(self.reasons),
+            }
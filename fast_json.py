@@ -0,0 +1,40 @@
+import json
+from datetime import date
+
+from flask import Response
+
+# ---------------- Fast JSON ----------------
+# List endpoints serialize plain rows rather than ORM objects, so the encoder
+# is the remaining per-row cost. orjson is used when it is installed; the
+# stdlib fallback produces the same document. Either way datetimes and dates
+# are written as ISO 8601, matching what to_dict() returns via isoformat().
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+
+def _default(value):
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f"Object of type {value.__class__.__name__} is not JSON serializable")
+
+
+_encoder = json.JSONEncoder(default=_default, ensure_ascii=False, separators=(",", ":"))
+
+if orjson is not None:
+    def dumps(value):
+        """Encode ``value`` to UTF-8 JSON bytes."""
+        return orjson.dumps(value, default=_default)
+else:
+    def dumps(value):
+        """Encode ``value`` to UTF-8 JSON bytes."""
+        return _encoder.encode(value).encode("utf-8")
+
+
+def json_response(value, status=200):
+    return Response(dumps(value), status=status, mimetype="application/json")
+
+
+def backend():
+    return "orjson" if orjson is not None else "json"
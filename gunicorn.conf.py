@@ -0,0 +1,33 @@
+"""gunicorn settings: gunicorn -c gunicorn.conf.py App:app
+
+The app is imported once in the master and workers are forked from it, so
+the code, the models and the market-rate table are loaded once and shared
+copy-on-write instead of being rebuilt by every worker.
+"""
+import gc
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+workers = int(os.environ.get("WEB_CONCURRENCY", "2"))
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", "8"))
+preload_app = True
+
+os.environ.setdefault("MARKET_RATES_PRELOAD", "1")
+# Pooled connections must not be opened in the master and inherited by
+# forked workers, so the warm-up runs in each worker instead.
+pool_warmup = int(os.environ.pop("DB_POOL_WARMUP", "0"))
+
+
+def when_ready(server):
+    # Move everything loaded so far out of the collector's reach; otherwise a
+    # collection in a worker touches those objects and un-shares their pages.
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    if pool_warmup:
+        from App import app, db
+        from db_pool import warm_pool
+        with app.app_context():
+            warm_pool(db.engine, pool_warmup)
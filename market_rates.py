@@ -0,0 +1,141 @@
+import json
+import logging
+import os
+import re
+import threading
+import time
+
+# ---------------- Market Rate Index ----------------
+# market_rates.json mixes "Tomato" with "potato" and "Vegetables" with
+# "cereals", so names are folded to lowercase alphanumerics before lookup
+# ("Moong Dal", "moong-dal" and "moongdal" all meet) and common spellings are
+# mapped through aliases. The index is rebuilt whenever the file's mtime
+# changes and swapped in with a single assignment, so readers never see a
+# half-built table.
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "market_rates.json")
+RELOAD_CHECK_SECONDS = 2.0
+
+# Normalized alias -> normalized name as it appears in market_rates.json
+CATEGORY_ALIASES = {
+    "vegetable": "vegetables",
+    "veg": "vegetables",
+    "fruit": "fruits",
+    "cereal": "cereals",
+    "grains": "cereals",
+    "pulse": "pulses",
+    "dal": "pulses",
+    "oilseed": "oilseeds",
+    "spice": "spices",
+    "fiber": "fibers",
+    "fibre": "fibers",
+    "fibres": "fibers",
+    "meat": "meatfish",
+    "fish": "meatfish",
+    "meatandfish": "meatfish",
+}
+PRODUCT_ALIASES = {
+    "tomatoes": "tomato",
+    "onions": "onion",
+    "potatoes": "potato",
+    "carrots": "carrot",
+    "bottlegourd": "bottleguard",
+    "lauki": "bottleguard",
+    "greenchili": "greenchilli",
+    "chilli": "greenchilli",
+    "mangoes": "mango",
+    "apples": "apple",
+    "bananas": "banana",
+    "avocado": "avacado",
+    "grape": "grapes",
+    "corn": "maize",
+    "toordal": "turdal",
+    "tuardal": "turdal",
+    "arhardal": "turdal",
+    "moongdhal": "moongdal",
+    "sunflowerseed": "sunflowerseeds",
+    "peanut": "groundnut",
+    "soybean": "soyabean",
+    "mustard": "rapeseed",
+    "blackpepper": "pepper",
+    "cardamom": "smallcardamon",
+    "smallcardamom": "smallcardamon",
+    "elaichi": "smallcardamon",
+    "haldi": "turmeric",
+    "curd": "yogurt",
+    "dahi": "yogurt",
+    "egg": "eggs",
+    "prawn": "prawns",
+    "shrimp": "prawns",
+}
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+
+
+def normalize(name):
+    return _NON_ALNUM.sub("", str(name).casefold()) if name is not None else ""
+
+
+class MarketRateIndex:
+    def __init__(self, path=DEFAULT_PATH, category_aliases=None, product_aliases=None):
+        self.path = path
+        self.category_aliases = dict(CATEGORY_ALIASES, **(category_aliases or {}))
+        self.product_aliases = dict(PRODUCT_ALIASES, **(product_aliases or {}))
+        self._rates = {}
+        self._mtime = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def load(self):
+        """Parse the file and swap in a freshly built table."""
+        mtime = os.stat(self.path).st_mtime_ns
+        with open(self.path, "r") as file:
+            market_data = json.load(file)
+
+        rates = {}
+        for state, state_data in market_data.items():
+            for category, products in (state_data.get("products") or {}).items():
+                for product_name, rate in products.items():
+                    rates[(normalize(state), normalize(category), normalize(product_name))] = rate
+        self._rates = rates
+        self._mtime = mtime
+        return len(rates)
+
+    def _maybe_reload(self):
+        now = time.monotonic()
+        if self._mtime is not None and now - self._checked_at < RELOAD_CHECK_SECONDS:
+            return
+        if not self._lock.acquire(blocking=self._mtime is None):
+            return  # another thread is already checking; keep serving the current table
+        try:
+            self._checked_at = now
+            try:
+                if os.stat(self.path).st_mtime_ns != self._mtime:
+                    count = self.load()
+                    logger.info("Loaded %d market rates from %s", count, self.path)
+            except (OSError, ValueError) as e:
+                # Keep serving the last good table if the file is mid-write or broken
+                logger.warning("Could not reload market rates from %s: %s", self.path, e)
+        finally:
+            self._lock.release()
+
+    def lookup(self, state, category, product_name):
+        """Market rate per unit, or None when the state/category/product is unknown."""
+        self._maybe_reload()
+        rates = self._rates
+        state = normalize(state)
+        category = normalize(category)
+        category = self.category_aliases.get(category, category)
+        product = normalize(product_name)
+        rate = rates.get((state, category, product))
+        if rate is None and product in self.product_aliases:
+            rate = rates.get((state, category, self.product_aliases[product]))
+        if rate is None and product.endswith("s"):
+            rate = rates.get((state, category, product[:-1]))
+        return rate
+
+    def __len__(self):
+        self._maybe_reload()
+        return len(self._rates)
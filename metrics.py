@@ -0,0 +1,157 @@
+import logging
+import threading
+import time
+from bisect import bisect_left
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+# ---------------- Request Metrics ----------------
+# Per-route latency, SQL query count and DB time, kept in-process and exposed
+# in the Prometheus text format by /metrics. Each worker process keeps its own
+# numbers, so scrape every worker (or sum them) when running several.
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+
+
+class Histogram:
+    def __init__(self, name, help_text, buckets, labels):
+        self.name = name
+        self.help = help_text
+        self.buckets = buckets
+        self.labels = labels
+        self._series = {}
+
+    def observe(self, label_values, value):
+        series = self._series.get(label_values)
+        if series is None:
+            series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+        # Counts are stored per bucket and made cumulative when rendered
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for label_values, (counts, total) in sorted(self._series.items()):
+            labels = _labels(self.labels, label_values)
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(float(bound))
+                lines.append(f'{self.name}_bucket{{{labels},le="{le}"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{labels}}} {total}")
+            lines.append(f"{self.name}_count{{{labels}}} {cumulative}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name, help_text, labels):
+        self.name = name
+        self.help = help_text
+        self.labels = labels
+        self._series = {}
+
+    def inc(self, label_values, amount=1):
+        self._series[label_values] = self._series.get(label_values, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for label_values, value in sorted(self._series.items()):
+            lines.append(f"{self.name}{{{_labels(self.labels, label_values)}}} {value}")
+        return lines
+
+
+def _labels(names, values):
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class RequestMetrics:
+    def __init__(self, query_budget=None):
+        self.query_budget = query_budget
+        self.requests = Counter(
+            "http_requests_total", "Requests handled, by route, method and status.",
+            ("endpoint", "method", "status"),
+        )
+        self.latency = Histogram(
+            "http_request_duration_seconds", "Request latency in seconds, including streamed bodies.",
+            LATENCY_BUCKETS, ("endpoint", "method"),
+        )
+        self.queries = Histogram(
+            "http_request_db_queries", "SQL statements executed per request.",
+            QUERY_COUNT_BUCKETS, ("endpoint", "method"),
+        )
+        self.db_time = Histogram(
+            "http_request_db_seconds", "Time spent executing SQL per request.",
+            LATENCY_BUCKETS, ("endpoint", "method"),
+        )
+        self.budget_exceeded = Counter(
+            "http_request_query_budget_exceeded_total", "Requests that ran more queries than QUERY_BUDGET.",
+            ("endpoint", "method"),
+        )
+        self._lock = threading.Lock()
+
+    def init_app(self, app, *engines):
+        app.before_request(self._start_request)
+        app.after_request(self._capture_status)
+        # teardown runs after a streamed body finishes, so its queries are counted too
+        app.teardown_request(self._finish_request)
+        for engine in engines:
+            event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+            event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+
+    def _start_request(self):
+        g.metrics_started = time.perf_counter()
+        g.metrics_queries = 0
+        g.metrics_db_seconds = 0.0
+
+    def _capture_status(self, response):
+        g.metrics_status = response.status_code
+        return response
+
+    def _finish_request(self, exc):
+        started = g.pop("metrics_started", None)
+        if started is None:
+            return
+        elapsed = time.perf_counter() - started
+        labels = (request.endpoint or "unmatched", request.method)
+        status = g.pop("metrics_status", 500 if exc is not None else 200)
+        queries = g.pop("metrics_queries", 0)
+        db_seconds = g.pop("metrics_db_seconds", 0.0)
+        with self._lock:
+            self.requests.inc(labels + (str(status),))
+            self.latency.observe(labels, elapsed)
+            self.queries.observe(labels, queries)
+            self.db_time.observe(labels, db_seconds)
+            over_budget = self.query_budget is not None and queries > self.query_budget
+            if over_budget:
+                self.budget_exceeded.inc(labels)
+        if over_budget:
+            logger.warning(
+                "%s %s ran %d SQL queries (budget %d) in %.1f ms",
+                request.method, request.path, queries, self.query_budget, elapsed * 1000,
+            )
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if context is not None and has_request_context() and "metrics_started" in g:
+            context.metrics_query_start = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "metrics_query_start", None)
+        if started is None or not has_request_context() or "metrics_started" not in g:
+            return
+        g.metrics_queries += 1
+        g.metrics_db_seconds += time.perf_counter() - started
+
+    def render(self):
+        with self._lock:
+            lines = []
+            for metric in (self.requests, self.latency, self.queries, self.db_time, self.budget_exceeded):
+                lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,84 @@
+"""baseline schema: farmer, retailer, products and purchase
+
+Revision ID: 1d2b7f4e6a90
+Revises: 
+Create Date: 2026-10-18 08:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1d2b7f4e6a90'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _has_table(name):
+    return sa.inspect(op.get_bind()).has_table(name)
+
+
+def upgrade():
+    # The tables as the app first created them with db.create_all(), so
+    # `flask db upgrade` can build a database from nothing. Databases that
+    # predate migrations already have them and skip straight to the indexes.
+    if not _has_table('farmer'):
+        op.create_table(
+            'farmer',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('farmername', sa.String(length=120)),
+            sa.Column('mobilenumber', sa.String(length=15)),
+            sa.Column('password', sa.String(length=128)),
+            sa.Column('gender', sa.String(length=6)),
+            sa.Column('State', sa.String(length=120)),
+            sa.Column('City', sa.String(length=120)),
+            sa.Column('aadhar', sa.String(length=20)),
+        )
+    if not _has_table('retailer'):
+        op.create_table(
+            'retailer',
+            sa.Column('aadhar', sa.String(length=20), primary_key=True),
+            sa.Column('enterprise_name', sa.String(length=130)),
+            sa.Column('owner_name', sa.String(length=120)),
+            sa.Column('mobilenumber', sa.String(length=15)),
+            sa.Column('password', sa.String(length=128)),
+            sa.Column('State', sa.String(length=120)),
+            sa.Column('City', sa.String(length=100)),
+            sa.Column('Gstin', sa.String(length=20)),
+            sa.Column('Pan', sa.String(length=20)),
+        )
+    if not _has_table('products'):
+        op.create_table(
+            'products',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('farmer_id', sa.Integer(), sa.ForeignKey('farmer.id'), nullable=False),
+            sa.Column('name', sa.String(length=120), nullable=False),
+            sa.Column('category', sa.String(length=80), nullable=False),
+            sa.Column('price', sa.Float(), nullable=False),
+            sa.Column('quantity', sa.Integer(), nullable=False),
+            sa.Column('in_stock', sa.Boolean(), nullable=False),
+            sa.Column('created_at', sa.DateTime(), nullable=False),
+            sa.Column('updated_at', sa.DateTime(), nullable=False),
+            sa.CheckConstraint('price >= 0', name='ck_product_price_nonneg'),
+            sa.CheckConstraint('quantity >= 0', name='ck_product_qty_nonneg'),
+        )
+    if not _has_table('purchase'):
+        op.create_table(
+            'purchase',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('retailer_id', sa.String(length=20), sa.ForeignKey('retailer.aadhar'), nullable=False),
+            sa.Column('product_id', sa.Integer(), sa.ForeignKey('products.id'), nullable=False),
+            sa.Column('quantity', sa.Integer(), nullable=False),
+            sa.Column('payment_type', sa.String(length=50), nullable=False),
+            sa.Column('payment_amount', sa.Float(), nullable=False),
+            sa.Column('created_at', sa.DateTime(), nullable=False),
+        )
+
+
+def downgrade():
+    op.drop_table('purchase')
+    op.drop_table('products')
+    op.drop_table('retailer')
+    op.drop_table('farmer')
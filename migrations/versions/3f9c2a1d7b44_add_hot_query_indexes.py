@@ -0,0 +1,48 @@
+"""add indexes for hot endpoint queries
+
+Revision ID: 3f9c2a1d7b44
+Revises: 1d2b7f4e6a90
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f9c2a1d7b44'
+down_revision = '1d2b7f4e6a90'
+branch_labels = None
+depends_on = None
+
+
+# (table, index name, columns, unique)
+INDEXES = [
+    ('farmer', 'uq_farmer_mobilenumber', ['mobilenumber'], True),
+    ('farmer', 'ix_farmer_state', ['State'], False),
+    ('retailer', 'uq_retailer_mobilenumber', ['mobilenumber'], True),
+    ('products', 'ix_products_farmer_stock_updated', ['farmer_id', 'in_stock', 'updated_at'], False),
+    ('purchase', 'ix_purchase_retailer_created', ['retailer_id', 'created_at'], False),
+    ('purchase', 'ix_purchase_product_created', ['product_id', 'created_at'], False),
+]
+
+
+def _existing_indexes(table):
+    inspector = sa.inspect(op.get_bind())
+    return {ix['name'] for ix in inspector.get_indexes(table)}
+
+
+def upgrade():
+    # db.create_all() already builds these indexes on a fresh database, so
+    # only add the ones that are missing.
+    # The unique mobilenumber indexes fail if duplicate numbers exist; clean
+    # those rows up before upgrading.
+    for table, name, columns, unique in INDEXES:
+        if name not in _existing_indexes(table):
+            op.create_index(name, table, columns, unique=unique)
+
+
+def downgrade():
+    for table, name, columns, unique in reversed(INDEXES):
+        if name in _existing_indexes(table):
+            op.drop_index(name, table_name=table)
@@ -0,0 +1,31 @@
+"""add data_versions
+
+Revision ID: 5a8c3e0b9d17
+Revises: e19a5b3c7d80
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5a8c3e0b9d17'
+down_revision = 'e19a5b3c7d80'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # db.create_all() may already have built it. Missing rows read as version 0.
+    if not sa.inspect(op.get_bind()).has_table('data_versions'):
+        op.create_table(
+            'data_versions',
+            sa.Column('scope', sa.String(length=80), nullable=False),
+            sa.Column('version', sa.Integer(), nullable=False),
+            sa.PrimaryKeyConstraint('scope'),
+        )
+
+
+def downgrade():
+    op.drop_table('data_versions')
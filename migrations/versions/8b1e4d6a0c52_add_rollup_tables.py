@@ -0,0 +1,50 @@
+"""add farmer_sales_rollup and retailer_monthly_purchases
+
+Revision ID: 8b1e4d6a0c52
+Revises: 3f9c2a1d7b44
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b1e4d6a0c52'
+down_revision = '3f9c2a1d7b44'
+branch_labels = None
+depends_on = None
+
+
+def _has_table(name):
+    return sa.inspect(op.get_bind()).has_table(name)
+
+
+def upgrade():
+    # db.create_all() may already have built these; backfill them afterwards
+    # with `flask rebuild-sales-rollup` and `flask rebuild-retailer-monthly`.
+    if not _has_table('farmer_sales_rollup'):
+        op.create_table(
+            'farmer_sales_rollup',
+            sa.Column('farmer_id', sa.Integer(), sa.ForeignKey('farmer.id'), nullable=False),
+            sa.Column('category', sa.String(length=80), nullable=False),
+            sa.Column('present_stock', sa.Integer(), nullable=False),
+            sa.Column('units_sold', sa.Integer(), nullable=False),
+            sa.Column('revenue', sa.Float(), nullable=False),
+            sa.PrimaryKeyConstraint('farmer_id', 'category'),
+        )
+    if not _has_table('retailer_monthly_purchases'):
+        op.create_table(
+            'retailer_monthly_purchases',
+            sa.Column('retailer_id', sa.String(length=20), sa.ForeignKey('retailer.aadhar'), nullable=False),
+            sa.Column('month', sa.Date(), nullable=False),
+            sa.Column('order_count', sa.Integer(), nullable=False),
+            sa.Column('units', sa.Integer(), nullable=False),
+            sa.Column('amount', sa.Float(), nullable=False),
+            sa.PrimaryKeyConstraint('retailer_id', 'month'),
+        )
+
+
+def downgrade():
+    op.drop_table('retailer_monthly_purchases')
+    op.drop_table('farmer_sales_rollup')
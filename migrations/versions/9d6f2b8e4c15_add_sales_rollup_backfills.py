@@ -0,0 +1,32 @@
+"""add sales_rollup_backfills
+
+Revision ID: 9d6f2b8e4c15
+Revises: 5a8c3e0b9d17
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9d6f2b8e4c15'
+down_revision = '5a8c3e0b9d17'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # db.create_all() may already have built it. Farmers stay on the raw
+    # aggregate for analytics until `flask rebuild-sales-rollup` marks them.
+    if not sa.inspect(op.get_bind()).has_table('sales_rollup_backfills'):
+        op.create_table(
+            'sales_rollup_backfills',
+            sa.Column('farmer_id', sa.Integer(), sa.ForeignKey('farmer.id'), nullable=False),
+            sa.Column('backfilled_at', sa.DateTime(), nullable=False),
+            sa.PrimaryKeyConstraint('farmer_id'),
+        )
+
+
+def downgrade():
+    op.drop_table('sales_rollup_backfills')
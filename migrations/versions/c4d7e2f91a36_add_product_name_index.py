@@ -0,0 +1,32 @@
+"""add products name index for search
+
+Revision ID: c4d7e2f91a36
+Revises: 8b1e4d6a0c52
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4d7e2f91a36'
+down_revision = '8b1e4d6a0c52'
+branch_labels = None
+depends_on = None
+
+
+def _existing_indexes(table):
+    inspector = sa.inspect(op.get_bind())
+    return {ix['name'] for ix in inspector.get_indexes(table)}
+
+
+def upgrade():
+    # /retailer/<id>/search resolves a query to exact product names first
+    if 'ix_products_name_stock' not in _existing_indexes('products'):
+        op.create_index('ix_products_name_stock', 'products', ['name', 'in_stock'])
+
+
+def downgrade():
+    if 'ix_products_name_stock' in _existing_indexes('products'):
+        op.drop_index('ix_products_name_stock', table_name='products')
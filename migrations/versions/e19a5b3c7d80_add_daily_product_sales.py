@@ -0,0 +1,41 @@
+"""add daily_product_sales
+
+Revision ID: e19a5b3c7d80
+Revises: c4d7e2f91a36
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e19a5b3c7d80'
+down_revision = 'c4d7e2f91a36'
+branch_labels = None
+depends_on = None
+
+
+def _inspector():
+    return sa.inspect(op.get_bind())
+
+
+def upgrade():
+    # db.create_all() may already have built it; backfill with `flask rebuild-daily-sales`.
+    if not _inspector().has_table('daily_product_sales'):
+        op.create_table(
+            'daily_product_sales',
+            sa.Column('farmer_id', sa.Integer(), sa.ForeignKey('farmer.id'), nullable=False),
+            sa.Column('product_id', sa.Integer(), sa.ForeignKey('products.id'), nullable=False),
+            sa.Column('day', sa.Date(), nullable=False),
+            sa.Column('units', sa.Integer(), nullable=False),
+            sa.Column('revenue', sa.Float(), nullable=False),
+            sa.PrimaryKeyConstraint('farmer_id', 'product_id', 'day'),
+        )
+    existing = {ix['name'] for ix in _inspector().get_indexes('daily_product_sales')}
+    if 'ix_daily_product_sales_farmer_day' not in existing:
+        op.create_index('ix_daily_product_sales_farmer_day', 'daily_product_sales', ['farmer_id', 'day'])
+
+
+def downgrade():
+    op.drop_table('daily_product_sales')
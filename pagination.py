@@ -0,0 +1,135 @@
+import base64
+import json
+from datetime import datetime
+from urllib.parse import urlencode
+
+from flask import Response, abort, jsonify, request, stream_with_context
+from sqlalchemy import and_, or_
+
+from fast_json import dumps, json_response
+
+# ---------------- Keyset Pagination & Streaming ----------------
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+STREAM_BATCH_SIZE = 500
+
+
+def encode_cursor(values):
+    raw = json.dumps([v.isoformat() if isinstance(v, datetime) else v for v in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor, keys):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(keys):
+            raise ValueError
+        return [_cursor_value(key, v) for key, v in zip(keys, values)]
+    except (ValueError, TypeError, NotImplementedError):
+        abort(400, description="Invalid cursor")
+
+
+def _cursor_value(key, value):
+    # Cursors come back from clients: check each value against its column
+    # rather than handing whatever JSON they hold to the comparison.
+    python_type = key.type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is float and isinstance(value, int) and not isinstance(value, bool):
+        return float(value)
+    if not isinstance(value, python_type) or isinstance(value, bool):
+        raise ValueError
+    return value
+
+
+def _after(keys, values, descending):
+    # Expanded row-value comparison: (k1, k2) > (v1, v2) as k1 > v1 OR (k1 = v1 AND k2 > v2).
+    clauses = []
+    for i, key in enumerate(keys):
+        step = key < values[i] if descending else key > values[i]
+        clauses.append(and_(*[keys[j] == values[j] for j in range(i)], step))
+    return or_(*clauses)
+
+
+def _truthy(value):
+    return (value or "").lower() in ("1", "true", "yes")
+
+
+def paginated_response(
+    query, keys, row_key, serialize, descending=False, empty_error=None, page_by_default=False, etag=None,
+):
+    """Answer a list endpoint in one of three modes picked from the query string.
+
+    ``?limit=N[&after=cursor]`` returns one keyset page with the cursor for the
+    next page in the ``X-Next-Cursor`` header, ``?stream=1`` writes the full
+    JSON array incrementally from a ``yield_per`` cursor, and no parameters
+    keeps the original single-array response (or the first page when
+    ``page_by_default`` is set). Rows are encoded with ``fast_json``, so
+    ``serialize`` may leave datetimes as they come. ``etag`` tags successful
+    responses for If-None-Match revalidation.
+    """
+    order = [k.desc() if descending else k.asc() for k in keys]
+    query = query.order_by(None).order_by(*order)
+
+    limit = request.args.get("limit")
+    after = request.args.get("after")
+    stream = _truthy(request.args.get("stream"))
+    if limit is not None or after is not None or (page_by_default and not stream):
+        try:
+            limit = int(limit) if limit is not None else DEFAULT_PAGE_SIZE
+        except ValueError:
+            abort(400, description="limit must be integer")
+        if not 1 <= limit <= MAX_PAGE_SIZE:
+            abort(400, description=f"limit must be between 1 and {MAX_PAGE_SIZE}")
+        if after:
+            query = query.filter(_after(keys, decode_cursor(after, keys), descending))
+
+        rows = query.limit(limit + 1).all()
+        if not rows and not after and empty_error:
+            return jsonify({"error": empty_error}), 404
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        response = json_response([serialize(row) for row in rows])
+        if has_more:
+            next_cursor = encode_cursor(row_key(rows[-1]))
+            response.headers["X-Next-Cursor"] = next_cursor
+            response.headers["Link"] = f'<{request.base_url}?{_next_query(next_cursor)}>; rel="next"'
+        return _tagged(response, etag), 200
+
+    if stream:
+        rows = iter(query.yield_per(STREAM_BATCH_SIZE))
+        first = next(rows, None)
+        if first is None and empty_error:
+            return jsonify({"error": empty_error}), 404
+        return _tagged(Response(
+            stream_with_context(_stream_array(first, rows, serialize)),
+            mimetype="application/json",
+        ), etag), 200
+
+    rows = query.all()
+    if not rows and empty_error:
+        return jsonify({"error": empty_error}), 404
+    return _tagged(json_response([serialize(row) for row in rows]), etag), 200
+
+
+def _tagged(response, etag):
+    if etag is not None:
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+def _next_query(cursor):
+    args = request.args.to_dict()
+    args["after"] = cursor
+    return urlencode(args)
+
+
+def _stream_array(first, rows, serialize):
+    yield b"["
+    if first is not None:
+        yield dumps(serialize(first))
+        for row in rows:
+            yield b"," + dumps(serialize(row))
+    yield b"]"
@@ -0,0 +1,145 @@
+import re
+import threading
+import time
+from bisect import bisect_left
+
+from market_rates import CATEGORY_ALIASES, normalize
+
+# ---------------- Product Search Index ----------------
+# Per-state inverted index from name tokens to the distinct product names
+# listed in that state. Product names repeat across farmers ("Tomato" from
+# thousands of them), so the vocabulary stays small even for a large catalog:
+# a query is resolved to a handful of exact names here and the database does
+# the rest (state, stock, price, sort, pagination) on live rows. That keeps
+# price and stock current without touching the index on every purchase.
+#
+# Writes in this worker are applied immediately with add(); each state is
+# also rebuilt from the database every ``refresh_seconds`` to pick up other
+# workers' writes and drop names that no longer exist.
+
+REFRESH_SECONDS = 60.0
+MAX_QUERY_TOKENS = 6
+FUZZY_MIN_LENGTH = 4
+
+_TOKEN = re.compile(r"[0-9a-z]+")
+
+
+def tokenize(text):
+    tokens = _TOKEN.findall(str(text).casefold())
+    # "Moong Dal" is also reachable as "moongdal"
+    if len(tokens) > 1:
+        tokens.append("".join(tokens))
+    return tokens
+
+
+def _within_distance(a, b, limit):
+    """True when the Levenshtein distance between a and b is at most ``limit``."""
+    if abs(len(a) - len(b)) > limit:
+        return False
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, start=1):
+        current = [i]
+        for j, cb in enumerate(b, start=1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if min(current) > limit:
+            return False
+        previous = current
+    return previous[-1] <= limit
+
+
+class _StateIndex:
+    def __init__(self, rows):
+        self.names_by_token = {}
+        self.categories = {}
+        self._sorted_tokens = None
+        for name, category in rows:
+            self.add(name, category)
+        self.built_at = time.monotonic()
+
+    def add(self, name, category):
+        # Sets are replaced rather than mutated so concurrent readers never see one change size
+        for token in tokenize(name):
+            self.names_by_token[token] = self.names_by_token.get(token, frozenset()) | {name}
+        key = normalize(category)
+        key = CATEGORY_ALIASES.get(key, key)
+        self.categories[key] = self.categories.get(key, frozenset()) | {category}
+        self._sorted_tokens = None
+
+    def _tokens(self):
+        if self._sorted_tokens is None:
+            self._sorted_tokens = sorted(self.names_by_token)
+        return self._sorted_tokens
+
+    def match_token(self, query_token):
+        tokens = self._tokens()
+        matched = set()
+        # Prefix matches: a contiguous run in the sorted vocabulary
+        i = bisect_left(tokens, query_token)
+        while i < len(tokens) and tokens[i].startswith(query_token):
+            matched.update(self.names_by_token[tokens[i]])
+            i += 1
+        # Fuzzy matches: one typo from 4 letters, two from 8, against the whole token or its prefix
+        if len(query_token) >= FUZZY_MIN_LENGTH:
+            limit = 2 if len(query_token) >= 8 else 1
+            for token in tokens:
+                if _within_distance(query_token, token, limit) or (
+                    len(token) > len(query_token)
+                    and _within_distance(query_token, token[:len(query_token)], limit)
+                ):
+                    matched.update(self.names_by_token[token])
+        return matched
+
+    def match(self, query):
+        """Distinct product names matching every word of ``query``."""
+        names = None
+        for query_token in _TOKEN.findall(str(query).casefold())[:MAX_QUERY_TOKENS]:
+            matched = self.match_token(query_token)
+            names = matched if names is None else names & matched
+            if not names:
+                return set()
+        return names or set()
+
+    def category_variants(self, category):
+        key = normalize(category)
+        return self.categories.get(CATEGORY_ALIASES.get(key, key), frozenset())
+
+
+class ProductSearchIndex:
+    def __init__(self, loader, refresh_seconds=REFRESH_SECONDS):
+        """``loader(state)`` returns the distinct ``(name, category)`` pairs listed in a state."""
+        self.loader = loader
+        self.refresh_seconds = refresh_seconds
+        self.builds = 0
+        self._states = {}
+        self._lock = threading.Lock()
+
+    def get(self, state):
+        index = self._states.get(state)
+        if index is not None and time.monotonic() - index.built_at < self.refresh_seconds:
+            return index
+        with self._lock:
+            # Another request may have rebuilt it while we waited
+            index = self._states.get(state)
+            if index is None or time.monotonic() - index.built_at >= self.refresh_seconds:
+                index = self._states[state] = _StateIndex(self.loader(state))
+                self.builds += 1
+        return index
+
+    def add(self, state, name, category):
+        """Make a written product searchable right away (no-op until the state is built)."""
+        with self._lock:
+            index = self._states.get(state)
+            if index is not None:
+                index.add(name, category)
+
+    def clear(self):
+        with self._lock:
+            self._states.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "states": len(self._states),
+                "tokens": sum(len(index.names_by_token) for index in self._states.values()),
+                "builds": self.builds,
+            }
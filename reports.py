@@ -0,0 +1,197 @@
+import multiprocessing
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+
+from fpdf import FPDF
+from sqlalchemy import DateTime, Float, Integer, String, column, create_engine, select, table
+
+# ---------------- Transaction Report Rendering ----------------
+# Runs inside ReportJobs' process pool. Each worker process opens its own
+# engine and streams the rows straight into the PDF, so neither the web
+# worker nor the renderer ever holds the full (Purchase, Product) list.
+_engines = {}
+
+_purchase = table(
+    "purchase",
+    column("id", Integer),
+    column("product_id", Integer),
+    column("quantity", Integer),
+    column("payment_amount", Float),
+    column("created_at", DateTime),
+)
+_products = table(
+    "products",
+    column("id", Integer),
+    column("farmer_id", Integer),
+    column("name", String),
+    column("category", String),
+)
+
+STREAM_BATCH_SIZE = 1000
+MAX_FAILED_JOBS = 256
+
+
+def _engine(db_uri):
+    engine = _engines.get(db_uri)
+    if engine is None:
+        engine = _engines[db_uri] = create_engine(db_uri, pool_pre_ping=True)
+    return engine
+
+
+def render_transaction_report(db_uri, farmer_id, farmer_name, from_date, to_date):
+    """Render the PDF for purchases of a farmer's products in ``[from_date, to_date + 1 day)``."""
+    query = (
+        select(
+            _purchase.c.id, _products.c.name, _products.c.category,
+            _purchase.c.quantity, _purchase.c.payment_amount, _purchase.c.created_at,
+        )
+        .select_from(_purchase.join(_products, _purchase.c.product_id == _products.c.id))
+        .where(
+            _products.c.farmer_id == farmer_id,
+            _purchase.c.created_at >= from_date,
+            _purchase.c.created_at < to_date + timedelta(days=1),
+        )
+        .order_by(_purchase.c.created_at, _purchase.c.id)
+    )
+
+    pdf = FPDF()
+    pdf.set_auto_page_break(auto=True, margin=15)
+    pdf.add_page()
+    pdf.set_font("Arial", size=12)
+
+    # Add title
+    pdf.set_font("Arial", style="B", size=16)
+    pdf.cell(200, 10, txt=_latin1(f"Transaction Report for {farmer_name}"), ln=True, align="C")
+    pdf.ln(10)
+
+    # Add date range
+    pdf.set_font("Arial", size=12)
+    pdf.cell(200, 10, txt=f"From: {from_date.strftime('%Y-%m-%d')} To: {to_date.strftime('%Y-%m-%d')}", ln=True)
+    pdf.ln(10)
+
+    # Add table headers
+    pdf.set_font("Arial", style="B", size=12)
+    pdf.cell(40, 10, "Transaction ID", border=1)
+    pdf.cell(40, 10, "Product Name", border=1)
+    pdf.cell(30, 10, "Category", border=1)
+    pdf.cell(30, 10, "Quantity", border=1)
+    pdf.cell(30, 10, "Amount", border=1)
+    pdf.cell(30, 10, "Date", border=1)
+    pdf.ln()
+
+    # Add transaction data as it streams off the cursor
+    pdf.set_font("Arial", size=12)
+    with _engine(db_uri).connect() as conn:
+        result = conn.execution_options(stream_results=True, yield_per=STREAM_BATCH_SIZE).execute(query)
+        for purchase_id, name, category, quantity, amount, created_at in result:
+            pdf.cell(40, 10, str(purchase_id), border=1)
+            pdf.cell(40, 10, _latin1(name), border=1)
+            pdf.cell(30, 10, _latin1(category), border=1)
+            pdf.cell(30, 10, str(quantity), border=1)
+            # The core PDF fonts are latin-1 only, which has no rupee sign
+            pdf.cell(30, 10, f"Rs. {amount:.2f}", border=1)
+            pdf.cell(30, 10, created_at.strftime("%Y-%m-%d"), border=1)
+            pdf.ln()
+
+    return pdf.output(dest="S").encode("latin1")
+
+
+def _latin1(text):
+    return str(text).encode("latin1", "replace").decode("latin1")
+
+
+# ---------------- Report Jobs ----------------
+class ReportJobs:
+    """Process-pool report rendering with a size-bounded LRU of finished PDFs.
+
+    Jobs are identified by their cache key, so submitting the same key twice
+    joins the render already in flight or returns the cached bytes.
+    """
+
+    def __init__(self, max_workers=2, cache_bytes=64 * 1024 * 1024):
+        self.max_workers = max_workers
+        self.cache_bytes = cache_bytes
+        self._executor = None
+        self._running = {}
+        self._failed = OrderedDict()
+        self._cache = OrderedDict()
+        self._cached_bytes = 0
+        self._lock = threading.Lock()
+
+    def _pool(self):
+        if self._executor is None:
+            # Never fork: web workers run request threads, and a forked child
+            # inherits any lock (SQLAlchemy's pool, logging) another thread
+            # held at that moment, with nobody left to release it.
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context)
+        return self._executor
+
+    def submit(self, key, fn, *args):
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return "done"
+            if key in self._running:
+                return "running"
+            self._failed.pop(key, None)
+            future = self._pool().submit(fn, *args)
+            self._running[key] = future
+        future.add_done_callback(lambda f: self._finish(key, f))
+        return "running"
+
+    def _finish(self, key, future):
+        with self._lock:
+            self._running.pop(key, None)
+            error = future.exception()
+            if error is not None:
+                self._failed[key] = str(error) or error.__class__.__name__
+                if len(self._failed) > MAX_FAILED_JOBS:
+                    self._failed.popitem(last=False)
+                return
+            self._store(key, future.result())
+
+    def _store(self, key, pdf):
+        if len(pdf) > self.cache_bytes:
+            return
+        self._cache[key] = pdf
+        self._cached_bytes += len(pdf)
+        while self._cached_bytes > self.cache_bytes:
+            _, evicted = self._cache.popitem(last=False)
+            self._cached_bytes -= len(evicted)
+
+    def status(self, key):
+        """Return ``(state, detail)`` where state is done, running, failed or None."""
+        with self._lock:
+            if key in self._cache:
+                return "done", None
+            if key in self._running:
+                return "running", None
+            if key in self._failed:
+                return "failed", self._failed[key]
+        return None, None
+
+    def result(self, key, timeout=None):
+        """Cached PDF bytes, waiting up to ``timeout`` seconds for a running job."""
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+            future = self._running.get(key)
+        if future is None or timeout is None:
+            return None
+        pdf = future.result(timeout=timeout)
+        with self._lock:
+            return self._cache.get(key, pdf)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "cached_reports": len(self._cache),
+                "cached_bytes": self._cached_bytes,
+                "running": len(self._running),
+                "failed": len(self._failed),
+            }
@@ -0,0 +1,238 @@
+"""Compare requests/sec of the Flask app and the asyncio app (asgi.py) under load.
+
+Both servers are started as subprocesses against the same database and
+driven by an asyncio HTTP/1.1 client holding ``--concurrency`` keep-alive
+connections, cycling through the read routes asgi.py serves with ids sampled
+from the data (see seed_data.py). Each server gets the same number of worker
+processes; Flask runs under gunicorn's threaded worker when gunicorn is
+installed and Werkzeug's threaded server otherwise.
+
+    pip install uvicorn aiosqlite          # aiomysql for MySQL; gunicorn optional
+    python scripts/seed_data.py --db bench.db --scale 0.1
+    python scripts/bench_async.py --db bench.db --concurrency 256 --seconds 20
+
+The client runs on one core, so give the servers the rest and read the
+numbers as a comparison between the two, not as absolute capacity.
+"""
+import argparse
+import asyncio
+import importlib.util
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_app(db_path):
+    if db_path:
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.abspath(db_path)}"
+    # One client driving every route: the per-client rate limits would shed most of the run
+    os.environ.setdefault("ADMISSION_CONTROL", "0")
+    os.chdir(ROOT)
+    sys.path.insert(0, ROOT)
+    import App
+    return App
+
+
+def sample_urls(App, rng, size=200):
+    db, Product, Purchase = App.db, App.Product, App.Purchase
+    with App.app.app_context():
+        farmers = [r[0] for r in db.session.query(Product.farmer_id).distinct().order_by(db.func.random()).limit(size)]
+        retailers = [
+            r[0] for r in db.session.query(Purchase.retailer_id).distinct().order_by(db.func.random()).limit(size)
+        ]
+        db.engine.dispose()
+    if not (farmers and retailers):
+        raise SystemExit("The database has no products/purchases; run scripts/seed_data.py first.")
+    templates = [
+        "/farmers/{f}/products?limit=50",
+        "/farmers/{f}/transactions?limit=50",
+        "/farmers/{f}/analytics",
+        "/retailer/{r}/available-products?limit=100",
+        "/retailers/{r}/transaction-history?limit=50",
+        "/retailers/{r}/monthly-summary",
+    ]
+    urls = [t.format(f=rng.choice(farmers), r=rng.choice(retailers)) for t in templates for _ in range(size)]
+    rng.shuffle(urls)
+    return urls
+
+
+# ---------------- Servers ----------------
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def sync_command(port, workers, threads):
+    if importlib.util.find_spec("gunicorn"):
+        return "gunicorn", [
+            sys.executable, "-m", "gunicorn", "App:app", "-b", f"127.0.0.1:{port}",
+            "-w", str(workers), "-k", "gthread", "--threads", str(threads), "--log-level", "warning",
+        ]
+    return "werkzeug (threaded)", [
+        sys.executable, "-c",
+        "import logging; from werkzeug.serving import run_simple, WSGIRequestHandler; import App;"
+        "logging.getLogger('werkzeug').setLevel(logging.WARNING);"
+        "WSGIRequestHandler.protocol_version = 'HTTP/1.1';"
+        f"run_simple('127.0.0.1', {port}, App.app, threaded=True, processes=1)",
+    ]
+
+
+def async_command(port, workers):
+    if not importlib.util.find_spec("uvicorn"):
+        raise SystemExit("The async server needs uvicorn: pip install uvicorn aiosqlite (or aiomysql)")
+    return "uvicorn", [
+        sys.executable, "-m", "uvicorn", "asgi:app", "--host", "127.0.0.1", "--port", str(port),
+        "--workers", str(workers), "--log-level", "warning", "--no-access-log",
+    ]
+
+
+def start_server(command, port, probe):
+    process = subprocess.Popen(command, cwd=ROOT, env=os.environ.copy(), stdout=subprocess.DEVNULL)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f"Server exited with {process.returncode}: {' '.join(command)}")
+        try:
+            status, _ = asyncio.run(fetch_once(port, probe))
+            if status == 200:
+                return process
+        except OSError:
+            pass
+        time.sleep(0.2)
+    process.terminate()
+    raise SystemExit(f"Server did not come up on port {port}")
+
+
+# ---------------- Load Client ----------------
+class Connection:
+    def __init__(self, port):
+        self.port = port
+        self.reader = self.writer = None
+
+    async def get(self, path):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection("127.0.0.1", self.port)
+        self.writer.write(f"GET {path} HTTP/1.1\r\nHost: 127.0.0.1\r\nConnection: keep-alive\r\n\r\n".encode())
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError("server closed the connection")
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        if headers.get("transfer-encoding") == "chunked":
+            size = 0
+            while True:
+                chunk = int((await self.reader.readline()).strip(), 16)
+                await self.reader.readexactly(chunk + 2)
+                size += chunk
+                if chunk == 0:
+                    break
+        else:
+            size = int(headers.get("content-length", 0))
+            await self.reader.readexactly(size)
+        if headers.get("connection", "").lower() == "close" or status_line.startswith(b"HTTP/1.0"):
+            self.close()
+        return int(status_line.split()[1]), size
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+
+async def fetch_once(port, path):
+    connection = Connection(port)
+    try:
+        return await connection.get(path)
+    finally:
+        connection.close()
+
+
+async def drive(port, urls, concurrency, seconds):
+    latencies, statuses, errors = [], {}, 0
+    deadline = time.monotonic() + seconds
+    counter = iter(range(10**12))
+
+    async def client():
+        nonlocal errors
+        connection = Connection(port)
+        while time.monotonic() < deadline:
+            path = urls[next(counter) % len(urls)]
+            started = time.perf_counter()
+            try:
+                status, _ = await connection.get(path)
+            except (OSError, ConnectionError, asyncio.IncompleteReadError, ValueError):
+                errors += 1
+                connection.close()
+                continue
+            latencies.append(time.perf_counter() - started)
+            statuses[status] = statuses.get(status, 0) + 1
+        connection.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return latencies, statuses, errors, time.perf_counter() - started
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))] if ordered else 0.0
+
+
+def bench(label, command, port, urls, args):
+    process = start_server(command, port, urls[0])
+    try:
+        asyncio.run(drive(port, urls, min(args.concurrency, 16), args.warmup))
+        latencies, statuses, errors, elapsed = asyncio.run(drive(port, urls, args.concurrency, args.seconds))
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+    print(
+        f"{label:<24}{len(latencies) / elapsed:>10.0f}"
+        f"{percentile(latencies, 50) * 1000:>10.1f}{percentile(latencies, 95) * 1000:>10.1f}"
+        f"{percentile(latencies, 99) * 1000:>10.1f}{errors:>8}  "
+        + " ".join(f"{code}x{count}" for code, count in sorted(statuses.items()))
+    )
+    return len(latencies) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", help="seeded SQLite file (default: DATABASE_URL)")
+    parser.add_argument("--concurrency", type=int, default=256, help="open client connections")
+    parser.add_argument("--seconds", type=float, default=15)
+    parser.add_argument("--warmup", type=float, default=3)
+    parser.add_argument("--workers", type=int, default=2, help="server processes for each app")
+    parser.add_argument("--threads", type=int, default=32, help="threads per gunicorn worker")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    if not args.db and "DATABASE_URL" not in os.environ:
+        parser.error("pass --db or set DATABASE_URL")
+
+    App = load_app(args.db)
+    urls = sample_urls(App, random.Random(args.seed))
+
+    sync_port, async_port = free_port(), free_port()
+    sync_label, sync_cmd = sync_command(sync_port, args.workers, args.threads)
+    async_label, async_cmd = async_command(async_port, args.workers)
+    print(f"{args.concurrency} connections for {args.seconds:.0f}s, {args.workers} workers per server")
+    print(f"{'server':<24}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}  statuses")
+    sync_rps = bench(f"flask / {sync_label}", sync_cmd, sync_port, urls, args)
+    async_rps = bench(f"asgi / {async_label}", async_cmd, async_port, urls, args)
+    if sync_rps:
+        print(f"\nasync / sync throughput: {async_rps / sync_rps:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""Measure what response compression and version ETags buy on real payloads.
+
+Pulls list responses of several sizes out of the app (product lists, farmer
+transactions and retailer histories at a few ``limit`` values, plus the
+state catalog), then for each one reports:
+
+  * bytes on the wire and CPU per response for identity, gzip at a few
+    levels and brotli (when the ``brotli`` package is installed);
+  * the cost of an ETag from the data-version lookup versus hashing the
+    full body, and the time of a 304 revalidation versus a full 200.
+
+    python scripts/seed_data.py --db bench.db --scale 0.1
+    python scripts/bench_compression.py --db bench.db
+    python scripts/bench_compression.py --db bench.db --levels 1,6,9 --repeat 50
+"""
+import argparse
+import gzip
+import hashlib
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_app(db_path):
+    if db_path:
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.abspath(db_path)}"
+    os.environ.setdefault("ADMISSION_CONTROL", "0")
+    os.chdir(ROOT)
+    sys.path.insert(0, ROOT)
+    import App
+    with App.app.app_context():
+        App.db.create_all()
+    return App
+
+
+def sample_urls(App):
+    db, Product, Purchase = App.db, App.Product, App.Purchase
+    with App.app.app_context():
+        # The busiest farmer and retailer give the largest unpaged bodies
+        farmer_id = db.session.query(Product.farmer_id).group_by(Product.farmer_id).order_by(
+            db.func.count().desc()).limit(1).scalar()
+        retailer_id = db.session.query(Purchase.retailer_id).group_by(Purchase.retailer_id).order_by(
+            db.func.count().desc()).limit(1).scalar()
+    urls = []
+    for limit in (10, 100, 1000):
+        urls.append(f"/farmers/{farmer_id}/products?limit={limit}")
+        urls.append(f"/farmers/{farmer_id}/transactions?limit={limit}")
+        urls.append(f"/retailers/{retailer_id}/transaction-history?limit={limit}")
+    urls.append(f"/farmers/{farmer_id}/transactions")
+    if retailer_id:
+        urls.append(f"/retailer/{retailer_id}/available-products")
+    return urls
+
+
+def cpu_per_call(fn, repeat):
+    started = time.process_time()
+    for _ in range(repeat):
+        fn()
+    return (time.process_time() - started) / repeat
+
+
+def wall_per_call(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+def encoders(levels):
+    yield "identity", lambda body: body
+    for level in levels:
+        yield f"gzip-{level}", lambda body, level=level: gzip.compress(body, compresslevel=level, mtime=0)
+    try:
+        import brotli
+    except ImportError:
+        return
+    for quality in (1, 5, 11):
+        yield f"br-{quality}", lambda body, quality=quality: brotli.compress(body, quality=quality)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", help="SQLite file to run against (default: DATABASE_URL)")
+    parser.add_argument("--levels", default="1,6,9", help="gzip levels to compare")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    if not args.db and "DATABASE_URL" not in os.environ:
+        parser.error("pass --db or set DATABASE_URL")
+
+    App = load_app(args.db)
+    client = App.app.test_client()
+    urls = sample_urls(App)
+    levels = [int(level) for level in args.levels.split(",")]
+    names = [name for name, _ in encoders(levels)]
+
+    print("bytes on the wire (% of identity) and CPU ms per response")
+    print(f"{'url':<58}" + "".join(f"{name:>18}" for name in names))
+    for url in urls:
+        # Identity, so the body is the uncompressed payload
+        body = client.get(url, headers={"Accept-Encoding": "identity"}).get_data()
+        cells = []
+        for name, encode in encoders(levels):
+            size = len(encode(body))
+            cpu = cpu_per_call(lambda: encode(body), args.repeat) * 1000
+            cells.append(f"{size:>9} {cpu:>7.2f}" if name == "identity" else f"{size / len(body):>8.0%}  {cpu:>7.2f}")
+        print(f"{url[:57]:<58}" + "".join(f"{cell:>18}" for cell in cells))
+
+    print("\nETag cost and revalidation, median ms")
+    print(f"{'url':<58}{'version etag':>14}{'sha1(body)':>12}{'200':>10}{'304':>10}")
+    for url in urls:
+        if "available-products" in url:
+            continue  # cached catalog bodies carry their own ETag
+        response = client.get(url, headers={"Accept-Encoding": "identity"})
+        etag = response.headers.get("ETag")
+        if etag is None:
+            continue
+        body = response.get_data()
+        scopes = ("product_names",) if "transaction-history" in url else ()
+        scope = url.split("/")[1][:-1] + ":" + url.split("/")[2]
+        with App.app.test_request_context(url):
+            version = wall_per_call(lambda: App.list_etag(scope, *scopes), args.repeat) * 1000
+        digest = wall_per_call(lambda: hashlib.sha1(body).hexdigest(), args.repeat) * 1000
+        full = wall_per_call(lambda: client.get(url, headers={"Accept-Encoding": "gzip"}), args.repeat) * 1000
+        revalidate = wall_per_call(lambda: client.get(url, headers={"If-None-Match": etag}), args.repeat) * 1000
+        print(f"{url[:57]:<58}{version:>14.3f}{digest:>12.3f}{full:>10.2f}{revalidate:>10.2f}")
+    print("\nsha1(body) excludes building the body, which hashing it would need on every request")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,300 @@
+"""Benchmark every route through Flask's test client against a seeded database.
+
+Each route is called ``--iterations`` times with ids sampled from the data
+(see seed_data.py), recording wall time and the number of SQL statements per
+call. Prints p50/p95/p99 latency and queries per call, writes the run to a
+JSON file and, given ``--compare``, shows the change against an earlier run.
+
+    python scripts/seed_data.py --db bench.db --scale 0.1
+    python scripts/bench_endpoints.py --db bench.db --out before.json
+    ... change something ...
+    python scripts/bench_endpoints.py --db bench.db --out after.json --compare before.json
+
+Write routes (purchases, product edits, sign-ups) change the data, so reseed
+or work on a copy when runs need to be comparable row for row.
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime
+from urllib.parse import urlencode
+
+from sqlalchemy import event
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_app(db_path):
+    if db_path:
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.abspath(db_path)}"
+    # One client driving every route: the per-client rate limits would shed most of the run
+    os.environ.setdefault("ADMISSION_CONTROL", "0")
+    os.chdir(ROOT)
+    sys.path.insert(0, ROOT)
+    import App
+    return App
+
+
+class Samples:
+    """Random ids to call the routes with, drawn once from the database."""
+
+    def __init__(self, App, rng, size=500):
+        db, Farmer, Product, Purchase = App.db, App.Farmer, App.Product, App.Purchase
+        self.rng = rng
+        self.farmers = [r[0] for r in db.session.query(Product.farmer_id).distinct().order_by(db.func.random()).limit(size)]
+        self.retailers = [
+            r[0] for r in db.session.query(Purchase.retailer_id).distinct().order_by(db.func.random()).limit(size)
+        ]
+        self.products = db.session.query(
+            Product.id, Product.farmer_id, Product.name, Product.category
+        ).filter(Product.farmer_id.in_(self.farmers)).order_by(db.func.random()).limit(size * 4).all()
+        self.in_stock = [p.id for p in db.session.query(Product.id).filter(
+            Product.in_stock.is_(True), Product.quantity > 0,
+        ).order_by(db.func.random()).limit(size)]
+        self.mobiles = dict(db.session.query(Farmer.id, Farmer.mobilenumber).filter(Farmer.id.in_(self.farmers)))
+        self.retailer_mobiles = dict(
+            db.session.query(App.Retailer.aadhar, App.Retailer.mobilenumber).filter(App.Retailer.aadhar.in_(self.retailers))
+        )
+        self.counter = 0
+        if not (self.farmers and self.retailers and self.products and self.in_stock):
+            raise SystemExit("The database has no products/purchases; run scripts/seed_data.py first.")
+
+    def farmer(self):
+        return self.rng.choice(self.farmers)
+
+    def retailer(self):
+        return self.rng.choice(self.retailers)
+
+    def product(self):
+        return self.rng.choice(self.products)
+
+    def unique(self):
+        self.counter += 1
+        return f"{os.getpid() % 100:02d}{int(time.time()) % 10**5:05d}{self.counter:06d}"
+
+
+def routes(s):
+    """(name, method, url, body) factories; each call gets freshly sampled ids."""
+    def new_farmer():
+        n = s.unique()
+        return {"farmername": f"Bench {n}", "mobilenumber": f"6{n}"[:15], "password": "pw", "gender": "male",
+                "State": "Andhra Pradesh", "City": "Guntur", "aadhar": n}
+
+    def new_retailer():
+        n = s.unique()
+        return {"aadhar": f"BR{n}"[:20], "enterprise_name": "Bench Mart", "owner_name": "Owner",
+                "mobilenumber": f"5{n}"[:15], "password": "pw", "State": "Andhra Pradesh", "City": "Guntur",
+                "Gstin": "GST", "Pan": "PAN"}
+
+    def farmer_login():
+        farmer = s.farmer()
+        return {"mobilenumber": s.mobiles[farmer], "password": "pw"}
+
+    def retailer_login():
+        retailer = s.retailer()
+        return {"mobilenumber": s.retailer_mobiles[retailer], "password": "pw"}
+
+    def product_analysis():
+        p = s.product()
+        return f"/farmers/{p.farmer_id}/product-profit-analysis?" + urlencode(
+            {"category": p.category, "product_name": p.name})
+
+    def product_analysis_summary():
+        p = s.product()
+        return f"/farmers/{p.farmer_id}/product-profit-analysis?" + urlencode(
+            {"category": p.category, "product_name": p.name, "mode": "summary", "bucket": "month"})
+
+    def patch_product():
+        p = s.product()
+        return f"/farmers/{p.farmer_id}/products/{p.id}", {"price": round(s.rng.uniform(5, 200), 2)}
+
+    def bulk_products():
+        return [{"name": "Tomato", "category": "Vegetables", "price": 20, "quantity": 10} for _ in range(25)]
+
+    today = datetime.utcnow().date()
+    month_ago = today.replace(day=1).isoformat()
+    return [
+        ("index", "GET", lambda: "/", None),
+        ("diagnostics", "GET", lambda: "/diagnostics", None),
+        ("metrics", "GET", lambda: "/metrics", None),
+        ("create_farmer", "POST", lambda: "/create-farmer", new_farmer),
+        ("login_farmer", "POST", lambda: "/login-farmer", farmer_login),
+        ("create_retailer", "POST", lambda: "/create-retailer", new_retailer),
+        ("login_retailer", "POST", lambda: "/login-retailer", retailer_login),
+        ("create_product", "POST", lambda: f"/farmers/{s.farmer()}/products",
+         lambda: {"name": "Tomato", "category": "Vegetables", "price": 20, "quantity": 10}),
+        ("bulk_create_products", "POST", lambda: f"/farmers/{s.farmer()}/products/bulk", bulk_products),
+        ("list_products", "GET", lambda: f"/farmers/{s.farmer()}/products", None),
+        ("list_products_page", "GET", lambda: f"/farmers/{s.farmer()}/products?limit=100", None),
+        ("update_product", "PATCH", patch_product, None),
+        ("available_products", "GET", lambda: f"/retailer/{s.retailer()}/available-products", None),
+        ("available_products_page", "GET", lambda: f"/retailer/{s.retailer()}/available-products?limit=100", None),
+        ("purchase_product", "POST", lambda: f"/products/{s.rng.choice(s.in_stock)}/purchase",
+         lambda: {"retailer_id": s.retailer(), "quantity": 1, "payment_type": "UPI"}),
+        ("checkout", "POST", lambda: f"/retailers/{s.retailer()}/checkout",
+         lambda: {"payment_type": "UPI", "items": [
+             {"product_id": pid, "quantity": 1} for pid in set(s.rng.sample(s.in_stock, min(5, len(s.in_stock))))
+         ]}),
+        ("product_history", "GET", lambda: f"/farmers/{s.farmer()}/product-history", None),
+        ("farmer_transactions", "GET", lambda: f"/farmers/{s.farmer()}/transactions", None),
+        ("farmer_transactions_page", "GET", lambda: f"/farmers/{s.farmer()}/transactions?limit=100", None),
+        ("farmer_transactions_export", "GET", lambda: f"/farmers/{s.farmer()}/transactions/export", None),
+        ("farmer_analytics", "GET", lambda: f"/farmers/{s.farmer()}/analytics", None),
+        ("farmer_sales_series", "GET", lambda: f"/farmers/{s.farmer()}/sales-series?granularity=week", None),
+        ("transaction_report", "GET",
+         lambda: f"/farmers/{s.farmer()}/transactions/report?from_date={month_ago}&to_date={today.isoformat()}", None),
+        ("submit_report", "POST", lambda: f"/farmers/{s.farmer()}/reports",
+         lambda: {"from_date": month_ago, "to_date": today.isoformat()}),
+        ("retailer_transaction_history", "GET", lambda: f"/retailers/{s.retailer()}/transaction-history", None),
+        ("retailer_transaction_history_page", "GET",
+         lambda: f"/retailers/{s.retailer()}/transaction-history?limit=100", None),
+        ("retailer_transactions_export", "GET",
+         lambda: f"/retailers/{s.retailer()}/transactions/export?format=ndjson", None),
+        ("stock_bought_this_month", "GET", lambda: f"/retailers/{s.retailer()}/stock-bought-this-month", None),
+        ("retailer_monthly_summary", "GET", lambda: f"/retailers/{s.retailer()}/monthly-summary", None),
+        ("product_profit_analysis", "GET", product_analysis, None),
+        ("product_profit_summary", "GET", product_analysis_summary, None),
+        ("retailer_purchase_analysis", "GET", lambda: f"/retailers/{s.retailer()}/purchase-analysis", None),
+        ("retailer_purchase_summary", "GET",
+         lambda: f"/retailers/{s.retailer()}/purchase-analysis?mode=summary&bucket=month", None),
+        ("mark_sold_out", "POST", lambda: "/farmers/{0.farmer_id}/products/{0.id}/soldout".format(s.product()), None),
+    ]
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    index = max(0, math.ceil(pct / 100 * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+def run(App, iterations, warmup, seed, only):
+    rng = random.Random(seed)
+    client = App.app.test_client()
+    query_count = [0]
+
+    def count_query(*args):
+        query_count[0] += 1
+
+    with App.app.app_context():
+        engine = App.db.engine
+        samples = Samples(App, rng)
+    event.listen(engine, "before_cursor_execute", count_query)
+    results = {}
+    for name, method, url_fn, body_fn in routes(samples):
+        if only and name not in only:
+            continue
+        timings, queries, statuses = [], [], {}
+        for i in range(warmup + iterations):
+            url = url_fn()
+            body = body_fn() if body_fn else None
+            if isinstance(url, tuple):
+                url, body = url
+            query_count[0] = 0
+            started = time.perf_counter()
+            response = client.open(url, method=method, json=body)
+            response.get_data()
+            elapsed = time.perf_counter() - started
+            response.close()
+            if i < warmup:
+                continue
+            timings.append(elapsed * 1000)
+            queries.append(query_count[0])
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+        timings.sort()
+        results[name] = {
+            "method": method,
+            "calls": iterations,
+            "statuses": {str(k): v for k, v in sorted(statuses.items())},
+            "p50_ms": round(percentile(timings, 50), 3),
+            "p95_ms": round(percentile(timings, 95), 3),
+            "p99_ms": round(percentile(timings, 99), 3),
+            "mean_ms": round(sum(timings) / len(timings), 3),
+            "queries_per_call": round(sum(queries) / len(queries), 2),
+            "max_queries": max(queries),
+        }
+        print(_row(name, results[name]), flush=True)
+    event.remove(engine, "before_cursor_execute", count_query)
+    return results
+
+
+def _row(name, r):
+    statuses = " ".join(f"{k}x{v}" for k, v in r["statuses"].items())
+    return (f"{name:<36}{r['p50_ms']:>9.2f}{r['p95_ms']:>9.2f}{r['p99_ms']:>9.2f}"
+            f"{r['queries_per_call']:>9.1f}  {statuses}")
+
+
+def table_counts(App):
+    with App.app.app_context():
+        return {
+            model.__tablename__: App.db.session.query(App.db.func.count()).select_from(model).scalar()
+            for model in (App.Farmer, App.Retailer, App.Product, App.Purchase)
+        }
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_path):
+    with open(baseline_path) as file:
+        baseline = json.load(file)["routes"]
+    print(f"\nChange vs {baseline_path} (negative is faster)")
+    print(f"{'route':<36}{'p50':>10}{'p95':>10}{'queries':>10}")
+    for name, r in results.items():
+        old = baseline.get(name)
+        if not old:
+            continue
+        p50 = (r["p50_ms"] - old["p50_ms"]) / old["p50_ms"] * 100 if old["p50_ms"] else 0.0
+        p95 = (r["p95_ms"] - old["p95_ms"]) / old["p95_ms"] * 100 if old["p95_ms"] else 0.0
+        print(f"{name:<36}{p50:>+9.1f}%{p95:>+9.1f}%{r['queries_per_call'] - old['queries_per_call']:>+10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", help="seeded SQLite file (default: DATABASE_URL)")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--only", nargs="*", help="run just these route names")
+    parser.add_argument("--out", default="bench-results.json")
+    parser.add_argument("--compare", help="earlier results JSON to diff against")
+    args = parser.parse_args()
+    if not args.db and "DATABASE_URL" not in os.environ:
+        parser.error("pass --db or set DATABASE_URL")
+
+    App = load_app(args.db)
+    print(f"{'route':<36}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'queries':>9}  statuses")
+    results = run(App, args.iterations, args.warmup, args.seed, set(args.only or ()))
+    report = {
+        "meta": {
+            "started_at": datetime.utcnow().isoformat(timespec="seconds"),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "database": os.environ["DATABASE_URL"].rsplit("@", 1)[-1],
+            "rows": table_counts(App),
+            "iterations": args.iterations,
+            "seed": args.seed,
+        },
+        "routes": results,
+    }
+    with open(args.out, "w") as file:
+        json.dump(report, file, indent=2)
+    print(f"\nWrote {args.out}")
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+"""Compare the ORM and projection read paths for the big list endpoints.
+
+Seeds a throwaway SQLite database with ``--rows`` products and purchases for
+one farmer/retailer, then for list_products, farmer_transactions and
+retailer_transaction_history times, per 10k rows:
+
+* before: ORM entities -> to_dict()/isoformat() -> Flask's stdlib jsonify
+* after:  column projection -> plain row dict -> fast_json (orjson if installed)
+
+Fetch and serialize are reported separately, best of ``--repeat`` runs.
+
+    python scripts/bench_read_path.py --rows 20000 --repeat 5
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_app(db_path):
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    os.chdir(ROOT)
+    sys.path.insert(0, ROOT)
+    import App
+    return App
+
+
+def seed(App, rows):
+    db = App.db
+    db.session.add(App.Farmer(
+        id=1, farmername="Bench Farmer", mobilenumber="9000000001", password="pw", gender="male",
+        State="Andhra Pradesh", City="Guntur", aadhar="BENCH",
+    ))
+    db.session.add(App.Retailer(
+        aadhar="R-1", enterprise_name="Bench Mart", owner_name="Asha", mobilenumber="9000000002",
+        password="pw", State="Andhra Pradesh", City="Guntur", Gstin="GST1", Pan="PAN1",
+    ))
+    db.session.flush()
+
+    rng = random.Random(7)
+    start = datetime(2025, 1, 1)
+    categories = ["Vegetables", "Fruits", "Cereals", "Pulses", "Spices"]
+    db.session.execute(App.Product.__table__.insert(), [
+        {
+            "id": i, "farmer_id": 1, "name": f"Product {i}", "category": rng.choice(categories),
+            "price": round(rng.uniform(5, 200), 2), "quantity": rng.randint(0, 500), "in_stock": True,
+            "created_at": start + timedelta(minutes=i), "updated_at": start + timedelta(minutes=i, seconds=30),
+        }
+        for i in range(1, rows + 1)
+    ])
+    db.session.execute(App.Purchase.__table__.insert(), [
+        {
+            "id": i, "retailer_id": "R-1", "product_id": rng.randint(1, rows), "quantity": rng.randint(1, 20),
+            "payment_type": "UPI", "payment_amount": round(rng.uniform(10, 4000), 2),
+            "created_at": start + timedelta(minutes=i, microseconds=rng.randint(0, 999999)),
+        }
+        for i in range(1, rows + 1)
+    ])
+    db.session.commit()
+
+
+def orm_paths(App):
+    db, Product, Purchase, Farmer = App.db, App.Product, App.Purchase, App.Farmer
+
+    def list_products():
+        return Product.query.filter_by(farmer_id=1).order_by(Product.updated_at.desc(), Product.id.desc()).all()
+
+    def farmer_transactions():
+        return (
+            db.session.query(Purchase, Product)
+            .join(Product, Purchase.product_id == Product.id)
+            .filter(Product.farmer_id == 1)
+            .order_by(Purchase.created_at, Purchase.id)
+            .all()
+        )
+
+    def retailer_history():
+        return (
+            db.session.query(Purchase, Product, Farmer)
+            .join(Product, Purchase.product_id == Product.id)
+            .join(Farmer, Product.farmer_id == Farmer.id)
+            .filter(Purchase.retailer_id == "R-1")
+            .order_by(Purchase.created_at, Purchase.id)
+            .all()
+        )
+
+    def farmer_transaction_dict(row):
+        purchase, product = row
+        return {
+            "transaction_id": purchase.id,
+            "product_id": product.id,
+            "product_name": product.name,
+            "category": product.category,
+            "quantity_sold": purchase.quantity,
+            "payment_type": purchase.payment_type,
+            "payment_amount": purchase.payment_amount,
+            "sold_date": purchase.created_at.isoformat(),
+        }
+
+    def retailer_history_dict(row):
+        purchase, product, farmer = row
+        return {
+            "order_id": purchase.id,
+            "product_name": product.name,
+            "category": product.category,
+            "farmer_name": farmer.farmername,
+            "quantity": purchase.quantity,
+            "payment_type": purchase.payment_type,
+            "payment_amount": purchase.payment_amount,
+            "purchase_date": purchase.created_at.strftime("%Y-%m-%d"),
+        }
+
+    return {
+        "list_products": (list_products, Product.to_dict),
+        "farmer_transactions": (farmer_transactions, farmer_transaction_dict),
+        "retailer_transaction_history": (retailer_history, retailer_history_dict),
+    }
+
+
+def projection_paths(App):
+    db, Product, Purchase, Farmer = App.db, App.Product, App.Purchase, App.Farmer
+
+    def list_products():
+        return (
+            db.session.query(*App.PRODUCT_COLUMNS)
+            .filter(Product.farmer_id == 1)
+            .order_by(Product.updated_at.desc(), Product.id.desc())
+            .all()
+        )
+
+    def farmer_transactions():
+        return (
+            db.session.query(*App.FARMER_TRANSACTION_COLUMNS)
+            .select_from(Purchase)
+            .join(Product, Purchase.product_id == Product.id)
+            .filter(Product.farmer_id == 1)
+            .order_by(Purchase.created_at, Purchase.id)
+            .all()
+        )
+
+    def retailer_history():
+        return (
+            db.session.query(*App.RETAILER_TRANSACTION_COLUMNS)
+            .select_from(Purchase)
+            .join(Product, Purchase.product_id == Product.id)
+            .join(Farmer, Product.farmer_id == Farmer.id)
+            .filter(Purchase.retailer_id == "R-1")
+            .order_by(Purchase.created_at, Purchase.id)
+            .all()
+        )
+
+    return {
+        "list_products": (list_products, App.product_row),
+        "farmer_transactions": (farmer_transactions, App.farmer_transaction_row),
+        "retailer_transaction_history": (retailer_history, App.retailer_transaction_row),
+    }
+
+
+def measure(App, fetch, serialize, encode, repeat):
+    best_fetch = best_serialize = float("inf")
+    size = count = 0
+    for _ in range(repeat):
+        App.db.session.expunge_all()
+        started = time.perf_counter()
+        rows = fetch()
+        fetched = time.perf_counter()
+        body = encode([serialize(row) for row in rows])
+        done = time.perf_counter()
+        best_fetch = min(best_fetch, fetched - started)
+        best_serialize = min(best_serialize, done - fetched)
+        size, count = len(body), len(rows)
+    return best_fetch, best_serialize, size, count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        App = load_app(os.path.join(tmp, "bench.db"))
+        from fast_json import backend, dumps
+
+        with App.app.app_context():
+            seed(App, args.rows)
+            stdlib = lambda payload: App.app.json.dumps(payload).encode("utf-8")
+            before, after = orm_paths(App), projection_paths(App)
+
+            print(f"{args.rows} rows, best of {args.repeat}; ms per 10k rows (fast_json backend: {backend()})")
+            print(f"{'endpoint':<30}{'path':<8}{'fetch':>10}{'serialize':>12}{'total':>10}{'bytes':>12}")
+            for name in before:
+                results = (
+                    ("before", measure(App, *before[name], stdlib, args.repeat)),
+                    ("after", measure(App, *after[name], dumps, args.repeat)),
+                )
+                for label, (fetch, serialize, size, count) in results:
+                    scale = 10000 / max(count, 1) * 1000
+                    print(
+                        f"{name:<30}{label:<8}{fetch * scale:>10.1f}{serialize * scale:>12.1f}"
+                        f"{(fetch + serialize) * scale:>10.1f}{size:>12}"
+                    )
+
+
+if __name__ == "__main__":
+    main()
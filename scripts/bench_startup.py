@@ -0,0 +1,101 @@
+"""Measure how long a fresh worker takes to become ready.
+
+Each run starts a new interpreter that imports App (which builds the app via
+create_app) and then serves one request through the test client, timing the
+interpreter start, the import and the first request separately. Pass
+``--baseline <git rev>`` to run the same measurement against an older
+checkout exported to a temporary directory, e.g. the commit before the app
+factory, to see what moved off the startup path.
+
+    python scripts/bench_startup.py --db bench.db --runs 10
+    python scripts/bench_startup.py --db bench.db --baseline HEAD~1
+    DATABASE_URL=mysql+pymysql://... python scripts/bench_startup.py --path /farmers/1/analytics
+
+Point it at the production-like database to see network costs: against a
+local SQLite file, schema creation and pool warm-up are nearly free.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import App
+imported = time.perf_counter()
+status = App.app.test_client().get(sys.argv[1]).status_code
+served = time.perf_counter()
+print(json.dumps({"import": imported - started, "first_request": served - imported, "status": status}))
+"""
+
+
+def measure(source_dir, path, runs):
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, "-c", PROBE, path], cwd=source_dir, env=os.environ.copy(),
+            capture_output=True, text=True,
+        )
+        total = time.perf_counter() - started
+        if result.returncode != 0:
+            raise SystemExit(f"Probe failed in {source_dir}:\n{result.stderr[-2000:]}")
+        # Older revisions print to stdout on import; the timings are the last line
+        sample = json.loads(result.stdout.strip().splitlines()[-1])
+        sample["total"] = total
+        sample["interpreter"] = total - sample["import"] - sample["first_request"]
+        samples.append(sample)
+    return samples
+
+
+def export_revision(rev, target):
+    archive = subprocess.run(["git", "archive", "--format=tar", rev], cwd=ROOT, capture_output=True, check=True)
+    with tempfile.TemporaryFile() as file:
+        file.write(archive.stdout)
+        file.seek(0)
+        with tarfile.open(fileobj=file) as tar:
+            tar.extractall(target)
+
+
+def report(label, samples):
+    statuses = sorted({s["status"] for s in samples})
+    cells = []
+    for key in ("interpreter", "import", "first_request", "total"):
+        values = [s[key] * 1000 for s in samples]
+        cells.append(f"{statistics.median(values):>10.1f}{min(values):>8.1f}")
+    print(f"{label:<14}" + "".join(cells) + f"  {statuses}")
+    return statistics.median(s["total"] for s in samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", help="SQLite file to run against (default: DATABASE_URL)")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--path", default="/metrics", help="route to serve as the first request")
+    parser.add_argument("--baseline", help="git revision to compare against")
+    args = parser.parse_args()
+    if args.db:
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.abspath(args.db)}"
+    if "DATABASE_URL" not in os.environ:
+        parser.error("pass --db or set DATABASE_URL")
+
+    print(f"{args.runs} runs, first request GET {args.path}; median and min in ms")
+    print(f"{'':<14}" + "".join(f"{name:>18}" for name in ("interpreter", "import", "first request", "total")))
+    current = report("working tree", measure(ROOT, args.path, args.runs))
+    if args.baseline:
+        with tempfile.TemporaryDirectory() as tmp:
+            export_revision(args.baseline, tmp)
+            baseline = report(args.baseline[:14], measure(tmp, args.path, args.runs))
+        print(f"\nworking tree / {args.baseline}: {current / baseline:.2f}x total startup time")
+
+
+if __name__ == "__main__":
+    main()
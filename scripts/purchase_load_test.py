@@ -0,0 +1,180 @@
+"""Concurrent load test for POST /products/<id>/purchase.
+
+Seeds one farmer, a pool of retailers and a few products with limited stock,
+then fires purchases from many threads until the stock is gone. Afterwards it
+checks the no-oversell invariant (stock never negative and every unit sold is
+backed by exactly one Purchase row, in the rollup too) and reports orders/s.
+
+    python scripts/purchase_load_test.py --threads 16 --stock 500
+    DATABASE_URL=mysql+pymysql://root:pw@localhost/farm2bazaar_test \\
+        python scripts/purchase_load_test.py
+
+Without DATABASE_URL a temporary SQLite file is used. Point it at a disposable
+database only: the tables are created and seeded in place.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_app():
+    # One client driving every route: the per-client rate limits would shed most of the run
+    os.environ.setdefault("ADMISSION_CONTROL", "0")
+    os.chdir(ROOT)
+    sys.path.insert(0, ROOT)
+    import App
+    with App.app.app_context():
+        App.db.create_all()
+    return App
+
+
+def seed(App, retailers, products, stock):
+    db = App.db
+    farmer = App.Farmer(
+        farmername="Load Farmer", mobilenumber=f"load-{time.time_ns()}", password="pw", gender="male",
+        State="Andhra Pradesh", City="Guntur", aadhar="LOAD",
+    )
+    db.session.add(farmer)
+    db.session.flush()
+    retailer_ids = []
+    for i in range(retailers):
+        rid = f"LR{time.time_ns() % 10**12}{i}"[:20]
+        db.session.add(App.Retailer(
+            aadhar=rid, enterprise_name=f"Load Retailer {i}", owner_name="Owner", mobilenumber=rid,
+            password="pw", State="Andhra Pradesh", City="Guntur", Gstin="GST", Pan="PAN",
+        ))
+        retailer_ids.append(rid)
+    product_ids = []
+    for i in range(products):
+        product = App.Product(
+            farmer_id=farmer.id, name=f"Load Product {i}", category="Vegetables",
+            price=10.0, quantity=stock, in_stock=True,
+        )
+        db.session.add(product)
+        db.session.flush()
+        App.bump_sales_rollup(farmer.id, product.category, present_stock=stock)
+        product_ids.append(product.id)
+    db.session.commit()
+    return farmer.id, retailer_ids, product_ids
+
+
+def worker(app, retailer_ids, product_ids, max_qty, stop, results):
+    client = app.test_client()
+    rng = random.Random()
+    while not stop.is_set():
+        product_id = rng.choice(product_ids)
+        quantity = rng.randint(1, max_qty)
+        started = time.perf_counter()
+        response = client.post(f"/products/{product_id}/purchase", json={
+            "retailer_id": rng.choice(retailer_ids), "quantity": quantity, "payment_type": "UPI",
+        })
+        elapsed = time.perf_counter() - started
+        if response.status_code == 200:
+            results.append(("ok", product_id, quantity, elapsed))
+        elif response.status_code == 400 and response.get_json().get("error") == "Insufficient stock":
+            results.append(("rejected", product_id, quantity, elapsed))
+        else:
+            results.append((f"http {response.status_code}", product_id, quantity, elapsed))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--retailers", type=int, default=20)
+    parser.add_argument("--products", type=int, default=3)
+    parser.add_argument("--stock", type=int, default=500, help="initial quantity per product")
+    parser.add_argument("--max-qty", type=int, default=5, help="largest quantity per order")
+    parser.add_argument("--duration", type=float, default=30.0, help="give up after this many seconds")
+    args = parser.parse_args()
+
+    tmp = None
+    if "DATABASE_URL" not in os.environ:
+        tmp = tempfile.TemporaryDirectory()
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp.name, 'load.db')}"
+    App = load_app()
+    app, db = App.app, App.db
+
+    with app.app_context():
+        farmer_id, retailer_ids, product_ids = seed(App, args.retailers, args.products, args.stock)
+
+    stop = threading.Event()
+    results = []
+    threads = [
+        threading.Thread(target=worker, args=(app, retailer_ids, product_ids, args.max_qty, stop, results))
+        for _ in range(args.threads)
+    ]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+
+    # Stop once every product is sold out (or the time limit is hit)
+    with app.app_context():
+        while time.perf_counter() - started < args.duration:
+            remaining = db.session.query(db.func.sum(App.Product.quantity)).filter(
+                App.Product.id.in_(product_ids)
+            ).scalar()
+            db.session.rollback()
+            if not remaining:
+                break
+            time.sleep(0.05)
+    stop.set()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    outcomes = Counter(r[0] for r in results)
+    sold_by_product = Counter()
+    for outcome, product_id, quantity, _ in results:
+        if outcome == "ok":
+            sold_by_product[product_id] += quantity
+
+    failures = []
+    with app.app_context():
+        for product_id in product_ids:
+            product = db.session.get(App.Product, product_id)
+            recorded = db.session.query(db.func.coalesce(db.func.sum(App.Purchase.quantity), 0)).filter(
+                App.Purchase.product_id == product_id
+            ).scalar()
+            if product.quantity < 0:
+                failures.append(f"product {product_id}: negative stock {product.quantity}")
+            if product.quantity + recorded != args.stock:
+                failures.append(
+                    f"product {product_id}: stock {product.quantity} + purchased {recorded} != {args.stock}"
+                )
+            if recorded != sold_by_product[product_id]:
+                failures.append(
+                    f"product {product_id}: {recorded} units recorded but {sold_by_product[product_id]} acknowledged"
+                )
+            if product.in_stock != (product.quantity > 0):
+                failures.append(f"product {product_id}: in_stock={product.in_stock} with quantity {product.quantity}")
+        rollup = db.session.get(App.FarmerSalesRollup, (farmer_id, "Vegetables"))
+        total_sold = sum(sold_by_product.values())
+        if rollup.units_sold != total_sold or rollup.present_stock != args.stock * len(product_ids) - total_sold:
+            failures.append(f"rollup drifted: {rollup.to_dict()} vs {total_sold} units sold")
+
+    latencies = sorted(r[3] for r in results if r[0] == "ok")
+    print(f"database:        {app.config['SQLALCHEMY_DATABASE_URI'].split('@')[-1]}")
+    print(f"threads:         {args.threads}")
+    print(f"elapsed:         {elapsed:.2f}s")
+    print(f"outcomes:        {dict(outcomes)}")
+    print(f"orders/s:        {outcomes['ok'] / elapsed:.1f}")
+    if latencies:
+        print(f"p50 / p95 (ms):  {latencies[len(latencies) // 2] * 1000:.1f} / "
+              f"{latencies[int(len(latencies) * 0.95)] * 1000:.1f}")
+    if failures:
+        print("INVARIANT VIOLATIONS:")
+        print("\n".join(f"  {f}" for f in failures))
+        return 1
+    print("no-oversell invariant holds")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
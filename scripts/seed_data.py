@@ -0,0 +1,201 @@
+"""Fill a database with synthetic farmers, retailers, products and purchases.
+
+Products are drawn from the states, categories and products in
+market_rates.json, priced around the market rate; purchases go to retailers
+in the product's state, spread over the last ``--days`` days. Rows are written
+with batched executemany inserts and the rollup tables are rebuilt at the end,
+so the result looks like a database the app has been writing to all along.
+
+    python scripts/seed_data.py --db bench.db                 # 10k / 2k / 1M / 5M rows
+    python scripts/seed_data.py --db bench.db --scale 0.01    # quick run, 1% of that
+    DATABASE_URL=mysql+pymysql://root:pw@localhost/farm2bazaar_bench python scripts/seed_data.py
+
+Rows are appended after the highest existing ids, so run it against a
+disposable database.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BATCH_SIZE = 10000
+
+CITIES = {
+    "Andhra Pradesh": ["Guntur", "Vijayawada", "Visakhapatnam", "Nellore", "Kurnool", "Tirupati", "Kakinada", "Anantapur"],
+}
+PAYMENT_TYPES = ["UPI", "UPI", "UPI", "Cash", "Card", "NetBanking"]
+
+
+def load_app(db_path):
+    if db_path:
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.abspath(db_path)}"
+    os.chdir(ROOT)
+    sys.path.insert(0, ROOT)
+    import App
+    with App.app.app_context():
+        App.db.create_all()
+    return App
+
+
+def load_catalog(path):
+    with open(path) as file:
+        market_data = json.load(file)
+    catalog = {}
+    for state, state_data in market_data.items():
+        catalog[state] = [
+            (category, product, rate)
+            for category, products in (state_data.get("products") or {}).items()
+            for product, rate in products.items()
+        ]
+    return catalog
+
+
+def insert_batches(App, table, rows, label):
+    started, total, batch = time.perf_counter(), 0, []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            App.db.session.execute(table.insert(), batch)
+            App.db.session.commit()
+            total += len(batch)
+            batch = []
+    if batch:
+        App.db.session.execute(table.insert(), batch)
+        App.db.session.commit()
+        total += len(batch)
+    print(f"  {label}: {total} rows in {time.perf_counter() - started:.1f}s")
+
+
+def next_id(App, column):
+    return (App.db.session.query(App.db.func.max(column)).scalar() or 0) + 1
+
+
+def seed(App, args):
+    rng = random.Random(args.seed)
+    catalog = load_catalog(App.market_rates.path)
+    states = sorted(catalog)
+    now = datetime.utcnow().replace(microsecond=0)
+    start = now - timedelta(days=args.days)
+    db = App.db
+
+    if db.engine.dialect.name == "sqlite":
+        db.session.execute(text("PRAGMA journal_mode=WAL"))
+        db.session.execute(text("PRAGMA synchronous=OFF"))
+
+    # Farmers
+    first_farmer = next_id(App, App.Farmer.id)
+    farmer_states = [rng.choice(states) for _ in range(args.farmers)]
+    insert_batches(App, App.Farmer.__table__, (
+        {
+            "id": first_farmer + i, "farmername": f"Farmer {first_farmer + i}",
+            "mobilenumber": f"8{first_farmer + i:09d}", "password": "pw",
+            "gender": rng.choice(("male", "female")), "State": state,
+            "City": rng.choice(CITIES.get(state, [state])), "aadhar": f"{first_farmer + i:012d}",
+        }
+        for i, state in enumerate(farmer_states)
+    ), "farmer")
+
+    # Retailers
+    offset = db.session.query(db.func.count(App.Retailer.aadhar)).scalar()
+    retailers_by_state = {state: [] for state in states}
+    retailer_rows = []
+    for i in range(offset, offset + args.retailers):
+        state = rng.choice(states)
+        aadhar = f"SR{i:010d}"
+        retailers_by_state[state].append(aadhar)
+        retailer_rows.append({
+            "aadhar": aadhar, "enterprise_name": f"Retailer {i} Traders", "owner_name": f"Owner {i}",
+            "mobilenumber": f"7{i:09d}", "password": "pw", "State": state,
+            "City": rng.choice(CITIES.get(state, [state])), "Gstin": f"GST{i:012d}", "Pan": f"PAN{i:07d}",
+        })
+    insert_batches(App, App.Retailer.__table__, retailer_rows, "retailer")
+    del retailer_rows
+
+    # Products: price around the market rate, a tenth of them already sold out
+    first_product = next_id(App, App.Product.id)
+    product_price, product_state = [], []
+
+    def products():
+        for i in range(args.products):
+            farmer_index = rng.randrange(args.farmers)
+            state = farmer_states[farmer_index]
+            category, name, rate = rng.choice(catalog[state])
+            price = round(rate * rng.uniform(0.8, 1.2), 2)
+            quantity = 0 if rng.random() < 0.1 else rng.randint(1, 1000)
+            created_at = start + timedelta(seconds=rng.randrange(args.days * 86400))
+            product_price.append(price)
+            product_state.append(state)
+            yield {
+                "id": first_product + i, "farmer_id": first_farmer + farmer_index, "name": name,
+                "category": category, "price": price, "quantity": quantity, "in_stock": quantity > 0,
+                "created_at": created_at,
+                "updated_at": created_at + timedelta(seconds=rng.randrange(max(1, int((now - created_at).total_seconds())))),
+            }
+
+    insert_batches(App, App.Product.__table__, products(), "products")
+
+    # Purchases: by retailers in the product's state, spread over the window
+    first_purchase = next_id(App, App.Purchase.id)
+
+    def purchases():
+        for i in range(args.purchases):
+            index = rng.randrange(args.products)
+            buyers = retailers_by_state[product_state[index]]
+            if not buyers:
+                continue
+            quantity = rng.randint(1, 50)
+            yield {
+                "id": first_purchase + i, "retailer_id": rng.choice(buyers), "product_id": first_product + index,
+                "quantity": quantity, "payment_type": rng.choice(PAYMENT_TYPES),
+                "payment_amount": round(product_price[index] * quantity, 2),
+                "created_at": start + timedelta(seconds=rng.randrange(args.days * 86400)),
+            }
+
+    insert_batches(App, App.Purchase.__table__, purchases(), "purchase")
+
+    # Rollups the read endpoints depend on
+    runner = App.app.test_cli_runner()
+    for command in ("rebuild-sales-rollup", "rebuild-retailer-monthly", "rebuild-daily-sales"):
+        started = time.perf_counter()
+        result = runner.invoke(args=[command])
+        print(f"  {result.output.strip()} ({time.perf_counter() - started:.1f}s)")
+    if db.engine.dialect.name == "sqlite":
+        db.session.execute(text("ANALYZE"))
+        db.session.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", help="SQLite file to fill (default: DATABASE_URL)")
+    parser.add_argument("--farmers", type=int, default=10000)
+    parser.add_argument("--retailers", type=int, default=2000)
+    parser.add_argument("--products", type=int, default=1000000)
+    parser.add_argument("--purchases", type=int, default=5000000)
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply every row count by this")
+    parser.add_argument("--days", type=int, default=365, help="spread rows over this many past days")
+    parser.add_argument("--seed", type=int, default=2025)
+    args = parser.parse_args()
+    if not args.db and "DATABASE_URL" not in os.environ:
+        parser.error("pass --db or set DATABASE_URL")
+    for name in ("farmers", "retailers", "products", "purchases"):
+        setattr(args, name, max(1, int(getattr(args, name) * args.scale)))
+
+    App = load_app(args.db)
+    started = time.perf_counter()
+    print(
+        f"Seeding {args.farmers} farmers, {args.retailers} retailers, "
+        f"{args.products} products, {args.purchases} purchases"
+    )
+    with App.app.app_context():
+        seed(App, args)
+    print(f"Done in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+import threading
+import time
+import uuid
+from collections import deque
+
+from fast_json import dumps
+
+# ---------------- Stock Events ----------------
+# Catalog changes (product_created, price_changed, quantity_changed, sold_out)
+# are published per State and streamed to retailers over SSE, so clients can
+# patch their local catalog instead of polling available-products. Each
+# broker keeps a bounded backlog per state; a client reconnecting with
+# Last-Event-ID gets what it missed, or a ``reset`` event telling it to
+# refetch the catalog when that id is no longer retained.
+#
+# The in-process broker only reaches subscribers in the same worker; set
+# STOCK_EVENTS_URL=redis://... (Redis streams) when running several workers.
+#
+# Every open stream holds a worker thread, so each worker serves at most
+# ``max_streams`` of them at once and leaves the rest of its threads to the API.
+
+BACKLOG_SIZE = 1000
+
+
+class StockEvent:
+    __slots__ = ("id", "type", "data")
+
+    def __init__(self, event_id, event_type, data):
+        self.id = event_id
+        self.type = event_type
+        self.data = data  # JSON text
+
+    def to_sse(self):
+        return f"id: {self.id}\nevent: {self.type}\ndata: {self.data}\n\n"
+
+
+class InProcessBroker:
+    def __init__(self, backlog=BACKLOG_SIZE):
+        self.backlog = backlog
+        # Ids are "<boot>-<seq>" so ids from a previous process are recognised as stale
+        self._boot = uuid.uuid4().hex[:8]
+        self._streams = {}
+        self._seq = {}
+        self._cond = threading.Condition()
+
+    def publish(self, state, event_type, data):
+        with self._cond:
+            seq = self._seq.get(state, 0) + 1
+            self._seq[state] = seq
+            stream = self._streams.get(state)
+            if stream is None:
+                stream = self._streams[state] = deque(maxlen=self.backlog)
+            stream.append((seq, event_type, data))
+            self._cond.notify_all()
+        return f"{self._boot}-{seq}"
+
+    def latest_id(self, state):
+        with self._cond:
+            return f"{self._boot}-{self._seq.get(state, 0)}"
+
+    def _parse(self, event_id):
+        boot, _, seq = (event_id or "").partition("-")
+        if boot != self._boot or not seq.isdigit():
+            return None
+        return int(seq)
+
+    def read(self, state, last_id, timeout):
+        """Events after ``last_id``, waiting up to ``timeout`` seconds for the first.
+
+        Returns ``(events, reset)``; ``reset`` is True when ``last_id`` is
+        unknown or older than the backlog, and the caller should resync.
+        """
+        after = self._parse(last_id)
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                latest = self._seq.get(state, 0)
+                stream = self._streams.get(state) or ()
+                oldest = stream[0][0] if stream else latest + 1
+                if after is None or after > latest or after < oldest - 1:
+                    return [], True
+                if after < latest:
+                    return [
+                        StockEvent(f"{self._boot}-{seq}", event_type, data)
+                        for seq, event_type, data in stream
+                        if seq > after
+                    ], False
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return [], False
+                self._cond.wait(remaining)
+
+
+class RedisBroker:
+    """Redis streams, one per State, shared by every worker."""
+
+    def __init__(self, url, prefix="farm2bazaar:stock-events:", backlog=BACKLOG_SIZE):
+        try:
+            import redis
+        except ImportError as exc:
+            raise RuntimeError("STOCK_EVENTS_URL needs the 'redis' package installed") from exc
+        self._redis = redis.Redis.from_url(url)
+        self._prefix = prefix
+        self.backlog = backlog
+
+    def publish(self, state, event_type, data):
+        event_id = self._redis.xadd(
+            self._prefix + state, {"type": event_type, "data": data}, maxlen=self.backlog, approximate=True,
+        )
+        return event_id.decode()
+
+    def latest_id(self, state):
+        entries = self._redis.xrevrange(self._prefix + state, count=1)
+        return entries[0][0].decode() if entries else "0-0"
+
+    @staticmethod
+    def _key(event_id):
+        ms, _, seq = event_id.partition("-")
+        return int(ms), int(seq or 0)
+
+    def read(self, state, last_id, timeout):
+        key = self._prefix + state
+        try:
+            after = self._key(last_id)
+        except (AttributeError, ValueError):
+            return [], True
+        if after != (0, 0):
+            oldest = self._redis.xrange(key, count=1)
+            newest = self._redis.xrevrange(key, count=1)
+            # Trimmed out of the backlog, or from before the stream was recreated
+            if not oldest or not (self._key(oldest[0][0].decode()) <= after <= self._key(newest[0][0].decode())):
+                return [], True
+        reply = self._redis.xread({key: last_id}, count=self.backlog, block=max(1, int(timeout * 1000)))
+        events = []
+        for _, entries in reply or ():
+            for event_id, fields in entries:
+                events.append(StockEvent(event_id.decode(), fields[b"type"].decode(), fields[b"data"].decode()))
+        return events, False
+
+
+class StockEvents:
+    def __init__(self, broker=None, max_streams=None):
+        self.broker = broker or InProcessBroker()
+        self.published = 0
+        self.max_streams = max_streams
+        self.open_streams = 0
+        self.refused = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_url(cls, url=None, max_streams=None):
+        return cls(RedisBroker(url) if url else InProcessBroker(), max_streams=max_streams)
+
+    def acquire(self):
+        """Claim a stream slot; False when this worker already serves ``max_streams`` streams."""
+        with self._lock:
+            if self.max_streams is not None and self.open_streams >= self.max_streams:
+                self.refused += 1
+                return False
+            self.open_streams += 1
+            return True
+
+    def release(self):
+        with self._lock:
+            self.open_streams -= 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "published": self.published,
+                "open_streams": self.open_streams,
+                "max_streams": self.max_streams,
+                "refused": self.refused,
+            }
+
+    def publish(self, state, event_type, **payload):
+        if state is None:
+            return None
+        with self._lock:
+            self.published += 1
+        return self.broker.publish(state, event_type, dumps(payload).decode("utf-8"))
+
+    def stream(self, state, last_id=None, heartbeat=15.0, max_seconds=300.0, retry_ms=3000):
+        """Yield SSE frames for ``state`` until ``max_seconds`` pass; clients reconnect with Last-Event-ID."""
+        yield f"retry: {retry_ms}\n\n"
+        cursor = last_id or self.broker.latest_id(state)
+        deadline = time.monotonic() + max_seconds
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            events, reset = self.broker.read(state, cursor, min(heartbeat, remaining))
+            if reset:
+                cursor = self.broker.latest_id(state)
+                yield StockEvent(cursor, "reset", "{}").to_sse()
+                continue
+            if not events:
+                yield ": keepalive\n\n"
+                continue
+            for event in events:
+                yield event.to_sse()
+            cursor = events[-1].id
@@ -0,0 +1,47 @@
+import atexit
+import os
+import shutil
+import sys
+import tempfile
+
+import pytest
+
+# Importing App builds the app; point it at SQLite instead of the production MySQL.
+# A file rather than :memory:, so report worker processes see the same database.
+_db_dir = tempfile.mkdtemp(prefix="farm2bazaar-tests-")
+atexit.register(shutil.rmtree, _db_dir, ignore_errors=True)
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_db_dir, 'test.db')}")
+os.environ.setdefault("ADMISSION_CONTROL", "0")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def client():
+    import App
+    with App.app.app_context():
+        App.db.create_all()
+        yield App.app.test_client()
+        App.db.session.remove()
+        App.db.drop_all()
+        # Ids are reused by the next test's rows
+        App.farmer_identities.clear()
+        App.retailer_identities.clear()
+        App.catalog_cache.clear()
+
+
+@pytest.fixture
+def farmer(client):
+    """Id of a registered farmer in Kerala."""
+    return client.post("/create-farmer", json={
+        "farmername": "Asha", "mobilenumber": "9000000001", "password": "pw",
+        "gender": "female", "State": "Kerala", "City": "Kochi", "aadhar": "111122223333",
+    }).get_json()["id"]
+
+
+@pytest.fixture
+def retailer(client):
+    """Aadhar of a registered retailer in Kerala."""
+    return client.post("/create-retailer", json={
+        "aadhar": "R-1", "enterprise_name": "Fresh Mart", "owner_name": "Ravi", "mobilenumber": "9000000002",
+        "password": "pw", "State": "Kerala", "City": "Kochi", "Gstin": "GST1", "Pan": "PAN1",
+    }).get_json()["aadhar"]
@@ -0,0 +1,50 @@
+import threading
+
+import pytest
+
+import App
+from admission import InProcessBuckets
+
+
+@pytest.fixture
+def admission(monkeypatch):
+    """The app's admission control, switched on with a two-request read burst and one read slot."""
+    monkeypatch.setattr(App.admission, "enabled", True)
+    monkeypatch.setattr(App.admission, "buckets", InProcessBuckets())
+    monkeypatch.setitem(App.admission.rates, "reads", (0.5, 2.0))
+    monkeypatch.setitem(App.admission._slots, "reads", threading.BoundedSemaphore(1))
+    return App.admission
+
+
+def test_empty_bucket_answers_429_with_retry_after(client, retailer, admission):
+    url = f"/retailer/{retailer}/available-products"
+    assert [client.get(url).status_code for _ in range(2)] == [200, 200]
+
+    response = client.get(url)
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "2"
+    assert response.get_json()["retry_after"] == 2
+
+
+def test_bucket_is_per_address_not_per_id_in_the_url(client, retailer, admission):
+    # Rotating the retailer id in the URL must not hand out fresh buckets
+    ids = [retailer, "999900000001", "999900000002"]
+    statuses = [client.get(f"/retailer/{retailer_id}/available-products").status_code for retailer_id in ids]
+    assert statuses[-1] == 429
+
+    other = client.get(f"/retailer/{retailer}/available-products", environ_base={"REMOTE_ADDR": "10.0.0.2"})
+    assert other.status_code == 200
+
+
+def test_full_concurrency_cap_answers_503(client, retailer, admission):
+    # Another request is holding the only read slot
+    admission._slots["reads"].acquire()
+    try:
+        response = client.get(f"/retailer/{retailer}/available-products")
+    finally:
+        admission._slots["reads"].release()
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    assert client.get(f"/retailer/{retailer}/available-products").status_code == 200
@@ -0,0 +1,60 @@
+from decimal import Decimal
+
+from App import profit_summary_rows, purchase_summary_rows, summary_totals
+
+
+# What MySQL hands back for COUNT(), SUM(int column) and SUM(float column)
+FARMER_BUCKETS = [
+    ("2025-09-01", 2, Decimal("5"), 120.0),
+    ("2025-09-08", 1, Decimal("3"), 60.0),
+]
+
+RETAILER_GROUPS = [
+    ("2025-09", "Kerala", "Vegetables", "Tomato", 2, Decimal("4"), 100.0),
+    ("2025-09", "Kerala", "Vegetables", "Okra", 1, Decimal("2"), 30.0),
+    ("2025-10", "Kerala", "Vegetables", "Tomato", 1, Decimal("1"), 25.0),
+]
+
+
+def rates(state, category, product_name):
+    return {"Tomato": 20.0}.get(product_name)
+
+
+def test_profit_summary_with_decimal_sums():
+    rows = profit_summary_rows(FARMER_BUCKETS, market_rate=20.0)
+
+    assert rows[0] == {
+        "bucket": "2025-09-01",
+        "transactions": 2,
+        "quantity_sold": 5,
+        "total_sold_price": 120.0,
+        "market_value": 100.0,
+        "profit_or_loss": 20.0,
+    }
+    assert type(rows[0]["quantity_sold"]) is int
+    assert summary_totals(rows, ("transactions", "quantity_sold", "market_value", "profit_or_loss")) == {
+        "transactions": 3, "quantity_sold": 8, "market_value": 160.0, "profit_or_loss": 20.0,
+    }
+
+
+def test_profit_summary_with_null_sums():
+    rows = profit_summary_rows([("2025-09-01", 1, None, None)], market_rate=20.0)
+    assert rows[0]["quantity_sold"] == 0
+    assert rows[0]["profit_or_loss"] == 0.0
+
+
+def test_purchase_summary_with_decimal_sums():
+    rows = purchase_summary_rows(RETAILER_GROUPS, rates)
+
+    assert [row["bucket"] for row in rows] == ["2025-09", "2025-10"]
+    september = rows[0]
+    assert september["orders"] == 3
+    assert september["quantity_bought"] == 6
+    assert september["total_purchase_amount"] == 130.0
+    # Okra has no market rate, so only the tomatoes are priced
+    assert september["priced_quantity"] == 4
+    assert september["market_value"] == 80.0
+    assert september["price_difference"] == 20.0
+    assert summary_totals(rows, ("orders", "quantity_bought", "price_difference")) == {
+        "orders": 4, "quantity_bought": 7, "price_difference": 25.0,
+    }
@@ -0,0 +1,45 @@
+import asyncio
+
+import asgi
+
+
+async def asgi_get(path, headers=()):
+    scope = {
+        "type": "http", "method": "GET", "path": path, "query_string": b"",
+        "headers": [(name.lower().encode(), value.encode()) for name, value in headers],
+    }
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        sent.append(message)
+
+    await asgi.app(scope, receive, send)
+    return sent[0]["status"], {k.decode(): v.decode() for k, v in sent[0]["headers"]}
+
+
+def test_asgi_list_routes_revalidate_with_the_flask_etags(client, farmer, retailer):
+    product = {"name": "Tomato", "category": "Vegetables", "price": 10, "quantity": 5}
+    product_id = client.post(f"/farmers/{farmer}/products", json=product).get_json()["id"]
+    client.post(f"/products/{product_id}/purchase", json={"retailer_id": retailer, "quantity": 1, "payment_type": "UPI"})
+    paths = [
+        f"/farmers/{farmer}/products",
+        f"/farmers/{farmer}/transactions",
+        f"/retailers/{retailer}/transaction-history",
+    ]
+    etags = [client.get(path).headers["ETag"] for path in paths]
+
+    async def revalidate():
+        try:
+            return [
+                (await asgi_get(path), await asgi_get(path, [("If-None-Match", etag)]))
+                for path, etag in zip(paths, etags)
+            ]
+        finally:
+            await asgi.engine.dispose()
+
+    for ((status, headers), (revalidated_status, revalidated_headers)), etag in zip(asyncio.run(revalidate()), etags):
+        assert (status, headers["etag"]) == (200, etag)
+        assert (revalidated_status, revalidated_headers["etag"]) == (304, etag)
@@ -0,0 +1,39 @@
+import App
+
+FARMER = {
+    "farmername": "Asha", "mobilenumber": "9000000001", "password": "pw",
+    "gender": "female", "State": "Kerala", "City": "Kochi", "aadhar": "111122223333",
+}
+
+
+def product(number, **overrides):
+    return {"name": f"Tomato {number}", "category": "Vegetables", "price": 10, "quantity": 5, **overrides}
+
+
+def test_rejects_non_finite_and_oversized_rows(client):
+    farmer_id = client.post("/create-farmer", json=FARMER).get_json()["id"]
+    rows = [product(i) for i in range(10)]
+    rows[2]["price"] = "nan"
+    rows[4]["price"] = "inf"
+    rows[6]["name"] = "x" * 121
+    rows[8]["category"] = "y" * 81
+
+    body = client.post(f"/farmers/{farmer_id}/products/bulk", json=rows).get_json()
+
+    assert body["inserted"] == 6
+    assert [error["row"] for error in body["errors"]] == [3, 5, 7, 9]
+
+
+def test_database_failure_only_fails_the_bad_row(client, monkeypatch):
+    farmer_id = client.post("/create-farmer", json=FARMER).get_json()["id"]
+    # A row that passes validation but that the database refuses (here the price CHECK)
+    parse = App.parse_new_product
+    monkeypatch.setattr(App, "parse_new_product", lambda data: dict(parse(data), price=data.get("poison", 10)))
+    rows = [product(i) for i in range(10)]
+    rows[3]["poison"] = -1
+
+    body = client.post(f"/farmers/{farmer_id}/products/bulk", json=rows).get_json()
+
+    assert body["inserted"] == 9
+    assert body["errors"] == [{"row": 4, "error": "Database error"}]
+    assert App.Product.query.filter_by(farmer_id=farmer_id).count() == 9
@@ -0,0 +1,56 @@
+import App
+from catalog_cache import CatalogCache
+
+FARMER = {
+    "farmername": "Asha", "mobilenumber": "9000000001", "password": "pw",
+    "gender": "female", "State": "Kerala", "City": "Kochi", "aadhar": "111122223333",
+}
+RETAILER = {
+    "aadhar": "R-1", "enterprise_name": "Fresh Mart", "owner_name": "Ravi", "mobilenumber": "9000000002",
+    "password": "pw", "State": "Kerala", "City": "Kochi", "Gstin": "GST1", "Pan": "PAN1",
+}
+
+
+def test_catalog_etag_survives_refills_with_the_same_rows(client, monkeypatch):
+    farmer_id = client.post("/create-farmer", json=FARMER).get_json()["id"]
+    client.post("/create-retailer", json=RETAILER)
+    product = {"name": "Tomato", "category": "Vegetables", "price": 10, "quantity": 5}
+    product_id = client.post(f"/farmers/{farmer_id}/products", json=product).get_json()["id"]
+
+    etag = client.get("/retailer/R-1/available-products").headers["ETag"]
+    # An expired entry is rebuilt from the same rows
+    App.catalog_cache.clear()
+    refilled = client.get("/retailer/R-1/available-products", headers={"If-None-Match": etag})
+    assert refilled.status_code == 304
+    assert refilled.headers["ETag"] == etag
+    # So is another worker's cache, which never saw this one's entries
+    monkeypatch.setattr(App, "catalog_cache", CatalogCache())
+    assert client.get("/retailer/R-1/available-products", headers={"If-None-Match": etag}).status_code == 304
+
+    client.post(f"/products/{product_id}/purchase", json={"retailer_id": "R-1", "quantity": 1, "payment_type": "UPI"})
+    sold = client.get("/retailer/R-1/available-products", headers={"If-None-Match": etag})
+    assert sold.status_code == 200
+    assert sold.headers["ETag"] != etag
+
+    client.post(f"/farmers/{farmer_id}/products", json=dict(product, name="Okra"))
+    changed = client.get("/retailer/R-1/available-products", headers={"If-None-Match": sold.headers["ETag"]})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] not in (etag, sold.headers["ETag"])
+
+
+def test_304_carries_the_compressed_etag_its_200_did(client, farmer, retailer):
+    for n in range(20):
+        product = {"name": f"Tomato {n}", "category": "Vegetables", "price": 10, "quantity": 5}
+        client.post(f"/farmers/{farmer}/products", json=product)
+    gzip = {"Accept-Encoding": "gzip"}
+
+    for url in (f"/retailer/{retailer}/available-products", f"/farmers/{farmer}/products"):
+        full = client.get(url, headers=gzip)
+        assert full.headers["Content-Encoding"] == "gzip"
+        etag = full.headers["ETag"]
+        assert etag.endswith('-gzip"')
+
+        revalidated = client.get(url, headers=dict(gzip, **{"If-None-Match": etag}))
+        assert revalidated.status_code == 304
+        assert revalidated.headers["ETag"] == etag
+        assert "Accept-Encoding" in revalidated.headers["Vary"]
@@ -0,0 +1,78 @@
+import App
+
+
+def add_products(client, farmer, *quantities):
+    return [
+        client.post(f"/farmers/{farmer}/products", json={
+            "name": f"Tomato {number}", "category": "Vegetables", "price": 10, "quantity": quantity,
+        }).get_json()["id"]
+        for number, quantity in enumerate(quantities)
+    ]
+
+
+def checkout(client, retailer, items):
+    return client.post(f"/retailers/{retailer}/checkout", json={"payment_type": "UPI", "items": items})
+
+
+def counters():
+    App.db.session.expire_all()
+    return {
+        "stock": sorted((p.id, p.quantity) for p in App.Product.query),
+        "rollup": [r.to_dict() for r in App.FarmerSalesRollup.query],
+        "monthly": App.RetailerMonthlyPurchases.query.count(),
+        "daily": App.DailyProductSales.query.count(),
+        "versions": sorted((v.scope, v.version) for v in App.DataVersion.query),
+    }
+
+
+def test_one_short_line_rolls_back_the_whole_order(client, farmer, retailer):
+    tomato, okra, rice = add_products(client, farmer, 5, 5, 2)
+    before = counters()
+
+    response = checkout(client, retailer, [
+        {"product_id": tomato, "quantity": 5},
+        {"product_id": okra, "quantity": 1},
+        {"product_id": rice, "quantity": 3},
+    ])
+
+    assert response.status_code == 400
+    assert response.get_json()["items"] == [{"product_id": rice, "requested": 3, "available": 2}]
+    assert App.Purchase.query.count() == 0
+    assert counters() == before
+
+
+def test_repeated_products_are_merged_into_one_line(client, farmer, retailer):
+    tomato, okra = add_products(client, farmer, 5, 5)
+
+    response = checkout(client, retailer, [
+        {"product_id": tomato, "quantity": 2},
+        {"product_id": okra, "quantity": 1},
+        {"product_id": tomato, "quantity": 3},
+    ])
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert sorted((item["product_id"], item["quantity"]) for item in body["items"]) == [(tomato, 5), (okra, 1)]
+    assert body["total_amount"] == 60
+    assert sorted((p.product_id, p.quantity) for p in App.Purchase.query) == [(tomato, 5), (okra, 1)]
+    assert counters()["stock"] == [(tomato, 0), (okra, 4)]
+
+
+def test_merged_lines_are_checked_against_stock_together(client, farmer, retailer):
+    (tomato,) = add_products(client, farmer, 5)
+
+    response = checkout(client, retailer, [{"product_id": tomato, "quantity": 3}] * 2)
+
+    assert response.status_code == 400
+    assert counters()["stock"] == [(tomato, 5)]
+
+
+def test_line_limit(client, farmer, retailer):
+    (tomato,) = add_products(client, farmer, 1000)
+    lines = [{"product_id": tomato, "quantity": 1}] * (App.MAX_CHECKOUT_LINES + 1)
+
+    response = checkout(client, retailer, lines)
+
+    assert response.status_code == 400
+    assert "At most" in response.get_json()["error"]
+    assert checkout(client, retailer, lines[:App.MAX_CHECKOUT_LINES]).status_code == 200
@@ -0,0 +1,13 @@
+import pytest
+
+from db_pool import engine_options_from_env
+
+
+@pytest.mark.parametrize(
+    "value, recycle",
+    [(None, 280), ("", 280), ("600", 600), ("0", -1), ("-1", -1)],
+)
+def test_pool_recycle_from_env(value, recycle):
+    env = {} if value is None else {"DB_POOL_RECYCLE": value}
+    options = engine_options_from_env(env, "mysql+pymysql://u:p@db/farm")
+    assert options["pool_recycle"] == recycle
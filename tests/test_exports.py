@@ -0,0 +1,66 @@
+import csv
+import io
+import json
+
+import pytest
+
+import App
+import exports
+
+NAMES = ['Tomato, "Roma"', '=HYPERLINK("http://example.com")', "+91 chilli", "-okra", "@SUM(A1)"]
+
+
+@pytest.fixture
+def sales(client, farmer, retailer, monkeypatch):
+    # Several batches per export, so the chunked writers are exercised
+    monkeypatch.setattr(exports, "EXPORT_BATCH_SIZE", 2)
+    for name in NAMES:
+        product = {"name": name, "category": "Vegetables", "price": 10, "quantity": 5}
+        product_id = client.post(f"/farmers/{farmer}/products", json=product).get_json()["id"]
+        client.post(f"/products/{product_id}/purchase", json={"retailer_id": retailer, "quantity": 1, "payment_type": "UPI"})
+
+
+def export_urls(farmer, retailer):
+    return [
+        (f"/farmers/{farmer}/transactions/export", f"/farmers/{farmer}/transactions",
+         f"farmer_{farmer}_transactions", App.FARMER_TRANSACTION_FIELDS, "product_name"),
+        (f"/retailers/{retailer}/transactions/export", f"/retailers/{retailer}/transaction-history",
+         f"retailer_{retailer}_transactions", App.RETAILER_TRANSACTION_FIELDS, "product_name"),
+    ]
+
+
+def test_csv_export_headers_escaping_and_formula_guard(client, farmer, retailer, sales):
+    for url, _, filename, fields, name_field in export_urls(farmer, retailer):
+        response = client.get(url)
+
+        assert response.status_code == 200
+        assert response.mimetype == "text/csv"
+        assert response.headers["Content-Disposition"] == f"attachment; filename={filename}.csv"
+        assert response.headers["Cache-Control"] == "no-store"
+        rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+        assert tuple(rows[0]) == fields
+        # Commas and quotes round-trip; anything a spreadsheet would evaluate opens as text
+        assert [row[name_field] for row in rows] == [
+            'Tomato, "Roma"', '\'=HYPERLINK("http://example.com")', "'+91 chilli", "'-okra", "'@SUM(A1)",
+        ]
+        assert '"Tomato, ""Roma"""' in response.get_data(as_text=True)
+
+
+def test_streamed_exports_match_the_list_query(client, farmer, retailer, sales):
+    for url, list_url, filename, fields, _ in export_urls(farmer, retailer):
+        listed = client.get(list_url).get_json()
+        response = client.get(f"{url}?format=ndjson")
+
+        assert response.mimetype == "application/x-ndjson"
+        assert response.headers["Content-Disposition"] == f"attachment; filename={filename}.ndjson"
+        exported = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        assert exported == listed
+        assert len(exported) == len(NAMES)
+
+        rows = list(csv.DictReader(io.StringIO(client.get(url).get_data(as_text=True))))
+        key = fields[0]
+        assert [int(row[key]) for row in rows] == [record[key] for record in listed]
+
+
+def test_unknown_export_format_is_rejected(client, retailer):
+    assert client.get(f"/retailers/{retailer}/transactions/export?format=xlsx").status_code == 400
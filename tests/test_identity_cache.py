@@ -0,0 +1,42 @@
+import threading
+
+import App
+
+
+def reload_in_another_thread(find, key):
+    # Another request reading the committed row while this one is mid-transaction
+    def load():
+        with App.app.app_context():
+            find(key)
+    thread = threading.Thread(target=load)
+    thread.start()
+    thread.join()
+
+
+def test_updates_are_read_back_through_the_identity_cache(client, farmer, retailer):
+    assert App.find_farmer(farmer).farmername == "Asha"
+    assert App.find_retailer(retailer).State == "Kerala"
+
+    App.db.session.get(App.Farmer, farmer).farmername = "Asha Menon"
+    App.db.session.get(App.Retailer, retailer).State = "Goa"
+    App.db.session.flush()
+    reload_in_another_thread(App.find_farmer, farmer)
+    reload_in_another_thread(App.find_retailer, retailer)
+    App.db.session.commit()
+
+    assert App.find_farmer(farmer).farmername == "Asha Menon"
+    assert App.find_retailer(retailer).State == "Goa"
+    # A Goa retailer no longer sees the Kerala catalog
+    product = {"name": "Tomato", "category": "Vegetables", "price": 10, "quantity": 5}
+    client.post(f"/farmers/{farmer}/products", json=product)
+    assert client.get(f"/retailer/{retailer}/available-products").get_json() == []
+
+
+def test_deleted_retailer_is_not_found(client, retailer):
+    assert client.get(f"/retailers/{retailer}/monthly-summary").status_code == 200
+
+    App.db.session.delete(App.db.session.get(App.Retailer, retailer))
+    App.db.session.commit()
+
+    assert App.find_retailer(retailer) is None
+    assert client.get(f"/retailers/{retailer}/monthly-summary").status_code == 404
@@ -0,0 +1,18 @@
+import os
+
+import sqlalchemy as sa
+from flask_migrate import upgrade
+
+import App
+
+MIGRATIONS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "migrations")
+
+
+def test_upgrade_builds_the_schema_from_an_empty_database(tmp_path, monkeypatch):
+    monkeypatch.setenv("FLASK_RUN_FROM_CLI", "true")  # create_app only sets up Flask-Migrate for the CLI
+    app = App.create_app({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'fresh.db'}"})
+    with app.app_context():
+        upgrade(directory=MIGRATIONS)
+        tables = set(sa.inspect(App.db.engine).get_table_names())
+        App.db.engine.dispose()
+    assert set(App.db.metadata.tables) <= tables
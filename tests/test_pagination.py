@@ -0,0 +1,63 @@
+import base64
+import json
+from datetime import datetime
+
+import pytest
+
+import App
+
+
+def add_products(client, farmer, count):
+    for number in range(count):
+        product = {"name": f"Tomato {number}", "category": "Vegetables", "price": 10 + number, "quantity": 5}
+        assert client.post(f"/farmers/{farmer}/products", json=product).status_code == 201
+
+
+def walk(client, url):
+    ids, after = [], None
+    while True:
+        response = client.get(url + (f"&after={after}" if after else ""))
+        assert response.status_code == 200
+        ids += [row["id"] for row in response.get_json()]
+        after = response.headers.get("X-Next-Cursor")
+        if after is None:
+            return ids
+
+
+def cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip("=")
+
+
+def test_product_pages_cover_every_row_once_across_sort_key_ties(client, farmer):
+    add_products(client, farmer, 7)
+    # Every row shares one updated_at, so only the id tiebreaker orders them
+    App.Product.query.update({App.Product.updated_at: datetime(2024, 1, 1)})
+    App.db.session.commit()
+
+    ids = walk(client, f"/farmers/{farmer}/products?limit=2")
+
+    assert sorted(ids) == [row.id for row in App.Product.query.order_by(App.Product.id)]
+    assert ids == sorted(ids, reverse=True)
+
+
+def test_catalog_pages_cover_every_row_once(client, farmer, retailer):
+    add_products(client, farmer, 5)
+
+    ids = walk(client, f"/retailer/{retailer}/available-products?limit=2")
+
+    assert ids == [row.id for row in App.Product.query.order_by(App.Product.id)]
+
+
+@pytest.mark.parametrize("after", [
+    "not-a-cursor",
+    cursor([1]),  # one value for a two-column key
+    cursor(["2024-13-01T00:00:00", 1]),
+    cursor(["2024-01-01T00:00:00", "1 OR 1=1"]),
+    cursor([{"$gt": 0}, 1]),
+])
+def test_invalid_cursor_is_a_bad_request(client, farmer, after):
+    add_products(client, farmer, 1)
+
+    response = client.get(f"/farmers/{farmer}/products?limit=2&after={after}")
+
+    assert response.status_code == 400
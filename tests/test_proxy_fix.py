@@ -0,0 +1,33 @@
+from flask import request
+
+import App
+
+
+def probe_client(**config):
+    app = App.create_app(config)
+
+    @app.route("/_probe")
+    def probe():
+        return {"remote_addr": request.remote_addr, "secure": request.is_secure}
+
+    return app.test_client()
+
+
+FORWARDED = {"X-Forwarded-For": "203.0.113.7", "X-Forwarded-Proto": "https"}
+PROXY = {"REMOTE_ADDR": "10.0.0.1"}
+
+
+def test_forwarded_headers_ignored_by_default():
+    body = probe_client().get("/_probe", headers=FORWARDED, environ_base=PROXY).get_json()
+    assert body == {"remote_addr": "10.0.0.1", "secure": False}
+
+
+def test_client_address_and_scheme_come_from_the_proxy():
+    body = probe_client(TRUSTED_PROXIES=1).get("/_probe", headers=FORWARDED, environ_base=PROXY).get_json()
+    assert body == {"remote_addr": "203.0.113.7", "secure": True}
+
+
+def test_only_the_last_hop_is_trusted():
+    headers = {"X-Forwarded-For": "198.51.100.1, 203.0.113.7"}
+    body = probe_client(TRUSTED_PROXIES=1).get("/_probe", headers=headers, environ_base=PROXY).get_json()
+    assert body["remote_addr"] == "203.0.113.7"
@@ -0,0 +1,73 @@
+import threading
+
+import App
+
+
+def add_product(client, farmer, quantity):
+    product = {"name": "Tomato", "category": "Vegetables", "price": 10, "quantity": quantity}
+    return client.post(f"/farmers/{farmer}/products", json=product).get_json()["id"]
+
+
+def buy(client, retailer, product_id, quantity):
+    return client.post(
+        f"/products/{product_id}/purchase",
+        json={"retailer_id": retailer, "quantity": quantity, "payment_type": "UPI"},
+    )
+
+
+def stock(product_id):
+    App.db.session.expire_all()
+    product = App.db.session.get(App.Product, product_id)
+    return product.quantity, product.in_stock
+
+
+def test_buying_the_exact_stock_sells_out(client, farmer, retailer):
+    product_id = add_product(client, farmer, 5)
+
+    response = buy(client, retailer, product_id, 5)
+
+    assert response.status_code == 200
+    assert response.get_json()["purchase"]["payment_amount"] == 50
+    assert stock(product_id) == (0, False)
+    assert buy(client, retailer, product_id, 1).status_code == 400
+
+
+def test_buying_more_than_the_stock_changes_nothing(client, farmer, retailer):
+    product_id = add_product(client, farmer, 5)
+
+    response = buy(client, retailer, product_id, 6)
+
+    assert response.status_code == 400
+    assert response.get_json() == {"error": "Insufficient stock"}
+    assert stock(product_id) == (5, True)
+    assert App.Purchase.query.count() == 0
+    assert App.RetailerMonthlyPurchases.query.count() == 0
+
+
+def test_partial_purchase_keeps_the_product_in_stock(client, farmer, retailer):
+    product_id = add_product(client, farmer, 5)
+
+    assert buy(client, retailer, product_id, 4).status_code == 200
+    assert stock(product_id) == (1, True)
+    assert buy(client, retailer, product_id, 1).status_code == 200
+    assert stock(product_id) == (0, False)
+
+
+def test_concurrent_buyers_never_oversell(client, farmer, retailer):
+    product_id = add_product(client, farmer, 5)
+    statuses = []
+
+    def buyer():
+        local = App.app.test_client()
+        for _ in range(3):
+            statuses.append(buy(local, retailer, product_id, 1).status_code)
+
+    threads = [threading.Thread(target=buyer) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(statuses) == [200] * 5 + [400] * 13
+    assert stock(product_id) == (0, False)
+    assert App.Purchase.query.count() == 5
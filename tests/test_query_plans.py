@@ -0,0 +1,101 @@
+"""Every endpoint's queries must use an index: fail on SQLite full table scans.
+
+Drives each route once through the test client, records every
+SELECT/UPDATE/DELETE it issues, and runs ``EXPLAIN QUERY PLAN`` on each, so a
+query that loses its index fails here rather than in production.
+"""
+import re
+
+from flask import has_request_context, request
+from sqlalchemy import event
+
+import App
+
+FARMER = {
+    "farmername": "Ravi", "mobilenumber": "9000000001", "password": "pw", "gender": "male",
+    "State": "Andhra Pradesh", "City": "Guntur", "aadhar": "111122223333",
+}
+RETAILER = {
+    "aadhar": "R-1", "enterprise_name": "Fresh Mart", "owner_name": "Asha", "mobilenumber": "9000000002",
+    "password": "pw", "State": "Andhra Pradesh", "City": "Guntur", "Gstin": "GST1", "Pan": "PAN1",
+}
+CALLS = [
+    ("POST", "/create-farmer", FARMER),
+    ("POST", "/login-farmer", {"mobilenumber": FARMER["mobilenumber"], "password": "pw"}),
+    ("POST", "/create-retailer", RETAILER),
+    ("POST", "/login-retailer", {"mobilenumber": RETAILER["mobilenumber"], "password": "pw"}),
+    ("POST", "/farmers/1/products", {"name": "Tomato", "category": "Vegetables", "price": 20, "quantity": 50}),
+    ("POST", "/farmers/1/products", {"name": "rice", "category": "cereals", "price": 45, "quantity": 80}),
+    ("GET", "/farmers/1/products", None),
+    ("GET", "/farmers/1/products?status=active&limit=10", None),
+    ("PATCH", "/farmers/1/products/1", {"price": 22, "quantity": 60}),
+    ("PATCH", "/farmers/1/products/2", {"category": "Grains"}),
+    ("POST", "/products/1/purchase", {"retailer_id": "R-1", "quantity": 5, "payment_type": "UPI"}),
+    ("POST", "/retailers/R-1/checkout", {
+        "payment_type": "UPI", "items": [{"product_id": 1, "quantity": 2}, {"product_id": 2, "quantity": 1}],
+    }),
+    ("POST", "/farmers/1/products/2/soldout", None),
+    ("GET", "/retailer/R-1/available-products", None),
+    ("GET", "/retailer/R-1/available-products?limit=10", None),
+    ("GET", "/retailer/R-1/search?q=tomto&sort=price&limit=10", None),
+    ("GET", "/retailer/R-1/search?category=veg&min_price=1&max_price=100", None),
+    ("GET", "/farmers/1/product-history", None),
+    ("GET", "/farmers/1/transactions", None),
+    ("GET", "/farmers/1/transactions?limit=1", None),
+    ("GET", "/farmers/1/transactions/export", None),
+    ("GET", "/farmers/1/transactions/export?format=ndjson&from=2025-01-01&to=2025-12-31", None),
+    ("GET", "/farmers/1/analytics", None),
+    ("GET", "/farmers/1/sales-series?granularity=week", None),
+    ("GET", "/farmers/1/sales-series?product_id=1&from=2025-01-01&to=2025-12-31", None),
+    ("GET", "/farmers/1/transactions/report?from_date=2000-01-01&to_date=2100-01-01", None),
+    ("POST", "/farmers/1/reports", {"from_date": "2000-01-01", "to_date": "2100-01-01"}),
+    ("GET", "/retailers/R-1/transaction-history", None),
+    ("GET", "/retailers/R-1/transactions/export?month=2026-01", None),
+    ("GET", "/retailers/R-1/stock-bought-this-month", None),
+    ("GET", "/retailers/R-1/stock-bought-this-month?from=2000-01-01&to=2100-01-01", None),
+    ("GET", "/retailers/R-1/monthly-summary?month=2026-01", None),
+    ("GET", "/farmers/1/product-profit-analysis?category=Vegetables&product_name=Tomato", None),
+    ("GET", "/retailers/R-1/purchase-analysis", None),
+    ("GET", "/farmers/1/product-profit-analysis?category=Vegetables&product_name=Tomato&mode=summary&bucket=week", None),
+    ("GET", "/retailers/R-1/purchase-analysis?mode=summary&bucket=month", None),
+    ("GET", "/diagnostics", None),
+    ("GET", "/metrics", None),
+]
+
+
+def test_no_endpoint_query_scans_a_table(client):
+    tables = {table.name for table in App.db.metadata.sorted_tables}
+    engine = App.db.engine
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        verb = statement.lstrip().split(None, 1)[0].upper()
+        if verb in ("SELECT", "UPDATE", "DELETE") and not executemany:
+            endpoint = request.endpoint if has_request_context() else "<none>"
+            captured.append((endpoint, statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        failures = []
+        for method, url, body in CALLS:
+            response = client.open(url, method=method, json=body)
+            response.get_data()  # streamed bodies (exports) only query while they are read
+            if response.status_code >= 500:
+                failures.append(f"{method} {url} returned {response.status_code}")
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+    seen = set()
+    with engine.connect() as conn:
+        for endpoint, statement, parameters in captured:
+            if (endpoint, statement) in seen:
+                continue
+            seen.add((endpoint, statement))
+            plan = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).fetchall()
+            for line in (row[-1].strip() for row in plan):
+                match = re.match(r"SCAN (\w+)(?: AS \w+)?$", line)
+                if match and match.group(1) in tables:
+                    failures.append(f"{endpoint}: {line}\n    {statement.strip()}")
+
+    assert len(seen) > 40, "the endpoints stopped issuing the queries this test checks"
+    assert not failures, "Server errors or full table scans:\n" + "\n".join(failures)
@@ -0,0 +1,25 @@
+FARMER = {
+    "farmername": "Asha", "mobilenumber": "9000000001", "password": "pw",
+    "gender": "female", "State": "Kerala", "City": "Kochi", "aadhar": "111122223333",
+}
+RETAILER = {
+    "aadhar": "R-1", "enterprise_name": "Fresh Mart", "owner_name": "Ravi", "mobilenumber": "9000000002",
+    "password": "pw", "State": "Kerala", "City": "Kochi", "Gstin": "GST1", "Pan": "PAN1",
+}
+
+
+def test_duplicate_farmer_mobile_is_a_conflict(client):
+    assert client.post("/create-farmer", json=FARMER).status_code == 201
+
+    response = client.post("/create-farmer", json=FARMER)
+    assert response.status_code == 409
+    assert "error" in response.get_json()
+    # The session was rolled back, so the next registration still goes through
+    assert client.post("/create-farmer", json=dict(FARMER, mobilenumber="9000000009")).status_code == 201
+
+
+def test_duplicate_retailer_is_a_conflict(client):
+    assert client.post("/create-retailer", json=RETAILER).status_code == 201
+
+    assert client.post("/create-retailer", json=dict(RETAILER, aadhar="R-2")).status_code == 409
+    assert client.post("/create-retailer", json=dict(RETAILER, mobilenumber="9000000008")).status_code == 409
@@ -0,0 +1,41 @@
+import time
+
+import App
+from reports import ReportJobs
+
+RANGE = "from_date=2000-01-01&to_date=2100-01-01"
+
+
+def add_sale(client, farmer, retailer):
+    product = {"name": "Tomato", "category": "Vegetables", "price": 10, "quantity": 5}
+    product_id = client.post(f"/farmers/{farmer}/products", json=product).get_json()["id"]
+    client.post(f"/products/{product_id}/purchase", json={"retailer_id": retailer, "quantity": 2, "payment_type": "UPI"})
+
+
+def test_small_report_comes_back_in_one_request(client, farmer, retailer):
+    add_sale(client, farmer, retailer)
+
+    response = client.get(f"/farmers/{farmer}/transactions/report?{RANGE}")
+
+    assert response.status_code == 200
+    assert response.mimetype == "application/pdf"
+    assert response.data.startswith(b"%PDF")
+
+
+def test_slow_report_is_handed_back_as_a_job(client, farmer, retailer, monkeypatch):
+    add_sale(client, farmer, retailer)
+    monkeypatch.setattr(App, "REPORT_WAIT_SECONDS", 0)
+    # Ids repeat across tests, so the shared cache may already hold this job's PDF
+    monkeypatch.setattr(App, "report_jobs", ReportJobs(max_workers=1))
+
+    response = client.get(f"/farmers/{farmer}/transactions/report?{RANGE}")
+
+    assert response.status_code == 202
+    status_url = response.headers["Location"]
+    assert status_url == response.get_json()["status_url"]
+    deadline = time.monotonic() + 30
+    while (status := client.get(status_url).get_json())["status"] == "running":
+        assert time.monotonic() < deadline
+        time.sleep(0.05)
+    assert status["status"] == "done"
+    assert client.get(status["download_url"]).data.startswith(b"%PDF")
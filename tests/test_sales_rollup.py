@@ -0,0 +1,45 @@
+from datetime import datetime
+
+import App
+
+
+def add_product(client, farmer, **fields):
+    product = {"name": "Tomato", "category": "Vegetables", "price": 10, "quantity": 20, **fields}
+    return client.post(f"/farmers/{farmer}/products", json=product).get_json()["id"]
+
+
+def sales(client, farmer):
+    body = client.get(f"/farmers/{farmer}/analytics").get_json()
+    return body["category_sales"]["Vegetables"], body["total_revenue"], body["total_present_stock"]
+
+
+def test_partial_rollup_is_not_used_before_the_backfill(client, farmer, retailer):
+    product_id = add_product(client, farmer)
+    # A farmer from before the rollup: a sale it never saw, and no backfill marker
+    App.db.session.add(App.Purchase(
+        retailer_id=retailer, product_id=product_id, quantity=3, payment_type="UPI",
+        payment_amount=30.0, created_at=datetime(2024, 1, 1),
+    ))
+    App.db.session.query(App.SalesRollupBackfill).delete()
+    App.db.session.query(App.FarmerSalesRollup).delete()
+    App.db.session.commit()
+
+    # The first purchase after deploy creates a partial rollup row
+    purchase = {"retailer_id": retailer, "quantity": 2, "payment_type": "UPI"}
+    assert client.post(f"/products/{product_id}/purchase", json=purchase).status_code == 200
+
+    assert sales(client, farmer) == (5, 50.0, 18)
+
+    assert "Rebuilt 1 " in App.app.test_cli_runner().invoke(args=["rebuild-sales-rollup"]).output
+    assert App.db.session.get(App.SalesRollupBackfill, farmer) is not None
+    assert sales(client, farmer) == (5, 50.0, 18)
+
+
+def test_new_farmers_read_the_rollup(client, farmer, retailer):
+    assert App.db.session.get(App.SalesRollupBackfill, farmer) is not None
+    product_id = add_product(client, farmer)
+    client.post(f"/products/{product_id}/purchase", json={"retailer_id": retailer, "quantity": 4, "payment_type": "UPI"})
+
+    body = client.get(f"/farmers/{farmer}/analytics").get_json()
+    assert body["category_sales"] == {"Vegetables": 4}
+    assert body["total_listed_stock"] == 20
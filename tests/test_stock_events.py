@@ -0,0 +1,53 @@
+import threading
+
+import pytest
+
+import App
+
+
+@pytest.fixture
+def short_streams(monkeypatch):
+    monkeypatch.setattr(App, "STOCK_EVENTS_HEARTBEAT", 0.1)
+    monkeypatch.setattr(App, "STOCK_EVENTS_MAX_SECONDS", 1.0)
+
+
+def test_streams_over_the_worker_cap_get_503(client, retailer, monkeypatch):
+    monkeypatch.setattr(App.stock_events, "max_streams", 1)
+    url = f"/retailer/{retailer}/stock-events"
+
+    first = client.get(url, buffered=False)
+    refused = client.get(url)
+    first.close()
+
+    assert first.status_code == 200
+    assert refused.status_code == 503
+    assert refused.headers["Retry-After"] == "15"
+    assert "event: busy" in refused.get_data(as_text=True)
+    # Closing the first stream gave its slot back
+    again = client.get(url, buffered=False)
+    assert again.status_code == 200
+    again.close()
+    assert App.stock_events.stats()["open_streams"] == 0
+
+
+def test_events_are_delivered_through_the_broker(client, farmer, retailer, short_streams):
+    # Missed while disconnected: replayed from the backlog after Last-Event-ID
+    last_id = App.stock_events.broker.latest_id("Kerala")
+    product = {"name": "Tomato", "category": "Vegetables", "price": 10, "quantity": 5}
+    client.post(f"/farmers/{farmer}/products", json=product)
+
+    replayed = client.get(f"/retailer/{retailer}/stock-events", headers={"Last-Event-ID": last_id})
+    assert "event: product_created" in replayed.get_data(as_text=True)
+    assert "Tomato" in replayed.get_data(as_text=True)
+
+    # Published while connected: delivered live
+    live = client.get(f"/retailer/{retailer}/stock-events", buffered=False)
+    frames = iter(live.response)
+    assert next(frames).startswith(b"retry:")
+    publisher = threading.Timer(0.2, App.stock_events.publish, ("Kerala", "price_changed"), {"price": 12})
+    publisher.start()
+    try:
+        assert any(frame.startswith(b"id:") and b"event: price_changed" in frame for frame in frames)
+    finally:
+        publisher.join()
+        live.close()
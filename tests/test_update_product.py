@@ -0,0 +1,38 @@
+import pytest
+
+import App
+
+
+@pytest.mark.parametrize("change", [
+    {"price": "nan"},
+    {"price": "inf"},
+    {"price": -1},
+    {"price": "ten"},
+    {"quantity": -1},
+    {"quantity": 2**31},
+    {"name": " "},
+    {"category": "y" * 81},
+    {"name": "Okra", "price": "nan"},  # nothing is applied when any field is bad
+])
+def test_invalid_update_is_a_bad_request(client, farmer, change):
+    product = {"name": "Tomato", "category": "Vegetables", "price": 10, "quantity": 5}
+    product_id = client.post(f"/farmers/{farmer}/products", json=product).get_json()["id"]
+
+    response = client.patch(f"/farmers/{farmer}/products/{product_id}", json=change)
+
+    assert response.status_code == 400
+    App.db.session.expire_all()
+    stored = App.db.session.get(App.Product, product_id)
+    assert (stored.name, stored.category, stored.price, stored.quantity) == ("Tomato", "Vegetables", 10, 5)
+
+
+def test_valid_update(client, farmer):
+    product = {"name": "Tomato", "category": "Vegetables", "price": 10, "quantity": 5}
+    product_id = client.post(f"/farmers/{farmer}/products", json=product).get_json()["id"]
+
+    response = client.patch(f"/farmers/{farmer}/products/{product_id}", json={"price": "12.5", "quantity": 0})
+
+    assert response.status_code == 200
+    App.db.session.expire_all()
+    stored = App.db.session.get(App.Product, product_id)
+    assert (stored.price, stored.quantity, stored.in_stock) == (12.5, 0, False)